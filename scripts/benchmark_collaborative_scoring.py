@@ -0,0 +1,97 @@
+import sys
+import os
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from surprise import Dataset, Reader, SVD
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.collaborative_scoring_service import CollaborativeScorer
+
+
+def build_model(n_recipes: int, n_users: int, n_factors: int, n_epochs: int, rng: np.random.Generator) -> SVD:
+    extra = n_recipes
+    users = np.concatenate([rng.integers(0, n_users, n_recipes), rng.integers(0, n_users, extra)])
+    items = np.concatenate([np.arange(n_recipes), rng.integers(0, n_recipes, extra)])
+    df = pd.DataFrame({
+        "user_id": [f"user-{u}" for u in users],
+        "recipe_id": [f"recipe-{i}" for i in items],
+        "rating": 1,
+    }).drop_duplicates(subset=["user_id", "recipe_id"])
+
+    reader = Reader(rating_scale=(0, 1))
+    trainset = Dataset.load_from_df(df[['user_id', 'recipe_id', 'rating']], reader).build_full_trainset()
+    model = SVD(n_factors=n_factors, n_epochs=n_epochs, random_state=42)
+    model.fit(trainset)
+    return model
+
+
+def predict_loop_ranking(model: SVD, user_id: str, candidate_ids, favorite_ids, n_recs: int):
+    recipes_to_predict = [rid for rid in candidate_ids if rid not in favorite_ids]
+    predictions = [(rid, model.predict(uid=user_id, iid=rid).est) for rid in recipes_to_predict]
+    predictions.sort(key=lambda x: x[1], reverse=True)
+    return [rid for rid, _ in predictions[:n_recs]]
+
+
+def vectorized_ranking(scorer: CollaborativeScorer, user_id: str, candidate_ids, candidate_rows, favorite_ids, n_recs: int):
+    exclude = np.array([candidate_rows[rid] for rid in favorite_ids if rid in candidate_rows], dtype=np.int64)
+    scores = scorer.score(user_id, scorer.encode_items(candidate_ids))
+    return [candidate_ids[i] for i in scorer.top_n(scores, n_recs, exclude=exclude)]
+
+
+def benchmark(n_recipes: int, args, rng: np.random.Generator) -> None:
+    print(f"\n--- {n_recipes} recipes ---")
+    start = time.perf_counter()
+    model = build_model(n_recipes, args.users, args.factors, args.epochs, rng)
+    print(f"Synthetic SVD trained in {time.perf_counter() - start:.2f}s")
+
+    scorer = CollaborativeScorer.from_surprise(model)
+    candidate_ids = [f"recipe-{i}" for i in range(n_recipes)]
+    candidate_rows = {rid: row for row, rid in enumerate(candidate_ids)}
+    scorer.encode_items(candidate_ids)
+
+    loop_times, vector_times, mismatches = [], [], 0
+    for user in rng.choice(args.users, size=args.samples, replace=False):
+        user_id = f"user-{user}"
+        favorite_ids = {f"recipe-{i}" for i in rng.integers(0, n_recipes, 10)}
+
+        start = time.perf_counter()
+        expected = predict_loop_ranking(model, user_id, candidate_ids, favorite_ids, args.n_recs)
+        loop_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        actual = vectorized_ranking(scorer, user_id, candidate_ids, candidate_rows, favorite_ids, args.n_recs)
+        vector_times.append(time.perf_counter() - start)
+
+        if expected != actual:
+            mismatches += 1
+
+    loop_ms = np.median(loop_times) * 1000
+    vector_ms = np.median(vector_times) * 1000
+    print(f"model.predict loop: {loop_ms:10.2f} ms/user (median)")
+    print(f"Vectorized scorer:  {vector_ms:10.2f} ms/user (median)")
+    print(f"Speedup:            {loop_ms / vector_ms:10.1f}x")
+    print(f"Ranking mismatches: {mismatches}/{args.samples}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-recipe model.predict calls against the vectorized collaborative scorer.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 50000, 500000])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--factors", type=int, default=100)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--n-recs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for n_recipes in args.sizes:
+        benchmark(n_recipes, args, rng)
+
+
+if __name__ == "__main__":
+    main()
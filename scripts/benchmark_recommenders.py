@@ -0,0 +1,166 @@
+import sys
+import os
+import argparse
+import contextlib
+import json
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import SessionLocal
+from app.repositories.favorite_repository import favorite_repository
+from app.repositories.recipe_repository import recipe_repository
+from app.services.evaluation_service import recommendation_evaluation_service as evaluation
+from app.services.ingredient_index_service import ingredient_index_service
+from app.services.model_store_service import ModelStore
+from app.services.recommendation_cache_service import recommendation_cache_service
+from app.services.recommendation_service import RecommendationService
+from app.services.training_data_service import training_data_service
+from app.repositories.user_recommendation_repository import user_recommendation_repository
+from app.repositories.history_repository import history_repository
+from app.services.popularity_index_service import PopularityIndexService
+from app.services.user_vector_service import user_vector_store
+from app.services.recipe_neighbor_service import RecipeNeighborService
+from app.services.recommendation_pipeline_service import RecommendationPipeline
+
+STRATEGIES = ["content", "collaborative", "hybrid", "pipeline"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline ranking-quality and latency benchmark for the recommenders.")
+    parser.add_argument("--algorithm", choices=["svd", "als"], default="svd", help="Collaborative model trained on the train split.")
+    parser.add_argument("--holdout", type=int, default=2, help="Favorites held out per user (leave-k-out).")
+    parser.add_argument("--min-train", type=int, default=2, help="Minimum favorites a user keeps in the train split.")
+    parser.add_argument("--k", type=int, default=10, help="Cutoff for precision/recall/NDCG.")
+    parser.add_argument("--max-users", type=int, default=1000, help="Maximum number of test users to evaluate.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="JSON file to write (default: benchmark_results/recommenders-<timestamp>.json).")
+    return parser.parse_args()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def quietly(fn, *args, **kwargs):
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return fn(*args, **kwargs)
+
+
+def main():
+    args = parse_args()
+    started_at = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        print("Step 1: Loading favorites and building the leave-k-out split...")
+        interactions = training_data_service.load_interactions(db)
+        if interactions is None:
+            print("No favorites found. Aborting.")
+            return
+        train, held_out = evaluation.leave_k_out_split(interactions, k=args.holdout, min_train=args.min_train, seed=args.seed)
+        test_users = sorted(held_out)[:args.max_users]
+        print(f"{len(train)} train favorites, {len(test_users)} test users with {args.holdout} held-out favorites each.")
+
+        with tempfile.TemporaryDirectory() as model_dir:
+            model_store = ModelStore(model_dir)
+            neighbor_index = RecipeNeighborService(model_dir, ingredient_index_service, model_store)
+            # Popularity from the train split only: counting held-out favorites would leak the test set.
+            popularity_index_service = PopularityIndexService(
+                favorite_repository, history_repository, namespace="benchmark_popularity"
+            )
+            train_counts = {}
+            for item_code in train.item_codes:
+                recipe_id = str(train.recipe_ids[item_code])
+                train_counts[recipe_id] = train_counts.get(recipe_id, 0.0) + 1.0
+            quietly(popularity_index_service.replace, train_counts, {}, publish=False)
+            pipeline = RecommendationPipeline(ingredient_index_service, neighbor_index, popularity_index_service)
+            service = RecommendationService(
+                favorite_repository, recipe_repository, ingredient_index_service, model_store,
+                recommendation_cache_service, training_data_service, user_recommendation_repository,
+                popularity_index_service, user_vector_store, pipeline,
+            )
+
+            print(f"Step 2: Training {args.algorithm.upper()} on the train split...")
+            train_started = time.perf_counter()
+            quietly(service.train_from_interactions, train, algorithm=args.algorithm)
+            training_seconds = time.perf_counter() - train_started
+            print(f"Training took {training_seconds:.2f}s.")
+
+            quietly(service._ensure_ingredient_index, db)
+            quietly(neighbor_index.build)
+            catalog_size = len(ingredient_index_service.recipe_ids)
+
+            train_favorites = {}
+            for user_code, item_code in zip(train.user_codes, train.item_codes):
+                train_favorites.setdefault(int(user_code), []).append(train.recipe_ids[item_code])
+
+            print("Step 3: Ranking held-out favorites...")
+            results = {}
+            for strategy in STRATEGIES:
+                totals = {"precision": 0.0, "recall": 0.0, "ndcg": 0.0}
+                latencies, recommended_items = [], set()
+
+                for user_code in test_users:
+                    user_id = interactions.user_ids[user_code]
+                    relevant = {interactions.recipe_ids[code] for code in held_out[user_code]}
+
+                    call_started = time.perf_counter()
+                    recommended = quietly(
+                        service.rank_recipe_ids, db, user_id, train_favorites.get(user_code, []), args.k, strategy=strategy
+                    )
+                    latencies.append(time.perf_counter() - call_started)
+
+                    recommended_items.update(recommended)
+                    for metric, value in evaluation.ranking_metrics(recommended, relevant, args.k).items():
+                        totals[metric] += value
+
+                n_users = max(len(test_users), 1)
+                results[strategy] = {
+                    f"precision@{args.k}": totals["precision"] / n_users,
+                    f"recall@{args.k}": totals["recall"] / n_users,
+                    f"ndcg@{args.k}": totals["ndcg"] / n_users,
+                    "coverage": len(recommended_items) / catalog_size if catalog_size else 0.0,
+                    "latency_ms": evaluation.latency_summary(latencies),
+                }
+    finally:
+        db.close()
+
+    report = {
+        "git_commit": git_commit(),
+        "started_at": started_at.isoformat(),
+        "config": vars(args),
+        "dataset": {
+            "favorites": len(interactions),
+            "users": interactions.n_users,
+            "recipes_with_favorites": interactions.n_items,
+            "catalog_size": catalog_size,
+            "test_users": len(test_users),
+        },
+        "training_seconds": training_seconds,
+        "results": results,
+    }
+
+    print("\n--- Results ---")
+    for strategy, metrics in results.items():
+        latency = metrics["latency_ms"]
+        print(
+            f"{strategy:>13}: P@{args.k}={metrics[f'precision@{args.k}']:.4f} R@{args.k}={metrics[f'recall@{args.k}']:.4f} "
+            f"NDCG@{args.k}={metrics[f'ndcg@{args.k}']:.4f} coverage={metrics['coverage']:.4f} "
+            f"p50={latency.get('p50', 0):.2f}ms p99={latency.get('p99', 0):.2f}ms"
+        )
+
+    output = args.output or os.path.join("benchmark_results", f"recommenders-{started_at.strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
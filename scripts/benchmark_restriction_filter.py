@@ -0,0 +1,132 @@
+import sys
+import os
+import argparse
+import random
+import time
+
+from unidecode import unidecode
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.text_matching import compile_restrictions
+
+RESTRICTION_SETS = [
+    ["sin huevo"],
+    ["sin gluten", "sin lactosa"],
+    ["sin maní", "sin nueces", "sin frutos secos"],
+    ["sin mariscos", "sin cerdo", "sin azúcar", "sin sal"],
+]
+WORDS = [
+    "pollo", "horno", "papas", "torta", "chocolate", "huevos", "huevón", "harina", "leche", "lactosa", "gluten",
+    "maní", "mani", "nuez", "nueces", "camarones", "cerdo", "azúcar", "sal", "salsa", "sopa", "arroz", "fácil",
+    "casera", "receta", "tradicional", "boliviana", "sin", "con", "de", "al",
+]
+
+# (restrictions, text, expected_to_be_discarded)
+CASES = [
+    (["sin huevo"], "Tortilla con huevos y papas", True),
+    (["sin huevo"], "Tortilla con Huevo", True),
+    (["sin huevo"], "El huevón de la cocina prepara pollo", False),
+    (["sin nueces"], "Brownie con nuez", True),
+    (["sin nuez"], "Pan con NUECES tostadas", True),
+    (["sin maní"], "Sopa de mani boliviana", True),
+    (["sin mani"], "Salsa de maní", True),
+    (["sin maní"], "Manicura casera", False),
+    (["sin sal"], "Pollo en salsa de tomate", False),
+    (["sin sal"], "Papas con sal gruesa", True),
+    (["sin pan"], "Panes de ajo", True),
+    (["sin pan"], "Panqueques de avena", False),
+    (["sin lácteos"], "Flan con lacteo vegetal", True),
+    (["sin azúcar"], "Torta sin azucares añadidos", True),
+    (["sin frutos de mar"], "Arroz de la casa", False),
+    (["sin frutos de mar"], "Arroz con frutos del mar", True),
+    (["sin gluten", "sin lactosa"], "Pan de molde sin TACC", False),
+    (["sin gluten", "sin lactosa"], "Leche sin lactosa", True),
+    (["sin carnes"], "Carne molida con papas", True),
+    (["sin carne"], "Carnes rojas a la parrilla", True),
+    (["sin dulces"], "Dulce de leche casero", True),
+    (["sin postres"], "Postre de maracuyá", True),
+    (["sin verdes"], "Ensalada verde", True),
+    (["sin nueces"], "Nuez moscada", True),
+    (["sin panes"], "Pan amasado", True),
+    (["sin tomates"], "Salsa de tomate", True),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Verifica y mide el filtro de restricciones de búsqueda (versión compilada vs. anterior).")
+    parser.add_argument("--items", type=int, default=10000, help="Resultados sintéticos a filtrar por iteración.")
+    parser.add_argument("--rounds", type=int, default=20, help="Iteraciones por conjunto de restricciones.")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def legacy_filter(items, restrictions):
+    words_to_exclude = set()
+    for restriction in restrictions:
+        term_to_exclude = unidecode(restriction.replace("sin", "").strip().lower())
+        for word in term_to_exclude.split():
+            if word:
+                words_to_exclude.add(word)
+    if not words_to_exclude:
+        return items
+    filtered_items = []
+    for item in items:
+        text_to_review = unidecode(f"{item.get('title', '')} {item.get('snippet', '')}".lower())
+        if not any(word in text_to_review for word in words_to_exclude):
+            filtered_items.append(item)
+    return filtered_items
+
+
+def compiled_filter(items, restrictions):
+    kept, _ = compile_restrictions(restrictions).filter(
+        items, lambda item: f"{item.get('title', '')} {item.get('snippet', '')}"
+    )
+    return kept
+
+
+def check_correctness():
+    failures = 0
+    for restrictions, text, expected in CASES:
+        discarded = compile_restrictions(restrictions).matches(text)
+        status = "ok" if discarded == expected else "FAIL"
+        failures += discarded != expected
+        print(f"  [{status:>4}] {restrictions} | '{text}' -> {'descartado' if discarded else 'conservado'}")
+    assert compile_restrictions(["sin Maní"]) is compile_restrictions(["sin maní "]), "matcher is not cached per restriction set"
+    assert compile_restrictions(["sin frutos de mar"]).words == ["frutos", "mar"], "stopwords must not become exclusions"
+    return failures
+
+
+def main():
+    args = parse_args()
+    print("--- Correctness checks ---")
+    failures = check_correctness()
+    if failures:
+        print(f"{failures} correctness checks failed.")
+        sys.exit(1)
+    print(f"All {len(CASES)} correctness checks passed.")
+
+    rng = random.Random(args.seed)
+    items = [{
+        "title": " ".join(rng.choices(WORDS, k=6)).capitalize(),
+        "snippet": " ".join(rng.choices(WORDS, k=20)),
+    } for _ in range(args.items)]
+
+    print(f"\n--- Benchmark: {args.items} results x {args.rounds} rounds ---")
+    for restrictions in RESTRICTION_SETS:
+        timings = {}
+        for name, fn in (("legacy", legacy_filter), ("compiled", compiled_filter)):
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                kept = fn(items, restrictions)
+            timings[name] = (time.perf_counter() - started) / args.rounds
+            timings[f"{name}_kept"] = len(kept)
+        print(
+            f"{', '.join(restrictions):<45} legacy {timings['legacy'] * 1000:7.2f} ms (kept {timings['legacy_kept']:>5}) | "
+            f"compiled {timings['compiled'] * 1000:7.2f} ms (kept {timings['compiled_kept']:>5}) | "
+            f"x{timings['legacy'] / timings['compiled']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
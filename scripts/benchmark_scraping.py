@@ -0,0 +1,134 @@
+import sys
+import os
+import argparse
+import asyncio
+import hashlib
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from recipe_scrapers import scrape_me
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# recipe-scrapers only parses hosts it supports, so the local site acts as an HTTP proxy for this one.
+RECIPE_HOST = "www.allrecipes.com"
+DISHES = ["Silpancho", "Pique macho", "Sopa de maní", "Majadito", "Ají de fideo", "Chairo", "Sajta de pollo", "Fricasé"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Prueba de carga del scraping de recetas contra un sitio de recetas local (bloqueante vs. cliente asíncrono compartido vs. revalidación condicional).")
+    parser.add_argument("--recipes", type=int, default=40, help="Recetas distintas a extraer de forma concurrente.")
+    parser.add_argument("--latency-ms", type=float, default=250.0, help="Latencia artificial del sitio local por página.")
+    parser.add_argument("--steps", type=int, default=40, help="Pasos por receta (aumenta el coste de parseo).")
+    return parser.parse_args()
+
+
+def recipe_page(recipe_id: int, steps: int) -> bytes:
+    name = f"{DISHES[recipe_id % len(DISHES)]} #{recipe_id}"
+    recipe = {
+        "@context": "https://schema.org",
+        "@type": "Recipe",
+        "name": name,
+        "image": f"https://recetas.local/img/{recipe_id}.jpg",
+        "recipeYield": "4 porciones",
+        "recipeIngredient": [f"{grams} g de ingrediente {i}" for i, grams in enumerate(range(50, 550, 50))],
+        "recipeInstructions": [{"@type": "HowToStep", "text": f"Paso {i + 1} de {name}: mezclar y cocinar."} for i in range(steps)],
+    }
+    filler = "".join(f"<p>Comentario {i} sobre la receta.</p>" for i in range(200))
+    return (
+        f"<html><head><title>{name}</title><script type=\"application/ld+json\">{json.dumps(recipe)}</script>"
+        f"</head><body><h1>{name}</h1>{filler}</body></html>"
+    ).encode("utf-8")
+
+
+def start_recipe_site(latency_ms: float, steps: int):
+    class RecipeSiteHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency_ms / 1000)
+            # As a proxy the request line carries the absolute URL, e.g. http://www.allrecipes.com/recipe/7/
+            body = recipe_page(int(self.path.rstrip("/").rsplit("/", 1)[-1]), steps)
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RecipeSiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+async def blocking_scrape(url: str):
+    # Previous implementation: scrape_me fetches and parses synchronously inside the coroutine.
+    scraper = scrape_me(url)
+    return {"title": scraper.title(), "ingredients": scraper.ingredients()}
+
+
+async def measure(scrape, urls):
+    stalls = []
+    running = True
+
+    async def heartbeat():
+        while running:
+            tick = time.perf_counter()
+            await asyncio.sleep(0.01)
+            stalls.append(time.perf_counter() - tick - 0.01)
+
+    monitor = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    results = await asyncio.gather(*[scrape(url) for url in urls], return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    running = False
+    await monitor
+    failures = [result for result in results if isinstance(result, Exception)]
+    return elapsed, max(stalls, default=0.0), failures
+
+
+async def run_passes(args, scraping_service):
+    for label, scrape, offset in (
+        ("blocking scrape_me", blocking_scrape, 0),
+        ("pooled AsyncClient", scraping_service.scrape_recipe_from_url, args.recipes),
+        ("revalidated (304)", scraping_service.scrape_recipe_from_url, args.recipes),
+    ):
+        urls = [f"http://{RECIPE_HOST}/recipe/{offset + i}/" for i in range(args.recipes)]
+        elapsed, worst_stall, failures = await measure(scrape, urls)
+        print(f"{label:<20} {elapsed:6.2f} s total | {args.recipes / elapsed:6.1f} recipes/s | "
+              f"worst event-loop stall {worst_stall * 1000:7.1f} ms | {len(failures)} failures")
+        for failure in failures[:3]:
+            print(f"  {type(failure).__name__}: {failure}")
+
+
+def main():
+    args = parse_args()
+    server, base_url = start_recipe_site(args.latency_ms, args.steps)
+    os.environ["HTTP_PROXY"] = os.environ["http_proxy"] = base_url
+    os.environ["PAGE_CACHE_DIR"] = tempfile.mkdtemp(prefix="page_cache_")
+    # Imported after the proxy and cache dir are set: the service reads them when it is created.
+    from app.services.scraping_service import scraping_service
+
+    print(f"Local recipe site at {base_url} ({args.latency_ms:.0f} ms latency, {args.recipes} recipes).")
+
+    # One event loop for every pass: the shared client keeps its pooled connections on it.
+    asyncio.run(run_passes(args, scraping_service))
+    if scraping_service.page_cache is not None:
+        print(f"Page cache: {scraping_service.page_cache.stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
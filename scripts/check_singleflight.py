@@ -0,0 +1,112 @@
+import sys
+import os
+import argparse
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.ai_agents_service import ai_agents_service
+from app.services.search_service import search_service
+from app.services.supermarket_service import supermarket_service
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Comprueba que N llamadas concurrentes idénticas a n8n, Custom Search y Places generan una sola petición al servicio externo.")
+    parser.add_argument("--callers", type=int, default=50, help="Llamadas concurrentes idénticas por servicio.")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Latencia artificial del servidor local.")
+    return parser.parse_args()
+
+
+def start_upstream(latency_ms: float):
+    hits = Counter()
+    lock = threading.Lock()
+
+    class UpstreamHandler(BaseHTTPRequestHandler):
+        def _reply(self):
+            path = urlparse(self.path).path
+            with lock:
+                hits[path] += 1
+            time.sleep(latency_ms / 1000)
+            if path.startswith("/webhook"):
+                body = {"clasification": "SIN_RESTRICCION", "base_search": "pollo", "ingredient": "Pollo"}
+            elif path.startswith("/customsearch"):
+                body = {"items": [{"title": "Pollo al horno", "link": "https://recetas.local/pollo"}]}
+            else:
+                body = {"status": "OK", "results": []}
+            encoded = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def do_GET(self):
+            self._reply()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._reply()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), UpstreamHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", hits
+
+
+async def run_async_callers(callers: int):
+    await asyncio.gather(*[
+        ai_agents_service._call_n8n_webhook_async("/webhook/analyze", {"query": "pollo al horno"}) for _ in range(callers)
+    ])
+    await asyncio.gather(*[
+        search_service._cse_list(search_service.search_recipe_engine_id, "pollo al horno", 1, 10) for _ in range(callers)
+    ])
+
+
+def run_threaded_callers(callers: int, fn, *args):
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        for future in [executor.submit(fn, *args) for _ in range(callers)]:
+            future.result()
+
+
+def main():
+    args = parse_args()
+    server, base_url, hits = start_upstream(args.latency_ms)
+    ai_agents_service.base_url = base_url
+    search_service.cse_url = f"{base_url}/customsearch/v1"
+    supermarket_service.base_url = f"{base_url}/maps/api"
+    supermarket_service.api_key = supermarket_service.api_key or "local"
+
+    started = time.perf_counter()
+    asyncio.run(run_async_callers(args.callers))
+    run_threaded_callers(args.callers, ai_agents_service._call_n8n_webhook, "/webhook/enrich", {"ingredients": ["pollo"]})
+    run_threaded_callers(args.callers, supermarket_service._make_request, "place/textsearch/json", {"query": "supermercados en La Paz"})
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    checks = [
+        ("n8n (async)", "/webhook/analyze", ai_agents_service.async_flights),
+        ("Custom Search (async)", "/customsearch/v1", search_service.cse_flights),
+        ("n8n (sync)", "/webhook/enrich", ai_agents_service.flights),
+        ("Places (sync)", "/maps/api/place/textsearch/json", supermarket_service.flights),
+    ]
+    failures = 0
+    for label, path, flights in checks:
+        ok = hits[path] == 1
+        failures += not ok
+        print(f"[{'ok' if ok else 'FAIL':>4}] {label:<22} {args.callers} callers -> {hits[path]} upstream hit(s) "
+              f"(executed={flights.executed}, shared={flights.shared})")
+    print(f"Total time: {elapsed:.2f}s ({args.latency_ms:.0f} ms upstream latency).")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
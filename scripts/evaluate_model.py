@@ -1,33 +1,214 @@
 import sys
 import os
-import pandas as pd
-from surprise import Dataset, Reader, SVD
+import argparse
+import itertools
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from surprise import Dataset, Reader, SVD, Trainset
 from surprise.model_selection import cross_validate
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.core.database import SessionLocal
-from app.repositories.favorite_repository import favorite_repository
+from app.services.evaluation_service import recommendation_evaluation_service as evaluation
+from app.services.training_data_service import training_data_service
+
+_split: Dict[str, Any] = {}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evalúa el modelo SVD o busca sus mejores hiperparámetros.")
+    parser.add_argument("--search", choices=["grid", "random"], default=None, help="Busca hiperparámetros en paralelo en lugar de la validación cruzada.")
+    parser.add_argument("--factors", default="50,100,150", help="Valores de n_factors separados por comas (en 'random', el rango min-max).")
+    parser.add_argument("--epochs", default="20,30", help="Valores de n_epochs separados por comas.")
+    parser.add_argument("--reg", default="0.01,0.02,0.05", help="Valores de regularización separados por comas.")
+    parser.add_argument("--lr", default="0.005,0.01", help="Valores de tasa de aprendizaje separados por comas.")
+    parser.add_argument("--trials", type=int, default=20, help="(random) Número de configuraciones a probar.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Procesos en paralelo.")
+    parser.add_argument("--holdout", type=int, default=2, help="Favoritos reservados por usuario para la prueba.")
+    parser.add_argument("--min-train", type=int, default=2, help="Favoritos mínimos que conserva cada usuario para entrenar.")
+    parser.add_argument("--k", type=int, default=10, help="Corte para precision/recall/NDCG.")
+    parser.add_argument("--max-users", type=int, default=2000, help="Máximo de usuarios de prueba.")
+    parser.add_argument("--top", type=int, default=10, help="Filas a mostrar en la tabla de resultados.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--promote", action="store_true", help="Guarda la mejor configuración para train_and_save_model.")
+    return parser.parse_args()
+
+
+def parse_values(raw: str, cast) -> List[Any]:
+    return [cast(value) for value in raw.split(",") if value.strip()]
+
+
+def build_trials(args) -> List[Dict[str, Any]]:
+    factors, epochs = parse_values(args.factors, int), parse_values(args.epochs, int)
+    regs, lrs = parse_values(args.reg, float), parse_values(args.lr, float)
+    if args.search == "grid":
+        return [
+            {"n_factors": f, "n_epochs": e, "reg_all": r, "lr_all": lr}
+            for f, e, r, lr in itertools.product(factors, epochs, regs, lrs)
+        ]
+
+    rng = np.random.default_rng(args.seed)
+
+    def log_uniform(values: List[float]) -> float:
+        return float(np.exp(rng.uniform(np.log(min(values)), np.log(max(values)))))
+
+    return [{
+        "n_factors": int(rng.integers(min(factors), max(factors) + 1)),
+        "n_epochs": int(rng.integers(min(epochs), max(epochs) + 1)),
+        "reg_all": round(log_uniform(regs), 5),
+        "lr_all": round(log_uniform(lrs), 5),
+    } for _ in range(args.trials)]
+
+
+def save_split(path: str, train, held_out: Dict[int, set], test_users: List[int], k: int, seed: int) -> None:
+    held_out_users = np.repeat(test_users, [len(held_out[user]) for user in test_users])
+    held_out_items = np.concatenate([sorted(held_out[user]) for user in test_users]) if test_users else np.empty(0)
+    np.savez(
+        path,
+        user_codes=train.user_codes,
+        item_codes=train.item_codes,
+        n_users=train.n_users,
+        n_items=train.n_items,
+        test_users=np.asarray(test_users, dtype=np.int64),
+        held_out_users=held_out_users.astype(np.int64),
+        held_out_items=held_out_items.astype(np.int64),
+        k=k,
+        seed=seed,
+    )
+
+
+def _load_split(path: str) -> None:
+    with np.load(path) as stored:
+        user_codes, item_codes = stored["user_codes"], stored["item_codes"]
+        n_users, n_items = int(stored["n_users"]), int(stored["n_items"])
+        test_users = stored["test_users"]
+        held_out_users, held_out_items = stored["held_out_users"], stored["held_out_items"]
+        _split["k"], _split["seed"] = int(stored["k"]), int(stored["seed"])
+
+    # Raw ids are the dense codes themselves, so inner ids line up with the cached arrays.
+    ur, ir = {}, {}
+    for user, item in zip(user_codes.tolist(), item_codes.tolist()):
+        ur.setdefault(user, []).append((item, 1.0))
+        ir.setdefault(item, []).append((user, 1.0))
+    _split["trainset"] = Trainset(
+        ur, ir, n_users, n_items, len(user_codes), (0, 1),
+        {user: user for user in range(n_users)}, {item: item for item in range(n_items)},
+    )
+    _split["train_matrix"] = csr_matrix(
+        (np.ones(len(user_codes), dtype=np.float32), (user_codes, item_codes)), shape=(n_users, n_items)
+    )
+    _split["trained_items"] = np.bincount(item_codes, minlength=n_items) > 0
+    _split["test_users"] = test_users
+    _split["relevant"] = {}
+    for user, item in zip(held_out_users.tolist(), held_out_items.tolist()):
+        _split["relevant"].setdefault(user, set()).add(item)
+
+
+def run_trial(params: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    model = SVD(random_state=_split["seed"], **params)
+    model.fit(_split["trainset"])
+
+    trained = _split["trained_items"]
+    item_factors = np.where(trained[:, None], model.qi, 0.0)
+    item_bias = np.where(trained, model.bi, 0.0)
+    train_matrix, k = _split["train_matrix"], _split["k"]
+
+    totals = {"precision": 0.0, "recall": 0.0, "ndcg": 0.0}
+    test_users = _split["test_users"]
+    for start in range(0, len(test_users), 256):
+        users = test_users[start:start + 256]
+        scores = model.pu[users] @ item_factors.T + item_bias
+        seen = train_matrix[users].tocoo()
+        scores[seen.row, seen.col] = -np.inf
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable"), axis=1)
+        for user, recommended in zip(users.tolist(), top.tolist()):
+            for metric, value in evaluation.ranking_metrics(recommended, _split["relevant"][user], k).items():
+                totals[metric] += value
+
+    n_users = max(len(test_users), 1)
+    return {
+        "params": params,
+        **{metric: value / n_users for metric, value in totals.items()},
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def search(args):
+    print(f"--- Starting SVD Hyperparameter Search ({args.search}) ---")
+    db = SessionLocal()
+    try:
+        print("Step 1: Fetching favorite data...")
+        interactions = training_data_service.load_interactions(db)
+    finally:
+        db.close()
+
+    if interactions is None or len(interactions) < 20:
+        print("Not enough data to perform a meaningful search.")
+        return
+
+    train, held_out = evaluation.leave_k_out_split(interactions, k=args.holdout, min_train=args.min_train, seed=args.seed)
+    test_users = sorted(held_out)[:args.max_users]
+    if not test_users:
+        print("No user has enough favorites for a held-out split. Aborting.")
+        return
+    trials = build_trials(args)
+    workers = max(1, min(args.workers or 1, len(trials)))
+    print(f"{len(train)} train favorites, {len(test_users)} test users; {len(trials)} trials on {workers} workers.")
+
+    started = time.perf_counter()
+    results = []
+    with tempfile.TemporaryDirectory() as split_dir:
+        split_path = os.path.join(split_dir, "split.npz")
+        save_split(split_path, train, held_out, test_users, args.k, args.seed)
+
+        print("Step 2: Running trials...")
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_load_split, initargs=(split_path,)) as executor:
+            futures = [executor.submit(run_trial, params) for params in trials]
+            for completed, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                results.append(result)
+                print(f"  [{completed}/{len(trials)}] NDCG@{args.k}={result['ndcg']:.4f} in {result['seconds']:.1f}s {result['params']}")
+
+    results.sort(key=lambda result: result["ndcg"], reverse=True)
+    print(f"\n--- Leaderboard ({time.perf_counter() - started:.1f}s total) ---")
+    print(f"{'#':>3} {'NDCG@' + str(args.k):>9} {'P@' + str(args.k):>8} {'R@' + str(args.k):>8} "
+          f"{'factors':>8} {'epochs':>7} {'reg':>8} {'lr':>8} {'time':>7}")
+    for rank, result in enumerate(results[:args.top], start=1):
+        params = result["params"]
+        print(f"{rank:>3} {result['ndcg']:>9.4f} {result['precision']:>8.4f} {result['recall']:>8.4f} "
+              f"{params['n_factors']:>8} {params['n_epochs']:>7} {params['reg_all']:>8.4f} {params['lr_all']:>8.4f} {result['seconds']:>6.1f}s")
+
+    if args.promote:
+        from app.services.recommendation_service import recommendation_service
+        recommendation_service.save_svd_params({**results[0]["params"], "random_state": args.seed})
+        print("Best configuration promoted; the next SVD training run will use it.")
+
 
 def evaluate():
     print("--- Starting Recommendation Model Evaluation ---")
     db = SessionLocal()
     try:
         print("Step 1: Fetching favorite data...")
-        all_favorites = favorite_repository.get_multi(db, limit=100000)
-        
-        if not all_favorites or len(all_favorites) < 20:
+        interactions = training_data_service.load_interactions(db)
+
+        if interactions is None or len(interactions) < 20:
             print("Not enough data to perform a meaningful evaluation.")
             return
 
-        print(f"Found {len(all_favorites)} favorite records.")
+        print(f"Found {len(interactions)} favorite records.")
+
+        df = interactions.to_frame()
 
-        data = [
-            {"user_id": str(fav.user_id), "recipe_id": str(fav.recipe_id), "rating": 1}
-            for fav in all_favorites
-        ]
-        df = pd.DataFrame(data)
-        
         reader = Reader(rating_scale=(0, 1))
         dataset = Dataset.load_from_df(df[['user_id', 'recipe_id', 'rating']], reader)
 
@@ -40,7 +221,7 @@ def evaluate():
         print("\n--- Evaluation Results ---")
         mean_rmse = results['test_rmse'].mean()
         mean_mae = results['test_mae'].mean()
-        
+
         print(f"Average RMSE: {mean_rmse:.4f}")
         print(f"Average MAE:  {mean_mae:.4f}")
         print("\nReminder: Lower values indicate better model performance.")
@@ -49,4 +230,8 @@ def evaluate():
         db.close()
 
 if __name__ == "__main__":
-    evaluate()
+    args = parse_args()
+    if args.search:
+        search(args)
+    else:
+        evaluate()
@@ -0,0 +1,92 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DISHES = ["Pollo al horno", "Sopa de maní", "Torta de chocolate", "Silpancho", "Ensalada de quinua", "Pique macho", "Flan casero", "Majadito"]
+EXTRAS = ["con papas", "sin gluten", "con queso", "al estilo casero", "con leche", "vegano", "con maní", "rápido"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Servidor local que imita la API de Google Custom Search para pruebas sin consumir cuota.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Latencia artificial por petición.")
+    parser.add_argument("--total-results", type=int, default=100, help="Resultados totales disponibles por consulta.")
+    return parser.parse_args()
+
+
+def build_items(query: str, start: int, num: int, total: int, search_type: str):
+    items = []
+    for position in range(start, min(start + num, total + 1)):
+        digest = int(hashlib.sha1(f"{query}:{position}".encode("utf-8")).hexdigest(), 16)
+        title = f"{DISHES[digest % len(DISHES)]} {EXTRAS[(digest // 7) % len(EXTRAS)]}"
+        if search_type == "image":
+            items.append({
+                "title": title,
+                "link": f"https://images.recetas.local/{digest % 100000}.jpg",
+                "image": {"contextLink": f"https://recetas.local/ingredientes/{digest % 100000}"},
+            })
+        else:
+            items.append({
+                "title": title,
+                "link": f"https://recetas.local/recetas/{digest % 100000}",
+                "snippet": f"Receta de {title.lower()} paso a paso.",
+                "pagemap": {"cse_image": [{"src": f"https://images.recetas.local/{digest % 100000}.jpg"}]},
+            })
+    return items
+
+
+def make_handler(args, counter):
+    class FakeCSEHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path != "/customsearch/v1":
+                self.send_error(404)
+                return
+            params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+            with counter["lock"]:
+                counter["requests"] += 1
+                request_number = counter["requests"]
+
+            time.sleep(args.latency_ms / 1000)
+            start, num = int(params.get("start", 1)), int(params.get("num", 10))
+            items = build_items(params.get("q", ""), start, num, args.total_results, params.get("searchType", ""))
+            body = json.dumps({
+                "searchInformation": {"totalResults": str(args.total_results)},
+                "items": items,
+            }).encode("utf-8")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            print(f"#{request_number} q={params.get('q', '')!r} start={start} num={num} -> {len(items)} items")
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeCSEHandler
+
+
+def main():
+    args = parse_args()
+    counter = {"requests": 0, "lock": threading.Lock()}
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args, counter))
+    print(f"Fake Custom Search API listening on http://{args.host}:{args.port}/ "
+          f"(set GOOGLE_CSE_API_ENDPOINT=http://{args.host}:{args.port}/)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {counter['requests']} requests.")
+
+
+if __name__ == "__main__":
+    main()
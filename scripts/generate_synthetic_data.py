@@ -0,0 +1,246 @@
+import sys
+import os
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.security import get_password_hash
+from app.models.favorite import Favorite
+from app.models.history import History
+from app.models.recipe import RECIPE_SEARCH_VECTOR_DDL, Recipe
+from app.models.user import User
+from app.models.user_recommendation import UserRecommendation
+from app.models.ingredient_catalog import IngredientCatalogEntry
+from app.services.recipe_service import recipe_service
+
+CATEGORIES: Dict[str, Dict[str, List[str]]] = {
+    "Vegano": {
+        "dishes": ["Ensalada de quinua", "Hamburguesa de lentejas", "Curry de garbanzos", "Tacos de champiñones", "Buddha bowl", "Guiso de verduras"],
+        "ingredients": ["quinua", "lentejas", "garbanzos", "tofu", "champiñones", "espinaca", "palta", "leche de almendras", "zanahoria", "brócoli", "berenjena", "calabacín"],
+    },
+    "Carne": {
+        "dishes": ["Asado de res", "Lomo saltado", "Pollo al horno", "Costillas de cerdo", "Milanesa de carne", "Estofado de res"],
+        "ingredients": ["carne de res", "pechuga de pollo", "costillas de cerdo", "chorizo", "tocino", "carne molida", "lomo de res", "muslos de pollo"],
+    },
+    "Postres": {
+        "dishes": ["Torta de chocolate", "Flan casero", "Galletas de avena", "Budín de pan", "Arroz con leche", "Tres leches"],
+        "ingredients": ["harina", "azúcar", "huevos", "mantequilla", "leche", "cacao en polvo", "esencia de vainilla", "leche condensada", "canela", "polvo de hornear"],
+    },
+    "Sopas": {
+        "dishes": ["Sopa de maní", "Crema de zapallo", "Caldo de pollo", "Sopa de fideos", "Chupe de camarones", "Sopa de verduras"],
+        "ingredients": ["maní", "zapallo", "fideos", "papa", "caldo de pollo", "apio", "choclo", "arvejas", "camarones", "perejil"],
+    },
+    "Boliviana": {
+        "dishes": ["Salteñas", "Silpancho", "Majadito", "Pique macho", "Sajta de pollo", "Fricasé"],
+        "ingredients": ["ají amarillo", "chuño", "papa", "arroz", "huevos", "carne de res", "locoto", "charque", "plátano", "comino"],
+    },
+    "Comida rapida": {
+        "dishes": ["Hamburguesa clásica", "Pizza casera", "Hot dog", "Sándwich de pollo", "Papas fritas", "Nuggets caseros"],
+        "ingredients": ["pan de hamburguesa", "queso cheddar", "salchicha", "masa de pizza", "salsa de tomate", "mayonesa", "mostaza", "pepinillos", "pan molde", "queso mozzarella"],
+    },
+}
+COMMON_INGREDIENTS = ["sal", "pimienta", "aceite", "ajo", "cebolla", "tomate", "orégano", "agua", "limón", "cilantro"]
+UNITS = ["tazas de", "cucharadas de", "cucharaditas de", "gramos de", "unidades de", "pizca de"]
+DIRECTION_TEMPLATES = [
+    "Pica finamente {a} y {b}.",
+    "Calienta el aceite en una olla y sofríe {a}.",
+    "Agrega {b} y cocina a fuego medio por {m} minutos.",
+    "Mezcla {a} con {b} hasta integrar.",
+    "Sazona con sal y pimienta al gusto.",
+    "Hornea a 180 °C durante {m} minutos.",
+    "Deja reposar {m} minutos antes de servir.",
+    "Sirve caliente acompañado de {b}.",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Genera un conjunto de datos sintético y reproducible para pruebas de escala.")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--recipes", type=int, default=10000)
+    parser.add_argument("--favorites-per-user", type=float, default=8.0, help="Media de favoritos por usuario (distribución de cola larga).")
+    parser.add_argument("--history-per-user", type=float, default=4.0, help="Media de entradas de historial por usuario.")
+    parser.add_argument("--zipf-exponent", type=float, default=1.1, help="Exponente de la ley de potencia de popularidad de recetas.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--prefix", default="synthetic", help="Prefijo para nombres de usuario, correos y URLs generadas.")
+    parser.add_argument("--database-url", default=None, help="Base de datos destino (por defecto DATABASE_URL). Ej: sqlite:///synthetic.db")
+    return parser.parse_args()
+
+
+def seeded_uuid(rng: np.random.Generator) -> uuid.UUID:
+    return uuid.UUID(bytes=rng.bytes(16), version=4)
+
+
+def long_tail_counts(rng: np.random.Generator, n: int, mean: float, cap: int) -> np.ndarray:
+    sigma = 1.0
+    counts = rng.lognormal(mean=np.log(max(mean, 1e-6)) - sigma ** 2 / 2, sigma=sigma, size=n)
+    return np.clip(np.rint(counts), 0, cap).astype(np.int64)
+
+
+def batched(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_insert(engine, model, rows: Iterator[dict], batch_size: int) -> int:
+    total = 0
+    with engine.begin() as conn:
+        for batch in batched(rows, batch_size):
+            conn.execute(insert(model.__table__), batch)
+            total += len(batch)
+    print(f"  -> {total} rows inserted into '{model.__tablename__}'.")
+    return total
+
+
+def build_recipe(seed: int, index: int, category: str, prefix: str) -> dict:
+    rng = np.random.default_rng([seed, index])
+    pool = CATEGORIES[category]
+    dish = pool["dishes"][rng.integers(len(pool["dishes"]))]
+    n_main = int(rng.integers(3, min(7, len(pool["ingredients"])) + 1))
+    main = list(rng.choice(pool["ingredients"], size=n_main, replace=False))
+    common = list(rng.choice(COMMON_INGREDIENTS, size=int(rng.integers(2, 5)), replace=False))
+
+    ingredients = [
+        f"{int(rng.integers(1, 5))} {UNITS[rng.integers(len(UNITS))]} {name}"
+        for name in main + common
+    ]
+    directions = []
+    for template in rng.choice(DIRECTION_TEMPLATES, size=int(rng.integers(3, 7)), replace=False):
+        a, b = rng.choice(main + common, size=2, replace=False)
+        directions.append(template.format(a=a, b=b, m=int(rng.integers(5, 60))))
+
+    return {
+        "recipe_name": f"{dish} {index}",
+        "servings": int(rng.integers(1, 9)),
+        "ingredients": "\n".join(ingredients),
+        "directions": "\n".join(directions),
+        "url": f"https://{prefix}.local/recetas/{index}",
+        "cuisine_path": f"/{category}/",
+    }
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    engine = create_engine(args.database_url or settings.DATABASE_URL)
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+
+    print("--- Starting Synthetic Data Generation ---")
+    Base.metadata.create_all(bind=engine)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.execute(RECIPE_SEARCH_VECTOR_DDL)
+
+    categories = list(CATEGORIES)
+    recipe_categories = rng.integers(len(categories), size=args.recipes)
+    recipe_ids = [seeded_uuid(rng) for _ in range(args.recipes)]
+
+    popularity = 1.0 / np.arange(1, args.recipes + 1) ** args.zipf_exponent
+    popularity = popularity[rng.permutation(args.recipes)]
+    by_category = {c: np.flatnonzero(recipe_categories == c) for c in range(len(categories))}
+    category_weights = {c: popularity[rows] / popularity[rows].sum() for c, rows in by_category.items() if len(rows)}
+    global_weights = popularity / popularity.sum()
+
+    print(f"\nStep 1: Inserting {args.recipes} recipes...")
+
+    def recipe_rows():
+        for index in range(args.recipes):
+            row = build_recipe(args.seed, index, categories[recipe_categories[index]], args.prefix)
+            row["id"] = recipe_ids[index]
+            row["created_at"] = now - timedelta(days=float(rng.uniform(0, 365)))
+            yield row
+
+    totals = {"recipes": bulk_insert(engine, Recipe, recipe_rows(), args.batch_size)}
+
+    print(f"\nStep 2: Inserting {args.users} users...")
+    password_hash = get_password_hash("string")
+    user_ids = [seeded_uuid(rng) for _ in range(args.users)]
+    totals["users"] = bulk_insert(engine, User, ({
+        "id": user_ids[i],
+        "username": f"{args.prefix}_user_{i}",
+        "email": f"{args.prefix}_user_{i}@example.com",
+        "password": password_hash,
+        "is_active": True,
+        "created_at": now - timedelta(days=float(rng.uniform(0, 365))),
+    } for i in range(args.users)), args.batch_size)
+
+    def sample_recipes(n: int) -> np.ndarray:
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        liked = [c for c in rng.choice(list(category_weights), size=int(rng.integers(1, 3)), replace=False)]
+        n_affinity = int(round(n * 0.7))
+        picks = [rng.choice(args.recipes, size=n - n_affinity, p=global_weights)]
+        for position, category in enumerate(liked):
+            share = n_affinity // len(liked) + (1 if position < n_affinity % len(liked) else 0)
+            picks.append(by_category[category][rng.choice(len(by_category[category]), size=share, p=category_weights[category])])
+        return np.unique(np.concatenate(picks))
+
+    print("\nStep 3: Inserting power-law favorites...")
+    favorite_counts = long_tail_counts(rng, args.users, args.favorites_per_user, cap=max(args.recipes // 2, 1))
+
+    def favorite_rows():
+        for user_index, count in enumerate(favorite_counts):
+            for recipe_index in sample_recipes(int(count)):
+                yield {
+                    "id": seeded_uuid(rng),
+                    "user_id": user_ids[user_index],
+                    "recipe_id": recipe_ids[recipe_index],
+                    "created_at": now - timedelta(days=float(rng.exponential(60))),
+                }
+
+    totals["favorites"] = bulk_insert(engine, Favorite, favorite_rows(), args.batch_size)
+
+    print("\nStep 4: Inserting power-law history entries...")
+    history_counts = long_tail_counts(rng, args.users, args.history_per_user, cap=max(args.recipes // 2, 1))
+
+    def history_rows():
+        for user_index, count in enumerate(history_counts):
+            for recipe_index in sample_recipes(int(count)):
+                doc = build_recipe(args.seed, int(recipe_index), categories[recipe_categories[recipe_index]], args.prefix)
+                viewed_at = now - timedelta(days=float(rng.exponential(30)))
+                yield {
+                    "id": seeded_uuid(rng),
+                    "user_id": user_ids[user_index],
+                    "recipe_data": {
+                        "title": doc["recipe_name"],
+                        "image_url": None,
+                        "servings": doc["servings"],
+                        "ingredients": doc["ingredients"].split("\n"),
+                        "directions": doc["directions"].split("\n"),
+                        "url": doc["url"],
+                    },
+                    "source_url": doc["url"],
+                    "is_adapted": False,
+                    "created_at": viewed_at,
+                    "updated_at": viewed_at,
+                }
+
+    totals["history"] = bulk_insert(engine, History, history_rows(), args.batch_size)
+
+    # Bulk inserts skip RecipeService, so append the new recipes to an existing ingredient index here.
+    with Session(bind=engine) as db:
+        recipe_service.sync_ingredient_index(db)
+
+    summary = ", ".join(f"{count} {table}" for table, count in totals.items())
+    print(f"\n--- Synthetic data generated in {time.perf_counter() - started:.1f}s ({summary}, seed={args.seed}) ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.services.recommendation_batch_service import recommendation_batch_service
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Precalcula las recomendaciones de todos los usuarios en la tabla user_recommendations.")
+    parser.add_argument("--top-n", type=int, default=None, help="Recomendaciones guardadas por usuario.")
+    parser.add_argument("--batch-size", type=int, default=None, help="Usuarios por lote vectorizado.")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos del pool (por defecto, todos los núcleos).")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Iniciando el precálculo de recomendaciones...")
+    workers = args.workers or settings.RECOMMENDATION_PRECOMPUTE_WORKERS or os.cpu_count() or 1
+    recommendation_batch_service.precompute_all(n_recs=args.top_n, batch_size=args.batch_size, workers=workers)
+    print("El precálculo de recomendaciones ha finalizado.")
+
+if __name__ == "__main__":
+    main()
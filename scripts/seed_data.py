@@ -7,7 +7,12 @@ from app.core.database import SessionLocal, engine, Base
 from app.models.user import User
 from app.models.recipe import Recipe
 from app.models.favorite import Favorite
+from app.models.user_recommendation import UserRecommendation
+from app.models.ingredient_catalog import IngredientCatalogEntry
 from app.core.security import get_password_hash
+from app.repositories.recipe_repository import recipe_repository
+from app.services.recipe_search_service import recipe_search_service
+from app.services.recipe_service import recipe_service
 from app.services.scraping_service import scraping_service
 
 RECIPES_BY_CATEGORY = {
@@ -57,6 +62,9 @@ async def seed():
     try:
         print("\nStep 1: Creating database tables if they don't exist...")
         Base.metadata.create_all(bind=engine)
+        if engine.dialect.name == "postgresql":
+            print("Adding the full-text search column to recipes if it is missing...")
+            recipe_repository.ensure_search_index(db)
 
         print("\nStep 2: Scraping all recipes...")
         url_to_recipe_map = {}
@@ -109,8 +117,16 @@ async def seed():
         
         db.commit()
 
+        print("\nStep 5: Building the local recipe search index...")
+        recipe_search_service.rebuild()
+        recipe_service.sync_ingredient_index(db)
+
     finally:
         db.close()
+        if scraping_service.page_cache is not None:
+            page_stats = scraping_service.page_cache.stats()
+            print(f"\nPage cache: {page_stats['not_modified']} pages not modified, "
+                  f"{page_stats['bytes_saved'] / 1024:.0f} KiB not downloaded again, {page_stats['entries']} pages cached.")
         print("\n--- Database Seeding Process Completed Successfully! ---")
 
 if __name__ == "__main__":
@@ -1,18 +1,52 @@
 import sys
 import os
+import argparse
+import resource
+import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.core.database import SessionLocal
+from app.services.recipe_neighbor_service import recipe_neighbor_service
 from app.services.recommendation_service import recommendation_service
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Entrena y publica el modelo de recomendación colaborativo.")
+    parser.add_argument("--algorithm", choices=["svd", "als"], default="svd", help="Algoritmo a entrenar.")
+    parser.add_argument("--warm-start", action="store_true", help="(ALS) Reutiliza los factores del modelo actual y solo actualiza lo que cambió.")
+    parser.add_argument("--factors", type=int, default=64, help="(ALS) Número de factores latentes.")
+    parser.add_argument("--iterations", type=int, default=15, help="(ALS) Número de iteraciones.")
+    parser.add_argument("--regularization", type=float, default=0.05, help="(ALS) Regularización L2.")
+    parser.add_argument("--alpha", type=float, default=20.0, help="(ALS) Peso de confianza de los favoritos.")
+    parser.add_argument("--workers", type=int, default=None, help="(ALS) Hilos para resolver los bloques (por defecto, todos los núcleos).")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     print("Iniciando el script de entrenamiento del modelo de recomendación...")
+    started = time.perf_counter()
     db = SessionLocal()
     try:
-        recommendation_service.train_and_save_model(db)
+        recommendation_service.rebuild_ingredient_index(db)
+        recommendation_service.train_and_save_model(
+            db,
+            algorithm=args.algorithm,
+            warm_start=args.warm_start,
+            als_params={
+                "n_factors": args.factors,
+                "iterations": args.iterations,
+                "regularization": args.regularization,
+                "alpha": args.alpha,
+                "n_workers": args.workers,
+            },
+        )
+        recipe_neighbor_service.build()
     finally:
         db.close()
+
+    elapsed = time.perf_counter() - started
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Tiempo total: {elapsed:.2f}s | Memoria pico (RSS): {peak_rss_mb:.1f} MB")
     print("El script de entrenamiento ha finalizado.")
 
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import locations, recommendations, supermarkets, tasks, users, recipes, diets, allergies
+from app.api.v1.endpoints import locations, metrics, recommendations, supermarkets, tasks, users, recipes, diets, allergies
 
 api_router = APIRouter()
 
@@ -10,4 +10,5 @@ api_router.include_router(locations.router, prefix="/locations", tags=["location
 api_router.include_router(supermarkets.router, prefix="/supermarkets", tags=["supermarkets"])
 api_router.include_router(diets.router, prefix="/diets", tags=["diets"])
 api_router.include_router(allergies.router, prefix="/allergies", tags=["allergies"])
-api_router.include_router(recommendations.router, prefix="/recommendations", tags=["recommendations"])
\ No newline at end of file
+api_router.include_router(recommendations.router, prefix="/recommendations", tags=["recommendations"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from app.core.cache import cache_registry
+from app.schemas.metrics import (
+    CacheMetricsResponse, PageCacheMetricsResponse, RecommendationMetricsResponse, SearchQuotaMetricsResponse
+)
+from app.services.recommendation_pipeline_service import recommendation_pipeline
+from app.services.scraping_service import scraping_service
+from app.services.search_cache_service import search_cache_service
+
+router = APIRouter()
+
+@router.get(
+    "/cache",
+    response_model=CacheMetricsResponse,
+    summary="Get cache hit/miss counters",
+    description="Returns the hit, miss and error counters of every cache registered in this process."
+)
+def get_cache_metrics_endpoint():
+    return CacheMetricsResponse(
+        caches={name: cache.stats() for name, cache in sorted(cache_registry.items())}
+    )
+
+
+@router.get(
+    "/recommendations",
+    response_model=RecommendationMetricsResponse,
+    summary="Get recommendation pipeline latencies",
+    description="Returns latency percentiles (ms) of each stage of the recommendation pipeline over the most recent requests in this process."
+)
+def get_recommendation_metrics_endpoint():
+    return RecommendationMetricsResponse(stages=recommendation_pipeline.stats())
+
+
+@router.get(
+    "/search-quota",
+    response_model=SearchQuotaMetricsResponse,
+    summary="Get Google Custom Search quota usage",
+    description="Returns, per quota day (Pacific time), the Custom Search API calls made and the calls saved by the result cache."
+)
+def get_search_quota_metrics_endpoint(days: int = Query(7, ge=1, le=31)):
+    return SearchQuotaMetricsResponse(days=search_cache_service.quota_usage(days))
+
+
+@router.get(
+    "/page-cache",
+    response_model=PageCacheMetricsResponse,
+    summary="Get recipe page cache usage",
+    description="Returns the on-disk page cache counters, including how many bytes 304 revalidations saved from being downloaded again."
+)
+def get_page_cache_metrics_endpoint():
+    if scraping_service.page_cache is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The page cache is disabled.")
+    return PageCacheMetricsResponse(**scraping_service.page_cache.stats())
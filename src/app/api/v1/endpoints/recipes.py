@@ -9,12 +9,13 @@ from app.core.security import get_optional_current_active_user
 from app.schemas.ai import ShortAdaptationRequest, ShortRecipe
 from app.schemas.ingredient import IngredientInfoResponse
 from app.schemas.recipe import (
-    RecipeBase, RecipeSearchResult, ScrapedRecipeData,
+    RecipeBase, RecipeRead, RecipeSearchResult, ScrapedRecipeData,
     RecipeAdaptationRequest, RecipeAdaptationResponse
 )
 from app.schemas.task import TaskId
 from app.services import history_service, nutrition_service
 from app.services.search_service import search_service
+from app.services.recipe_scrape_cache_service import recipe_scrape_cache_service
 from app.services.recipe_service import recipe_service
 from app.models.user import User
 from app.tasks.recipe_tasks import scrape_and_analyze_recipe
@@ -24,16 +25,17 @@ router = APIRouter()
 
 
 @router.get("/search", response_model=List[RecipeSearchResult])
-def search_recipes_endpoint(
+async def search_recipes_endpoint(
     query: str = Query(..., min_length=3,
                        description="Search term for recipes"),
     skip: int = 0,
-    limit: int = 10
+    limit: int = 10,
+    db: Session = Depends(get_db),
 ):
     if not query:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Search term cannot be empty.")
-    results = search_service.search_recipes(query, skip=skip, limit=limit)
+    results = await search_service.search_recipes(query, skip=skip, limit=limit, db=db)
     if not results:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="No recipes found for that search.")
@@ -41,9 +43,10 @@ def search_recipes_endpoint(
 
 
 @router.get("/ingredient-info", response_model=IngredientInfoResponse)
-def get_ingredient_information_endpoint(
+async def get_ingredient_information_endpoint(
     text_query: str = Query(..., min_length=1,
-                            description="Text to extract ingredient from and get info")
+                            description="Text to extract ingredient from and get info"),
+    db: Session = Depends(get_db),
 ):
     if not text_query.strip():
         raise HTTPException(
@@ -52,7 +55,7 @@ def get_ingredient_information_endpoint(
         )
 
     try:
-        ingredient_data_dict = search_service.get_ingredient(text_query)
+        ingredient_data_dict = await search_service.get_ingredient(text_query, db=db)
 
         if ingredient_data_dict is None:
             raise HTTPException(
@@ -80,7 +83,9 @@ async def scrape_recipe_url_endpoint(
 ):
     url_str = str(url)
     try:
-        scraped_data = await scrape_and_analyze_recipe(url_str)
+        scraped_data = await recipe_scrape_cache_service.get_or_scrape(
+            db, url_str, lambda: scrape_and_analyze_recipe(url_str)
+        )
 
         if current_user and scraped_data and isinstance(scraped_data, dict):
             history_service.history_service.add_to_history(
@@ -143,6 +148,20 @@ def read_recipe_endpoint(
     return db_recipe
 
 
+@router.get("/{recipe_id}/similar", response_model=List[RecipeRead])
+def read_similar_recipes_endpoint(
+    *,
+    db: Session = Depends(get_db),
+    recipe_id: UUID,
+    limit: int = Query(10, ge=1, le=50, description="Number of similar recipes to return.")
+):
+    similar_recipes = recipe_service.get_similar_recipes(db, recipe_id=recipe_id, limit=limit)
+    if similar_recipes is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
+    return similar_recipes
+
+
 @router.get("/", response_model=List[RecipeBase])
 def list_recipes_endpoint(
     *,
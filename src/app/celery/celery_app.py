@@ -1,11 +1,12 @@
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import settings
 
 celery_app = Celery(
     "worker",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=["app.tasks.recipe_tasks"]
+    include=["app.tasks.recipe_tasks", "app.tasks.recommendation_tasks"]
 )
 
 celery_app.conf.update(
@@ -14,4 +15,14 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="America/La_Paz",
     enable_utc=True,
-)
\ No newline at end of file
+    beat_schedule={
+        "precompute-recommendations-nightly": {
+            "task": "app.tasks.recommendation_tasks.precompute_recommendations",
+            "schedule": crontab(hour=settings.RECOMMENDATION_PRECOMPUTE_HOUR, minute=0),
+        },
+        "rebuild-local-search-index": {
+            "task": "app.tasks.recipe_tasks.rebuild_local_search_index",
+            "schedule": float(settings.LOCAL_SEARCH_REFRESH_SECONDS),
+        },
+    },
+)
@@ -0,0 +1,181 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisConnection:
+    RETRY_AFTER_SECONDS = 30
+
+    def __init__(self, host: str, port: int, db: int):
+        self.host = host
+        self.port = port
+        self.db = db
+        self._client: Optional[redis.Redis] = None
+        self._unavailable_until = 0.0
+
+    def client(self) -> Optional[redis.Redis]:
+        if time.monotonic() < self._unavailable_until:
+            return None
+        if self._client is None:
+            self._client = redis.Redis(
+                host=self.host,
+                port=self.port,
+                db=self.db,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5,
+            )
+        return self._client
+
+    def mark_unavailable(self, error: Exception) -> None:
+        print(f"Redis cache unavailable ({self.host}:{self.port}): {error}. Retrying in {self.RETRY_AFTER_SECONDS}s.")
+        self._unavailable_until = time.monotonic() + self.RETRY_AFTER_SECONDS
+
+    def call(self, operation, default: Any = None, on_error=None) -> Any:
+        client = self.client()
+        if client is None:
+            return default
+        try:
+            return operation(client)
+        except redis.RedisError as e:
+            if on_error is not None:
+                on_error(e)
+            self.mark_unavailable(e)
+            return default
+
+
+redis_connection = RedisConnection(settings.REDIS_HOST, settings.REDIS_PORT, settings.REDIS_CACHE_DB)
+
+cache_registry: Dict[str, "TieredCache"] = {}
+
+
+class TieredCache:
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: int,
+        local_maxsize: int = 1024,
+        local_ttl_seconds: Optional[int] = None,
+        connection: RedisConnection = redis_connection,
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.local = LRUCache(local_maxsize, local_ttl_seconds or ttl_seconds)
+        self.connection = connection
+        self._counters = {"local_hits": 0, "remote_hits": 0, "misses": 0, "sets": 0, "errors": 0}
+        self._counter_lock = threading.Lock()
+        cache_registry[namespace] = self
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _count(self, counter: str) -> None:
+        with self._counter_lock:
+            self._counters[counter] += 1
+
+    def redis(self) -> Optional[redis.Redis]:
+        return self.connection.client()
+
+    def remote_call(self, operation, default: Any = None) -> Any:
+        return self.connection.call(operation, default, on_error=lambda e: self._count("errors"))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count("local_hits")
+            return value
+
+        def fetch(client):
+            pipe = client.pipeline(transaction=False)
+            pipe.get(self._key(key))
+            pipe.pttl(self._key(key))
+            return pipe.execute()
+
+        raw, remaining_ms = self.remote_call(fetch, default=(None, None))
+        if raw is not None:
+            try:
+                value = json.loads(raw)
+            except ValueError:
+                value = _MISSING
+            if value is not _MISSING:
+                self._count("remote_hits")
+                # Keep the local copy no longer than Redis keeps the entry.
+                ttl = self.local.ttl_seconds
+                if remaining_ms is not None and remaining_ms > 0:
+                    ttl = min(remaining_ms / 1000, ttl or remaining_ms / 1000)
+                self.local.set(key, value, ttl_seconds=ttl)
+                return value
+
+        self._count("misses")
+        return default
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        ttl = ttl_seconds or self.ttl_seconds
+        self._count("sets")
+        self.local.set(key, value, ttl_seconds=min(ttl, self.local.ttl_seconds or ttl))
+        payload = json.dumps(value, default=str)
+        self.remote_call(lambda client: client.set(self._key(key), payload, ex=ttl))
+
+    def delete(self, key: str) -> None:
+        self.local.delete(key)
+        self.remote_call(lambda client: client.delete(self._key(key)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            counters = dict(self._counters)
+        lookups = counters["local_hits"] + counters["remote_hits"] + counters["misses"]
+        hits = counters["local_hits"] + counters["remote_hits"]
+        return {
+            **counters,
+            "lookups": lookups,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "local_size": len(self.local),
+        }
+
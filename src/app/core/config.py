@@ -19,6 +19,7 @@ class Settings(BaseSettings):
 
     REDIS_HOST: str
     REDIS_PORT: int
+    REDIS_CACHE_DB: int = 1
 
     GOOGLE_API_KEY: str
     GOOGLE_SEARCH_RECIPE_ENGINE_ID: str
@@ -36,6 +37,65 @@ class Settings(BaseSettings):
 
     MODEL_STORAGE_PATH: str = "trained_models"
 
+    RECOMMENDATION_CACHE_TTL_SECONDS: int = 3600
+    RECOMMENDATION_CACHE_LOCAL_SIZE: int = 1024
+
+    RECOMMENDATION_PRECOMPUTE_TOP_N: int = 50
+    RECOMMENDATION_PRECOMPUTE_BATCH_SIZE: int = 64
+    RECOMMENDATION_PRECOMPUTE_WORKERS: int = 0
+    RECOMMENDATION_PRECOMPUTE_MAX_AGE_HOURS: int = 26
+    RECOMMENDATION_PRECOMPUTE_HOUR: int = 3
+    RECOMMENDATION_MIN_FAVORITES: int = 3
+    RECOMMENDATION_STRATEGY: str = "pipeline"
+    RECOMMENDATION_NEIGHBOR_CANDIDATES: int = 200
+    RECOMMENDATION_POPULAR_CANDIDATES: int = 100
+    RECOMMENDATION_PROFILE_CANDIDATES: int = 200
+    RECOMMENDATION_DIVERSITY_LAMBDA: float = 0.7
+    RECOMMENDATION_FULL_RETRAIN_DAYS: int = 7
+
+    POPULARITY_HISTORY_HALF_LIFE_DAYS: float = 14.0
+    POPULARITY_HISTORY_WEIGHT: float = 0.5
+    POPULARITY_SNAPSHOT_SIZE: int = 1000
+    POPULARITY_REFRESH_SECONDS: int = 60
+
+    RECIPE_NEIGHBORS_K: int = 50
+    RECIPE_NEIGHBORS_FACTOR_WEIGHT: float = 0.5
+    RECIPE_NEIGHBORS_CHUNK_MB: int = 64
+
+    USER_VECTOR_TTL_SECONDS: int = 7 * 24 * 3600
+    USER_VECTOR_LOCAL_SIZE: int = 4096
+
+    SEARCH_ANALYSIS_CACHE_TTL_SECONDS: int = 24 * 3600
+    SEARCH_ANALYSIS_NEGATIVE_TTL_SECONDS: int = 60
+    SEARCH_ANALYSIS_CACHE_LOCAL_SIZE: int = 2048
+
+    GOOGLE_CSE_API_ENDPOINT: Optional[str] = None
+    SEARCH_RESULT_CACHE_TTL_SECONDS: int = 6 * 3600
+    SEARCH_RESULT_CACHE_LOCAL_SIZE: int = 1024
+    SEARCH_SPECULATIVE_FETCH: bool = True
+    SEARCH_PREFETCH_NEXT_PAGE: bool = True
+    LOCAL_SEARCH_ENABLED: bool = True
+    LOCAL_SEARCH_MIN_RESULTS: int = 5
+    LOCAL_SEARCH_REFRESH_SECONDS: int = 300
+
+    INGREDIENT_CATALOG_LOCAL_SIZE: int = 2048
+    INGREDIENT_CATALOG_MISS_RETRY_SECONDS: int = 86400
+    INGREDIENT_QUERY_CACHE_TTL_SECONDS: int = 2592000
+
+    SCRAPING_HTTP2: bool = True
+    SCRAPING_TIMEOUT_SECONDS: float = 20.0
+    SCRAPING_MAX_CONNECTIONS: int = 100
+    SCRAPING_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    SCRAPING_KEEPALIVE_SECONDS: float = 30.0
+    PAGE_CACHE_ENABLED: bool = True
+    PAGE_CACHE_DIR: str = "page_cache"
+    PAGE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    PAGE_CACHE_RESCAN_SECONDS: float = 60.0
+    SCRAPE_CACHE_FRESH_SECONDS: int = 7 * 24 * 3600
+    SCRAPE_CACHE_RETRY_SECONDS: int = 3600
+    SCRAPE_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    SCRAPE_CACHE_LOCAL_SIZE: int = 512
+
     class Config:
         env_file = '.env'
         env_file_encoding = 'utf-8'
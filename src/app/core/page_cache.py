@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from app.core.urls import canonical_url
+
+
+class PageCache:
+    """On-disk cache of fetched pages for HTTP conditional revalidation.
+
+    Each page is stored as zlib-compressed HTML plus a JSON sidecar with its ETag,
+    Last-Modified and the parse made from it. File mtimes track recency for LRU
+    eviction once the directory grows past max_bytes. Several workers can share the
+    directory, so the size accounting is rebuilt from disk every rescan_seconds.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, rescan_seconds: float = 60.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rescan_seconds = rescan_seconds
+        self._sizes: Optional[Dict[str, int]] = None
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "not_modified": 0, "stores": 0, "evictions": 0, "bytes_saved": 0}
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key[:2], key)
+        return f"{base}.json", f"{base}.html.z"
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def _load_sizes(self) -> Dict[str, int]:
+        if self._sizes is None or time.monotonic() - self._scanned_at > self.rescan_seconds:
+            sizes: Dict[str, int] = {}
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(".json"):
+                        key = name[:-len(".json")]
+                        sizes[key] = 0
+                        for path in self._paths(key):
+                            try:
+                                sizes[key] += os.path.getsize(path)
+                            except OSError:
+                                pass
+            self._sizes, self._scanned_at = sizes, time.monotonic()
+        return self._sizes
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        key = self._key(url)
+        meta_path, _ = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+        self._count("hits")
+        return {**meta, "key": key}
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def read_html(self, entry: Dict[str, Any]) -> Optional[str]:
+        _, body_path = self._paths(entry["key"])
+        try:
+            with open(body_path, "rb") as body_file:
+                return zlib.decompress(body_file.read()).decode("utf-8")
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return None
+
+    def record_not_modified(self, entry: Dict[str, Any]) -> None:
+        self._count("not_modified")
+        self._count("bytes_saved", entry.get("raw_bytes", 0))
+
+    def store(
+        self, url: str, html: str, etag: Optional[str], last_modified: Optional[str], parsed: Optional[Dict[str, Any]]
+    ) -> None:
+        if not etag and not last_modified:
+            return
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        raw = html.encode("utf-8")
+        body = zlib.compress(raw, 6)
+        meta = json.dumps({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "raw_bytes": len(raw),
+            "stored_at": time.time(),
+            "parsed": parsed,
+        }, default=str).encode("utf-8")
+
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            # Body first: a sidecar only ever points at a complete body.
+            for path, payload in ((body_path, body), (meta_path, meta)):
+                with open(f"{path}.tmp", "wb") as tmp_file:
+                    tmp_file.write(payload)
+                os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            print(f"Page cache: could not store {url}: {e}")
+            return
+
+        self._count("stores")
+        with self._lock:
+            sizes = self._load_sizes()
+            sizes[key] = len(body) + len(meta)
+            self._evict(sizes)
+
+    def _evict(self, sizes: Dict[str, int]) -> None:
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% of the bound so the next stores do not each pay for a scan.
+        target = int(self.max_bytes * 0.9)
+
+        def last_used(key: str) -> float:
+            try:
+                return os.path.getmtime(self._paths(key)[0])
+            except OSError:
+                return 0.0
+
+        for key in sorted(sizes, key=last_used):
+            if total <= target:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= sizes.pop(key)
+            self._counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sizes = self._load_sizes()
+            return {**self._counters, "entries": len(sizes), "disk_bytes": sum(sizes.values()), "max_bytes": self.max_bytes}
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+def flight_key(*parts: Any) -> str:
+    return json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key wait and share its outcome."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.executed = 0
+        self.shared = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """asyncio flavor of SingleFlight: the shared call runs as its own task, so one caller
+    being cancelled does not cancel the request the others are waiting on."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.executed = 0
+        self.shared = 0
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        flight = (id(loop), key)
+        task = self._tasks.get(flight)
+        if task is not None and task.get_loop() is loop:
+            self.shared += 1
+        else:
+            task = loop.create_task(fn(*args, **kwargs))
+            self._tasks[flight] = task
+            self.executed += 1
+            task.add_done_callback(lambda done: self._forget(flight, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, flight: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        if self._tasks.get(flight) is task:
+            del self._tasks[flight]
+        if not task.cancelled():
+            task.exception()  # consumed here so an unawaited failure is not reported as "never retrieved"
@@ -0,0 +1,93 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+SPANISH_STOPWORDS = {
+    "a", "al", "con", "de", "del", "e", "el", "en", "la", "las", "lo", "los", "o", "para", "por",
+    "receta", "recetas", "sin", "su", "un", "una", "unos", "unas", "y",
+}
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+VOWELS = "aeiou"
+
+
+def normalize_text(text: Optional[str]) -> str:
+    # NFKD + ASCII folds accents (maní -> mani, ñ -> n) several times faster than unidecode.
+    text = (text or "").lower()
+    if text.isascii():
+        return text
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def normalize_token(token: str) -> str:
+    # Spanish plurals: nueces -> nuez, panes -> pan, tomates -> tomate. Singulars do not end in
+    # two consonants, so carnes -> carne, postres -> postre and dulces -> dulce only drop the "s".
+    if token.endswith("ces") and len(token) > 4 and token[-4] in VOWELS:
+        return token[:-3] + "z"
+    if token.endswith("es") and len(token) > 4 and token[-3] in "lnrdjy" and token[-4] in VOWELS:
+        return token[:-2]
+    if token.endswith("s") and len(token) > 3:
+        return token[:-1]
+    return token
+
+
+def pluralize(token: str) -> str:
+    if token.endswith("z"):
+        return token[:-1] + "ces"
+    if token[-1:] in VOWELS:
+        return token + "s"
+    return token + "es"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [
+        normalize_token(token)
+        for token in TOKEN_PATTERN.findall(normalize_text(text))
+        if token not in SPANISH_STOPWORDS and len(token) > 1
+    ]
+
+
+class RestrictionMatcher:
+    def __init__(self, restrictions: Sequence[str]):
+        self.restrictions = tuple(restrictions)
+        self.terms: List[str] = []
+        for restriction in self.restrictions:
+            for word in WORD_PATTERN.findall((restriction or "").lower()):
+                if normalize_text(word) not in SPANISH_STOPWORDS and word not in self.terms:
+                    self.terms.append(word)
+        self.words: List[str] = list(dict.fromkeys(normalize_text(term) for term in self.terms))
+
+        variants = set()
+        for word in self.words:
+            singular = normalize_token(word)
+            variants.update((word, singular, pluralize(singular)))
+        alternatives = sorted(variants, key=lambda variant: (-len(variant), variant))
+        self.pattern = re.compile(r"\b(?:%s)\b" % "|".join(map(re.escape, alternatives))) if alternatives else None
+
+    def __bool__(self) -> bool:
+        return self.pattern is not None
+
+    def matches(self, text: Optional[str]) -> bool:
+        return self.pattern is not None and self.pattern.search(normalize_text(text)) is not None
+
+    def filter(self, items: Iterable[Any], text_of: Callable[[Any], str]) -> Tuple[List[Any], List[Any]]:
+        items = list(items)
+        if self.pattern is None:
+            return items, []
+        kept, dropped = [], []
+        search = self.pattern.search
+        for item in items:
+            (dropped if search(normalize_text(text_of(item))) else kept).append(item)
+        return kept, dropped
+
+
+@lru_cache(maxsize=512)
+def _compile(restrictions: Tuple[str, ...]) -> RestrictionMatcher:
+    return RestrictionMatcher(restrictions)
+
+
+def compile_restrictions(restrictions: Iterable[str]) -> RestrictionMatcher:
+    return _compile(tuple(sorted({restriction.strip().lower() for restriction in restrictions if restriction})))
@@ -4,4 +4,6 @@ from app.models.recipe import Recipe
 from app.models.user import User
 from app.models.history import History
 from app.models.diet import Diet
-from app.models.allergy import Allergy
\ No newline at end of file
+from app.models.allergy import Allergy
+from app.models.user_recommendation import UserRecommendation
+from app.models.ingredient_catalog import IngredientCatalogEntry
\ No newline at end of file
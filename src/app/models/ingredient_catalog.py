@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String
+from app.core.database import Base
+from app.models.base import BaseModel
+
+class IngredientCatalogEntry(Base, BaseModel):
+    __tablename__ = "ingredient_catalog"
+
+    normalized_name = Column(String, nullable=False, unique=True, index=True)
+    name = Column(String, nullable=False)
+    image_url = Column(String, nullable=True)
+    search_url = Column(String, nullable=True)
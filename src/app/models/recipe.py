@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Float, Integer
+from sqlalchemy import DDL, Column, String, Text, Float, Integer, event
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.base import BaseModel
@@ -18,3 +18,14 @@ class Recipe(Base, BaseModel):
     img_src = Column(String, nullable=True)
 
     favorited_by = relationship("Favorite", back_populates="recipe", cascade="all, delete-orphan")
+
+
+# Postgres-only full-text column; it is not mapped because SQLite has no tsvector type.
+RECIPE_SEARCH_VECTOR_DDL = DDL(
+    "ALTER TABLE recipes ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('spanish', coalesce(recipe_name, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(ingredients, '')), 'B')) STORED; "
+    "CREATE INDEX IF NOT EXISTS ix_recipes_search_vector ON recipes USING GIN (search_vector)"
+)
+
+event.listen(Recipe.__table__, "after_create", RECIPE_SEARCH_VECTOR_DDL.execute_if(dialect="postgresql"))
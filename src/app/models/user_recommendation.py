@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, ForeignKey, JSON, String
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+from app.models.base import BaseModel
+
+class UserRecommendation(Base, BaseModel):
+    __tablename__ = "user_recommendations"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, unique=True, index=True)
+    recipe_ids = Column(JSON, nullable=False)
+    scores = Column(JSON, nullable=False)
+    model_version = Column(String, nullable=True)
+    generated_at = Column(DateTime(timezone=True), nullable=False, index=True)
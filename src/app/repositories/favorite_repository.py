@@ -1,4 +1,6 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 import uuid
 
@@ -16,6 +18,37 @@ class FavoriteRepository(BaseRepository[Favorite, FavoriteCreate, FavoriteUpdate
             .options(joinedload(self.model.recipe))\
             .offset(skip).limit(limit).all()
 
+    def get_user_favorite_recipe_ids(self, db: Session, *, user_id: uuid.UUID, limit: int = 2000) -> List[uuid.UUID]:
+        rows = db.query(self.model.recipe_id).filter(self.model.user_id == user_id).limit(limit).all()
+        return [recipe_id for (recipe_id,) in rows]
+
+    def get_favorite_recipe_ids_for_users(self, db: Session, *, user_ids: List[uuid.UUID]) -> Dict[str, List[str]]:
+        favorites: Dict[str, List[str]] = {str(user_id): [] for user_id in user_ids}
+        rows = db.query(self.model.user_id, self.model.recipe_id).filter(self.model.user_id.in_(user_ids)).all()
+        for user_id, recipe_id in rows:
+            favorites[str(user_id)].append(str(recipe_id))
+        return favorites
+
+    def get_user_ids_with_favorites(self, db: Session) -> List[uuid.UUID]:
+        rows = db.query(self.model.user_id).distinct().order_by(self.model.user_id).all()
+        return [user_id for (user_id,) in rows]
+
+    def count_by_recipe(self, db: Session) -> List[Tuple[uuid.UUID, int]]:
+        return db.query(self.model.recipe_id, func.count(self.model.id)).group_by(self.model.recipe_id).all()
+
+    def count(self, db: Session) -> int:
+        return db.query(func.count(self.model.id)).scalar() or 0
+
+    def iter_user_recipe_pairs(
+        self, db: Session, *, since: Optional[datetime] = None, batch_size: int = 10000
+    ) -> Iterator[Tuple[uuid.UUID, uuid.UUID]]:
+        query = db.query(self.model.user_id, self.model.recipe_id)
+        if since is not None:
+            query = query.filter(self.model.created_at > since)
+        query = query.execution_options(yield_per=batch_size)
+        for user_id, recipe_id in query:
+            yield user_id, recipe_id
+
     def delete_favorite(self, db: Session, *, user_id: uuid.UUID, recipe_id: uuid.UUID) -> bool:
         favorite = self.get_by_user_and_recipe(db, user_id=user_id, recipe_id=recipe_id)
         if favorite:
@@ -1,9 +1,11 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
 import uuid
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func
 
 from app.models.history import History
+from app.models.recipe import Recipe
 from app.schemas.history import HistoryCreate, HistoryUpdate
 from app.repositories.base_repository import BaseRepository
 
@@ -20,4 +22,19 @@ class HistoryRepository(BaseRepository[History, HistoryCreate, HistoryUpdate]):
             desc(func.coalesce(self.model.updated_at, self.model.created_at))
         ).offset(skip).limit(limit).all()
 
+    def get_latest_scraped(self, db: Session, *, urls: List[str]) -> Optional[History]:
+        return db.query(self.model).filter(
+            self.model.source_url.in_(urls),
+            self.model.is_adapted.is_(False)
+        ).order_by(
+            desc(func.coalesce(self.model.updated_at, self.model.created_at))
+        ).first()
+
+    def iter_recipe_views(self, db: Session, *, batch_size: int = 10000) -> Iterator[Tuple[uuid.UUID, datetime]]:
+        query = db.query(Recipe.id, func.coalesce(self.model.updated_at, self.model.created_at))\
+            .join(Recipe, Recipe.url == self.model.source_url)\
+            .execution_options(yield_per=batch_size)
+        for recipe_id, viewed_at in query:
+            yield recipe_id, viewed_at
+
 history_repository = HistoryRepository(History)
@@ -0,0 +1,21 @@
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.ingredient_catalog import IngredientCatalogEntry
+from app.schemas.ingredient_catalog import IngredientCatalogCreate, IngredientCatalogUpdate
+from app.repositories.base_repository import BaseRepository
+
+class IngredientCatalogRepository(BaseRepository[IngredientCatalogEntry, IngredientCatalogCreate, IngredientCatalogUpdate]):
+
+    def get_by_normalized_name(self, db: Session, *, normalized_name: str) -> Optional[IngredientCatalogEntry]:
+        return self.get_by_attribute(db, attribute="normalized_name", value=normalized_name)
+
+    def create_if_missing(self, db: Session, *, obj_in: IngredientCatalogCreate) -> IngredientCatalogEntry:
+        try:
+            return self.create(db, obj_in=obj_in)
+        except IntegrityError:
+            db.rollback()
+            return self.get_by_normalized_name(db, normalized_name=obj_in.normalized_name)
+
+ingredient_catalog_repository = IngredientCatalogRepository(IngredientCatalogEntry)
@@ -1,11 +1,60 @@
-from typing import Optional
-from app.models.recipe import Recipe
+import uuid
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+from app.models.recipe import RECIPE_SEARCH_VECTOR_DDL, Recipe
 from app.schemas.recipe import RecipeCreate, RecipeUpdate
 from app.repositories.base_repository import BaseRepository
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
 
 class RecipeRepository(BaseRepository[Recipe, RecipeCreate, RecipeUpdate]):
     def get_by_url(self, db: Session, *, url: str) -> Optional[Recipe]:
         return self.get_by_attribute(db, attribute="url", value=url)
+
+    def get_by_ids(self, db: Session, *, ids: Sequence[Any]) -> List[Recipe]:
+        if not ids:
+            return []
+        uuids = [recipe_id if isinstance(recipe_id, uuid.UUID) else uuid.UUID(str(recipe_id)) for recipe_id in ids]
+        recipes = db.query(self.model).filter(self.model.id.in_(uuids)).all()
+        by_id = {str(recipe.id): recipe for recipe in recipes}
+        return [by_id[str(recipe_id)] for recipe_id in ids if str(recipe_id) in by_id]
+
+    def get_ids(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[str]:
+        return [str(recipe_id) for recipe_id, in db.query(self.model.id).offset(skip).limit(limit)]
+
+    def iter_ingredient_documents(self, db: Session, *, batch_size: int = 1000) -> Iterator[Tuple[Any, str]]:
+        query = db.query(self.model.id, self.model.ingredients).execution_options(yield_per=batch_size)
+        for recipe_id, ingredients in query:
+            yield recipe_id, ingredients
+
+    def iter_search_documents(self, db: Session, *, batch_size: int = 1000) -> Iterator[Tuple[Any, str, str, str, Optional[str]]]:
+        query = (
+            db.query(self.model.id, self.model.recipe_name, self.model.ingredients, self.model.url, self.model.img_src)
+            .filter(self.model.url.isnot(None))
+            .execution_options(yield_per=batch_size)
+        )
+        for row in query:
+            yield tuple(row)
+
+    def ensure_search_index(self, db: Session) -> None:
+        db.execute(RECIPE_SEARCH_VECTOR_DDL)
+        db.commit()
+
+    def has_search_index(self, db: Session) -> bool:
+        columns = inspect(db.get_bind()).get_columns(self.model.__tablename__)
+        return any(column["name"] == "search_vector" for column in columns)
+
+    def full_text_search(
+        self, db: Session, *, websearch_query: str, limit: int, offset: int = 0
+    ) -> List[Tuple[Any, str, str, Optional[str], float]]:
+        rows = db.execute(
+            text(
+                "SELECT id, recipe_name, url, img_src, ts_rank_cd(search_vector, query) AS rank "
+                "FROM recipes, websearch_to_tsquery('spanish', :query) AS query "
+                "WHERE search_vector @@ query AND url IS NOT NULL "
+                "ORDER BY rank DESC, id LIMIT :limit OFFSET :offset"
+            ),
+            {"query": websearch_query, "limit": limit, "offset": offset},
+        )
+        return [tuple(row) for row in rows]
     
 recipe_repository = RecipeRepository(Recipe)
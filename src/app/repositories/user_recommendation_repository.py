@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import List, Optional
+import uuid
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.user_recommendation import UserRecommendation
+from app.schemas.user_recommendation import UserRecommendationCreate, UserRecommendationUpdate
+from app.repositories.base_repository import BaseRepository
+
+class UserRecommendationRepository(BaseRepository[UserRecommendation, UserRecommendationCreate, UserRecommendationUpdate]):
+
+    def get_by_user(self, db: Session, *, user_id: uuid.UUID) -> Optional[UserRecommendation]:
+        return db.query(self.model).filter(self.model.user_id == user_id).first()
+
+    def replace_for_users(self, db: Session, *, rows: List[UserRecommendationCreate], computed_from: datetime) -> int:
+        # Rows marked stale after computed_from belong to users whose favorites changed while this
+        # batch was ranking them; those users keep the marker instead of the outdated ranking.
+        if not rows:
+            return 0
+        user_ids = [row.user_id for row in rows]
+        for attempt in range(2):
+            try:
+                db.query(self.model).filter(
+                    self.model.user_id.in_(user_ids), self.model.generated_at < computed_from
+                ).delete(synchronize_session=False)
+                changed = {user_id for (user_id,) in db.query(self.model.user_id).filter(self.model.user_id.in_(user_ids))}
+                fresh = [{"id": uuid.uuid4(), **row.model_dump()} for row in rows if row.user_id not in changed]
+                if fresh:
+                    db.execute(insert(self.model.__table__), fresh)
+                db.commit()
+                return len(fresh)
+            except IntegrityError:
+                # A user was marked stale between the delete and the insert; re-read the markers once.
+                db.rollback()
+                if attempt:
+                    raise
+            except Exception:
+                db.rollback()
+                raise
+        return 0
+
+    def delete_generated_before(self, db: Session, *, cutoff: datetime) -> int:
+        deleted = db.query(self.model).filter(self.model.generated_at < cutoff).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+    def mark_stale(self, db: Session, *, user_id: uuid.UUID, changed_at: datetime) -> None:
+        # An empty row, rather than no row, so a batch already ranking this user cannot write over it.
+        for attempt in range(2):
+            try:
+                db.query(self.model).filter(self.model.user_id == user_id).delete(synchronize_session=False)
+                db.execute(insert(self.model.__table__), [{
+                    "id": uuid.uuid4(), "user_id": user_id, "recipe_ids": [], "scores": [],
+                    "model_version": None, "generated_at": changed_at,
+                }])
+                db.commit()
+                return
+            except IntegrityError:
+                db.rollback()
+                if attempt:
+                    raise
+
+
+user_recommendation_repository = UserRecommendationRepository(UserRecommendation)
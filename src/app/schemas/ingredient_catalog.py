@@ -0,0 +1,15 @@
+from typing import Optional
+from pydantic import BaseModel
+
+class IngredientCatalogBase(BaseModel):
+    name: str
+    image_url: Optional[str] = None
+    search_url: Optional[str] = None
+
+class IngredientCatalogCreate(IngredientCatalogBase):
+    normalized_name: str
+
+class IngredientCatalogUpdate(BaseModel):
+    name: Optional[str] = None
+    image_url: Optional[str] = None
+    search_url: Optional[str] = None
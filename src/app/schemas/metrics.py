@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List
+
+
+class CacheMetricsResponse(BaseModel):
+    caches: Dict[str, Dict[str, Any]]
+
+
+class RecommendationMetricsResponse(BaseModel):
+    stages: Dict[str, Dict[str, float]]
+
+
+class SearchQuotaDay(BaseModel):
+    date: str
+    calls: int
+    saved: int
+    saved_ratio: float
+
+
+class SearchQuotaMetricsResponse(BaseModel):
+    days: List[SearchQuotaDay]
+
+
+class PageCacheMetricsResponse(BaseModel):
+    hits: int
+    misses: int
+    not_modified: int
+    stores: int
+    evictions: int
+    bytes_saved: int
+    entries: int
+    disk_bytes: int
+    max_bytes: int
@@ -0,0 +1,19 @@
+from typing import List, Optional
+from pydantic import BaseModel
+from datetime import datetime
+import uuid
+
+class UserRecommendationBase(BaseModel):
+    recipe_ids: List[str]
+    scores: List[float]
+    model_version: Optional[str] = None
+    generated_at: datetime
+
+class UserRecommendationCreate(UserRecommendationBase):
+    user_id: uuid.UUID
+
+class UserRecommendationUpdate(BaseModel):
+    recipe_ids: Optional[List[str]] = None
+    scores: Optional[List[float]] = None
+    model_version: Optional[str] = None
+    generated_at: Optional[datetime] = None
@@ -1,14 +1,30 @@
+import httpx
 import requests
 from requests.exceptions import RequestException, HTTPError, JSONDecodeError
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from unidecode import unidecode
+from app.core.cache import TieredCache
 from app.core.config import settings
+from app.core.singleflight import AsyncSingleFlight, SingleFlight, flight_key
 
 class AIAgentsService:
-    def __init__(self):
+    def __init__(self, query_analysis_cache: TieredCache):
         self.base_url = settings.N8N_BASE_URL
         self.session = requests.Session()
+        self.http_client = httpx.AsyncClient(timeout=30)
+        self.query_analysis_cache = query_analysis_cache
+        self.flights = SingleFlight("n8n")
+        self.async_flights = AsyncSingleFlight("n8n")
 
     def _call_n8n_webhook(self, webhook_path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self.flights.do(flight_key(webhook_path, payload), self._post_n8n_webhook, webhook_path, payload)
+
+    async def _call_n8n_webhook_async(self, webhook_path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.async_flights.do(
+            flight_key(webhook_path, payload), self._post_n8n_webhook_async, webhook_path, payload
+        )
+
+    def _post_n8n_webhook(self, webhook_path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         full_url = f'{self.base_url}{webhook_path}'
 
         try:
@@ -39,12 +55,62 @@ class AIAgentsService:
             print(f"An unexpected error occurred when calling the agent: {e}")
             return {"error": "Unexpected error in the agent service.", "details": str(e)}
 
-    def analyze_search_query(self, query: str) -> Dict[str, Any]:
+    async def _post_n8n_webhook_async(self, webhook_path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        full_url = f'{self.base_url}{webhook_path}'
+
+        try:
+            response = await self.http_client.post(full_url, json=payload)
+
+            response.raise_for_status()
+
+            if response.text and response.text.strip():
+                return response.json()
+            else:
+                print("n8n response was empty, returning specific error.")
+                return {"error": "Empty response from n8n agent", "details": "The webhook returned 200 OK but with no JSON body."}
+
+        except httpx.HTTPStatusError as e:
+            print(f"Error in n8n agent response: {e.response.status_code} - {e.response.text}")
+            return {"error": f"Agent returned an error {e.response.status_code}", "details": e.response.text}
+
+        except ValueError as e:
+            print(f"Error decoding JSON from n8n: {e}")
+            print(f"Response text that caused JSONDecodeError: '{response.text}'")
+            return {"error": "Invalid JSON response from n8n agent.", "details": response.text}
+
+        except httpx.RequestError as e:
+            print(f"Network error contacting n8n agent: {e}")
+            return {"error": "Connection error with the agent service.", "details": str(e)}
+
+        except Exception as e:
+            print(f"An unexpected error occurred when calling the agent: {e}")
+            return {"error": "Unexpected error in the agent service.", "details": str(e)}
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(unidecode(query or "").lower().split())
+
+    def get_cached_search_analysis(self, query: str) -> Optional[Dict[str, Any]]:
+        return self.query_analysis_cache.get(self.normalize_query(query))
+
+    async def analyze_search_query(self, query: str) -> Dict[str, Any]:
+        cached = self.get_cached_search_analysis(query)
+        if cached is not None:
+            print(f"Query analysis cache hit for '{self.normalize_query(query)}'.")
+            return cached
+
         webhook_path = "/webhook/a58b586d-c75a-43a3-9e5b-9cd8962dfa33" 
         payload = {
             "query": query
         }
-        return self._call_n8n_webhook(webhook_path, payload)
+        analysis = await self._call_n8n_webhook_async(webhook_path, payload)
+        cache_key = self.normalize_query(query)
+
+        if isinstance(analysis, dict) and 'error' not in analysis:
+            self.query_analysis_cache.set(cache_key, analysis)
+        else:
+            self.query_analysis_cache.set(cache_key, analysis, ttl_seconds=settings.SEARCH_ANALYSIS_NEGATIVE_TTL_SECONDS)
+        return analysis
 
     def analyze_recipe_ingredients(self, search_query: str, recipe: list) -> Dict[str, Any]:
         webhook_path = "/webhook-test/043a365f-75da-4235-8515-debbab933e65"
@@ -59,10 +125,10 @@ class AIAgentsService:
         payload = request_body
         return self._call_n8n_webhook(webhook_path, payload)
     
-    def extract_ingredient(self, body: str) -> Dict[str, Any]:
+    async def extract_ingredient(self, body: str) -> Dict[str, Any]:
         webhook_path = "/webhook/40d91208-97ec-45c4-bfbe-528c65e2f7de"
         payload = body
-        return self._call_n8n_webhook(webhook_path, payload)
+        return await self._call_n8n_webhook_async(webhook_path, payload)
     
     def enrich_ingredients(self, ingredients: List[str]) -> Dict[str, Any]:
         webhook_path = "/webhook/e50f3d78-caf8-4344-9088-f4c32b40718c" 
@@ -72,4 +138,10 @@ class AIAgentsService:
         print(f"Calling n8n to enrich {len(ingredients)} ingredients...")
         return self._call_n8n_webhook(webhook_path, payload)
 
-ai_agents_service = AIAgentsService()
\ No newline at end of file
+ai_agents_service = AIAgentsService(
+    TieredCache(
+        namespace="search_analysis",
+        ttl_seconds=settings.SEARCH_ANALYSIS_CACHE_TTL_SECONDS,
+        local_maxsize=settings.SEARCH_ANALYSIS_CACHE_LOCAL_SIZE,
+    )
+)
\ No newline at end of file
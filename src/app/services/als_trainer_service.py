@@ -0,0 +1,120 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from app.services.training_data_service import InteractionData
+
+
+class ImplicitALSTrainer:
+    def __init__(
+        self,
+        n_factors: int = 64,
+        regularization: float = 0.05,
+        alpha: float = 20.0,
+        iterations: int = 15,
+        n_workers: Optional[int] = None,
+        block_size: int = 512,
+        random_state: int = 42,
+    ):
+        self.n_factors = n_factors
+        self.regularization = regularization
+        self.alpha = alpha
+        self.iterations = iterations
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.block_size = block_size
+        self.random_state = random_state
+
+    @staticmethod
+    def build_matrix(interactions: InteractionData) -> sp.csr_matrix:
+        matrix = sp.csr_matrix(
+            (np.ones(len(interactions), dtype=np.float32), (interactions.user_codes, interactions.item_codes)),
+            shape=(interactions.n_users, interactions.n_items),
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1.0
+        return matrix
+
+    def _init_factors(self, n_rows: int, rng: np.random.Generator) -> np.ndarray:
+        return (rng.standard_normal((n_rows, self.n_factors)) * 0.01).astype(np.float64)
+
+    def _solve_block(self, interactions: sp.csr_matrix, fixed: np.ndarray, gram: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        k = self.n_factors
+        lhs = np.empty((len(rows), k, k), dtype=np.float64)
+        rhs = np.zeros((len(rows), k), dtype=np.float64)
+        base = gram + self.regularization * np.eye(k)
+
+        indptr, indices = interactions.indptr, interactions.indices
+        for position, row in enumerate(rows):
+            observed = indices[indptr[row]:indptr[row + 1]]
+            if len(observed) == 0:
+                lhs[position] = base
+                continue
+            fixed_observed = fixed[observed]
+            lhs[position] = base + self.alpha * (fixed_observed.T @ fixed_observed)
+            rhs[position] = (1.0 + self.alpha) * fixed_observed.sum(axis=0)
+
+        return np.linalg.solve(lhs, rhs[..., None])[..., 0]
+
+    def _solve_side(
+        self, interactions: sp.csr_matrix, solved: np.ndarray, fixed: np.ndarray,
+        rows: Optional[np.ndarray], executor: ThreadPoolExecutor,
+    ) -> None:
+        gram = fixed.T @ fixed
+        rows = np.arange(interactions.shape[0]) if rows is None else rows
+        blocks = [rows[start:start + self.block_size] for start in range(0, len(rows), self.block_size)]
+        for block, result in zip(blocks, executor.map(lambda b: self._solve_block(interactions, fixed, gram, b), blocks)):
+            solved[block] = result
+
+    def fit(
+        self,
+        interactions: InteractionData,
+        user_factors: Optional[np.ndarray] = None,
+        item_factors: Optional[np.ndarray] = None,
+        users_to_update: Optional[Sequence[int]] = None,
+        items_to_update: Optional[Sequence[int]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        rng = np.random.default_rng(self.random_state)
+        user_items = self.build_matrix(interactions)
+        item_users = user_items.T.tocsr()
+
+        user_factors = self._init_factors(interactions.n_users, rng) if user_factors is None else user_factors
+        item_factors = self._init_factors(interactions.n_items, rng) if item_factors is None else item_factors
+        user_rows = None if users_to_update is None else np.asarray(users_to_update, dtype=np.int64)
+        item_rows = None if items_to_update is None else np.asarray(items_to_update, dtype=np.int64)
+
+        with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+            for iteration in range(self.iterations):
+                self._solve_side(user_items, user_factors, item_factors, user_rows, executor)
+                self._solve_side(item_users, item_factors, user_factors, item_rows, executor)
+                print(f"ALS iteration {iteration + 1}/{self.iterations} complete.")
+
+        return user_factors, item_factors
+
+    def warm_start_factors(
+        self,
+        interactions: InteractionData,
+        previous_users: Sequence[str],
+        previous_items: Sequence[str],
+        previous_user_factors: np.ndarray,
+        previous_item_factors: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        rng = np.random.default_rng(self.random_state)
+        user_factors = self._init_factors(interactions.n_users, rng)
+        item_factors = self._init_factors(interactions.n_items, rng)
+
+        def carry_over(ids, previous_ids, previous_factors, target) -> np.ndarray:
+            previous_rows = {raw: row for row, raw in enumerate(previous_ids)}
+            reused = np.zeros(len(ids), dtype=bool)
+            for row, raw in enumerate(ids):
+                previous_row = previous_rows.get(raw)
+                if previous_row is not None:
+                    target[row] = previous_factors[previous_row]
+                    reused[row] = True
+            return reused
+
+        reused_users = carry_over(interactions.user_ids, previous_users, previous_user_factors, user_factors)
+        reused_items = carry_over(interactions.recipe_ids, previous_items, previous_item_factors, item_factors)
+        return user_factors, item_factors, reused_users, reused_items
@@ -0,0 +1,207 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.model_store_service import ModelArtifacts
+
+
+UserVector = Tuple[float, np.ndarray]
+
+
+class CollaborativeScorer:
+    IMPLICIT_RATING = 1.0
+
+    def __init__(
+        self,
+        user_factors: np.ndarray,
+        item_factors: np.ndarray,
+        user_bias: np.ndarray,
+        item_bias: np.ndarray,
+        global_mean: float,
+        user_index: Dict[str, int],
+        item_index: Dict[str, int],
+        rating_scale: Optional[Tuple[float, float]] = None,
+        version: Optional[str] = None,
+        algorithm: str = "svd",
+        regularization: float = 0.02,
+        alpha: float = 0.0,
+    ):
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.user_bias = user_bias
+        self.item_bias = item_bias
+        self.global_mean = float(global_mean)
+        self.user_index = user_index
+        self.item_index = item_index
+        self.rating_scale = rating_scale
+        self.version = version
+        self.algorithm = algorithm
+        self.regularization = float(regularization)
+        self.alpha = float(alpha)
+        self._item_gram: Optional[np.ndarray] = None
+        self._encoded_catalog: Optional[Tuple[Sequence[Any], np.ndarray]] = None
+
+    @classmethod
+    def from_surprise(
+        cls, model, user_ids: Optional[Sequence[str]] = None, item_ids: Optional[Sequence[str]] = None
+    ) -> "CollaborativeScorer":
+        trainset = model.trainset
+
+        def decode(raw_id, raw_ids: Optional[Sequence[str]]) -> str:
+            return str(raw_ids[raw_id]) if raw_ids is not None else str(raw_id)
+
+        user_index = {decode(trainset.to_raw_uid(inner), user_ids): inner for inner in trainset.all_users()}
+        item_index = {decode(trainset.to_raw_iid(inner), item_ids): inner for inner in trainset.all_items()}
+        return cls(
+            user_factors=np.asarray(model.pu),
+            item_factors=np.asarray(model.qi),
+            user_bias=np.asarray(model.bu),
+            item_bias=np.asarray(model.bi),
+            global_mean=trainset.global_mean,
+            user_index=user_index,
+            item_index=item_index,
+            rating_scale=trainset.rating_scale,
+        )
+
+    @classmethod
+    def from_artifacts(cls, artifacts: ModelArtifacts) -> "CollaborativeScorer":
+        manifest = artifacts.manifest
+        rating_scale = manifest.get("rating_scale")
+        return cls(
+            user_factors=artifacts.arrays["user_factors"],
+            item_factors=artifacts.arrays["item_factors"],
+            user_bias=artifacts.arrays["user_bias"],
+            item_bias=artifacts.arrays["item_bias"],
+            global_mean=manifest.get("global_mean", 0.0),
+            user_index={raw: inner for inner, raw in enumerate(artifacts.id_map["users"])},
+            item_index={raw: inner for inner, raw in enumerate(artifacts.id_map["items"])},
+            rating_scale=tuple(rating_scale) if rating_scale else None,
+            version=artifacts.version,
+            algorithm=manifest.get("algorithm", "svd"),
+            regularization=manifest.get("regularization", 0.02),
+            alpha=manifest.get("alpha", 0.0),
+        )
+
+    def to_artifacts(self) -> Tuple[Dict[str, np.ndarray], Dict[str, List[str]], Dict[str, Any]]:
+        users = [None] * len(self.user_index)
+        for raw, inner in self.user_index.items():
+            users[inner] = raw
+        items = [None] * len(self.item_index)
+        for raw, inner in self.item_index.items():
+            items[inner] = raw
+
+        arrays = {
+            "user_factors": self.user_factors,
+            "item_factors": self.item_factors,
+            "user_bias": self.user_bias,
+            "item_bias": self.item_bias,
+        }
+        manifest = {
+            "global_mean": self.global_mean,
+            "rating_scale": list(self.rating_scale) if self.rating_scale else None,
+            "n_users": len(users),
+            "n_items": len(items),
+            "n_factors": int(self.item_factors.shape[1]),
+        }
+        return arrays, {"users": users, "items": items}, manifest
+
+    @property
+    def n_items(self) -> int:
+        return self.item_factors.shape[0]
+
+    def encode_items(self, item_ids: Sequence[Any]) -> np.ndarray:
+        cached = self._encoded_catalog
+        if cached is not None and cached[0] is item_ids:
+            return cached[1]
+        get = self.item_index.get
+        rows = np.fromiter((get(str(item_id), -1) for item_id in item_ids), dtype=np.int64, count=len(item_ids))
+        self._encoded_catalog = (item_ids, rows)
+        return rows
+
+    def fold_in(self, item_ids: Sequence[Any]) -> Optional[UserVector]:
+        get = self.item_index.get
+        rows = np.array([row for row in (get(str(item_id)) for item_id in item_ids) if row is not None], dtype=np.int64)
+        if not len(rows):
+            return None
+
+        factors = np.asarray(self.item_factors[rows], dtype=np.float64)
+        k = factors.shape[1]
+        if self.algorithm == "als":
+            if self._item_gram is None:
+                item_factors = np.asarray(self.item_factors, dtype=np.float64)
+                self._item_gram = item_factors.T @ item_factors
+            lhs = self._item_gram + self.alpha * (factors.T @ factors) + self.regularization * np.eye(k)
+            rhs = (1.0 + self.alpha) * factors.sum(axis=0)
+            return 0.0, np.linalg.solve(lhs, rhs)
+
+        design = np.hstack([np.ones((len(rows), 1)), factors])
+        residuals = self.IMPLICIT_RATING - self.global_mean - self.item_bias[rows]
+        solution = np.linalg.solve(design.T @ design + self.regularization * np.eye(k + 1), design.T @ residuals)
+        return float(solution[0]), solution[1:]
+
+    def _user_vector(self, user_id: Any, override: Optional[UserVector] = None) -> Optional[UserVector]:
+        if override is not None:
+            return override
+        inner_uid = self.user_index.get(str(user_id))
+        if inner_uid is None:
+            return None
+        return float(self.user_bias[inner_uid]), self.user_factors[inner_uid]
+
+    def score(self, user_id: Any, item_rows: np.ndarray, user_vector: Optional[UserVector] = None) -> np.ndarray:
+        return self.score_candidates(user_id, item_rows, user_vector)
+
+    def score_candidates(self, user_id: Any, item_rows: np.ndarray, user_vector: Optional[UserVector] = None) -> np.ndarray:
+        known = item_rows >= 0
+        known_rows = item_rows[known]
+        vector = self._user_vector(user_id, user_vector)
+
+        scores = np.full(item_rows.shape[0], self.global_mean, dtype=np.float64)
+        if vector is not None:
+            scores += vector[0]
+        scores[known] += self.item_bias[known_rows]
+        if vector is not None:
+            scores[known] += self.item_factors[known_rows] @ vector[1]
+
+        if self.rating_scale is not None:
+            np.clip(scores, self.rating_scale[0], self.rating_scale[1], out=scores)
+        return scores
+
+    def score_batch(
+        self, user_ids: Sequence[Any], item_rows: np.ndarray, user_vectors: Optional[Dict[str, UserVector]] = None
+    ) -> Iterator[np.ndarray]:
+        known = item_rows >= 0
+        known_rows = item_rows[known]
+        user_vectors = user_vectors or {}
+        vectors = [self._user_vector(user_id, user_vectors.get(str(user_id))) for user_id in user_ids]
+        stacked = [vector[1] for vector in vectors if vector is not None]
+        item_dots = self.item_factors @ np.vstack(stacked).T if stacked else None
+
+        item_bias = self.item_bias[known_rows]
+        column = 0
+        for vector in vectors:
+            scores = np.full(item_rows.shape[0], self.global_mean, dtype=np.float64)
+            if vector is not None:
+                scores += vector[0]
+            scores[known] += item_bias
+            if vector is not None:
+                scores[known] += item_dots[known_rows, column]
+                column += 1
+            if self.rating_scale is not None:
+                np.clip(scores, self.rating_scale[0], self.rating_scale[1], out=scores)
+            yield scores
+
+    @staticmethod
+    def top_n(scores: np.ndarray, n: int, exclude: Optional[np.ndarray] = None) -> np.ndarray:
+        scores = np.array(scores, dtype=np.float64, copy=True)
+        if exclude is not None and len(exclude):
+            scores[exclude] = -np.inf
+
+        n_valid = int(np.count_nonzero(scores > -np.inf))
+        k = min(n, n_valid)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        threshold = -np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(scores >= threshold)
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return ranked[:k]
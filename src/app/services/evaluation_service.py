@@ -0,0 +1,54 @@
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.services.training_data_service import InteractionData
+
+
+class RecommendationEvaluationService:
+    def leave_k_out_split(
+        self, interactions: InteractionData, k: int = 2, min_train: int = 2, seed: int = 42
+    ) -> Tuple[InteractionData, Dict[int, Set[int]]]:
+        rng = np.random.default_rng(seed)
+        order = np.argsort(interactions.user_codes, kind="stable")
+        boundaries = np.flatnonzero(np.diff(interactions.user_codes[order])) + 1
+
+        test_mask = np.zeros(len(interactions), dtype=bool)
+        held_out: Dict[int, Set[int]] = {}
+        for rows in np.split(order, boundaries):
+            if len(rows) < k + min_train:
+                continue
+            chosen = rng.choice(rows, size=k, replace=False)
+            test_mask[chosen] = True
+            held_out[int(interactions.user_codes[rows[0]])] = {int(code) for code in interactions.item_codes[chosen]}
+
+        return interactions.subset(~test_mask), held_out
+
+    def ranking_metrics(self, recommended: Sequence[str], relevant: Set[str], k: int) -> Dict[str, float]:
+        top_k = list(recommended)[:k]
+        hits = [1.0 if item in relevant else 0.0 for item in top_k]
+        n_hits = sum(hits)
+
+        dcg = sum(hit / np.log2(position + 2) for position, hit in enumerate(hits))
+        ideal_dcg = sum(1.0 / np.log2(position + 2) for position in range(min(len(relevant), k)))
+
+        return {
+            "precision": n_hits / k,
+            "recall": n_hits / len(relevant) if relevant else 0.0,
+            "ndcg": dcg / ideal_dcg if ideal_dcg else 0.0,
+        }
+
+    def latency_summary(self, latencies_seconds: List[float]) -> Dict[str, float]:
+        if not latencies_seconds:
+            return {}
+        latencies_ms = np.asarray(latencies_seconds) * 1000
+        return {
+            "mean": float(latencies_ms.mean()),
+            "p50": float(np.percentile(latencies_ms, 50)),
+            "p90": float(np.percentile(latencies_ms, 90)),
+            "p99": float(np.percentile(latencies_ms, 99)),
+            "max": float(latencies_ms.max()),
+        }
+
+
+recommendation_evaluation_service = RecommendationEvaluationService()
@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
@@ -6,14 +7,38 @@ from app.models.favorite import Favorite
 from app.models.recipe import Recipe
 from app.repositories.favorite_repository import favorite_repository
 from app.repositories.recipe_repository import recipe_repository
+from app.repositories.user_recommendation_repository import user_recommendation_repository
 from app.schemas.favorite import FavoriteCreate
 from app.schemas.recipe import ScrapedRecipeData, RecipeCreate
+from app.services.popularity_index_service import popularity_index_service
+from app.services.recommendation_cache_service import recommendation_cache_service
+from app.services.recipe_service import recipe_service
+from app.services.recommendation_service import recommendation_service
+from app.services.training_data_service import training_data_service
 
 
 class FavoriteService:
-    def __init__(self, favorite_repo, recipe_repo):
+    def __init__(self, favorite_repo, recipe_repo, recipe_service, recommendation_cache, user_recommendation_repo, popularity_index, recommendation_service, training_data):
         self.favorite_repo = favorite_repo
         self.recipe_repo = recipe_repo
+        self.recipe_service = recipe_service
+        self.recommendation_cache = recommendation_cache
+        self.user_recommendation_repo = user_recommendation_repo
+        self.popularity_index = popularity_index
+        self.recommendation_service = recommendation_service
+        self.training_data = training_data
+
+    def _on_favorites_changed(self, db: Session, user_id: UUID) -> None:
+        try:
+            self.user_recommendation_repo.mark_stale(db, user_id=user_id, changed_at=datetime.now(timezone.utc))
+        except Exception as e:
+            print(f"Could not discard precomputed recommendations for user {user_id}: {e}")
+            db.rollback()
+        try:
+            self.recommendation_service.fold_in_user(db, user_id)
+        except Exception as e:
+            print(f"Could not fold new favorites into user {user_id}'s vectors: {e}")
+        self.recommendation_cache.invalidate_user(user_id)
 
     def add_or_update_favorite(self, db: Session, user_id: UUID, recipe_data: ScrapedRecipeData, is_adapted: bool) -> Favorite:
         print("Starting `add_or_update_favorite`")
@@ -39,7 +64,7 @@ class FavoriteService:
                     nutrition=recipe_data.nutrition.model_dump_json() if recipe_data.nutrition else None,
                     cuisine_path=None
                 )
-                recipe_to_favorite = self.recipe_repo.create(db=db, obj_in=create_data)
+                recipe_to_favorite = self.recipe_service.create_recipe(db, create_data)
                 print(f"Recipe created with ID: {recipe_to_favorite.id}")
             except Exception as e:
                 print(f"Error creating recipe: {e}")
@@ -68,6 +93,8 @@ class FavoriteService:
             db.commit()
             db.refresh(db_obj)
             print(f"Favorite added with ID: {db_obj.id}")
+            self.popularity_index.record_favorite(recipe_to_favorite.id)
+            self._on_favorites_changed(db, user_id)
             return db_obj
         except Exception as e:
             print(f"Error adding favorite: {e}")
@@ -91,6 +118,9 @@ class FavoriteService:
 
                 if deleted_in_repo:
                     print("--- Servicio: El repositorio confirmó la eliminación.")
+                    self.popularity_index.record_favorite(recipe_id, delta=-1)
+                    self.training_data.record_removal(user_id, recipe_id)
+                    self._on_favorites_changed(db, user_id)
                     return True
                 else:
                     print("--- Servicio: El repositorio no pudo eliminar el favorito, aunque fue encontrado.")
@@ -114,4 +144,4 @@ class FavoriteService:
             return []
 
 
-favorite_service = FavoriteService(favorite_repository, recipe_repository)
+favorite_service = FavoriteService(favorite_repository, recipe_repository, recipe_service, recommendation_cache_service, user_recommendation_repository, popularity_index_service, recommendation_service, training_data_service)
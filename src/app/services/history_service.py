@@ -4,11 +4,23 @@ from sqlalchemy.orm import Session
 
 from app.models.history import History
 from app.repositories.history_repository import history_repository, HistoryRepository
+from app.repositories.recipe_repository import recipe_repository
 from app.schemas.history import HistoryCreate, HistoryUpdate
+from app.services.popularity_index_service import popularity_index_service
 
 class HistoryService:
-    def __init__(self, repository: HistoryRepository):
+    def __init__(self, repository: HistoryRepository, recipe_repo, popularity_index):
         self.repository = repository
+        self.recipe_repo = recipe_repo
+        self.popularity_index = popularity_index
+
+    def _record_view(self, db: Session, source_url: str) -> None:
+        try:
+            recipe = self.recipe_repo.get_by_url(db, url=source_url)
+            if recipe:
+                self.popularity_index.record_view(recipe.id)
+        except Exception as e:
+            print(f"Could not update recipe popularity for {source_url}: {e}")
 
     def add_to_history(
         self,
@@ -25,6 +37,7 @@ class HistoryService:
             )
             return self.repository.create(db=db, obj_in=history_in_create)
 
+        self._record_view(db, source_url)
         existing_history = self.repository.get_by_user_and_url(db=db, user_id=user_id, url=source_url)
 
         if existing_history:
@@ -50,4 +63,4 @@ class HistoryService:
     ) -> List[History]:
         return self.repository.get_by_user(db=db, user_id=user_id, skip=skip, limit=limit)
 
-history_service = HistoryService(history_repository)
\ No newline at end of file
+history_service = HistoryService(history_repository, recipe_repository, popularity_index_service)
\ No newline at end of file
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache, TieredCache
+from app.core.config import settings
+from app.core.singleflight import AsyncSingleFlight
+from app.core.text_matching import TOKEN_PATTERN, normalize_text, normalize_token
+from app.repositories.ingredient_catalog_repository import ingredient_catalog_repository
+from app.schemas.ingredient_catalog import IngredientCatalogCreate, IngredientCatalogUpdate
+
+
+class IngredientCatalogService:
+    def __init__(self, repository, query_cache: TieredCache, local_maxsize: int = 2048, miss_retry_seconds: int = 86400):
+        self.repository = repository
+        self.query_cache = query_cache
+        self.local = LRUCache(local_maxsize)
+        self.miss_retry_seconds = miss_retry_seconds
+        self.flights = AsyncSingleFlight("ingredient_catalog")
+
+    @staticmethod
+    def normalize_name(name: Optional[str]) -> str:
+        return " ".join(normalize_token(token) for token in TOKEN_PATTERN.findall(normalize_text(name)))
+
+    @staticmethod
+    def _as_info(entry) -> Dict[str, Any]:
+        return {"name": entry.name, "image_url": entry.image_url, "search_url": entry.search_url}
+
+    def _is_expired_miss(self, entry) -> bool:
+        # Entries without an image are retried once they are older than miss_retry_seconds.
+        if entry.image_url is not None:
+            return False
+        seen_at = entry.updated_at or entry.created_at
+        if seen_at is None:
+            return True
+        if seen_at.tzinfo is None:
+            seen_at = seen_at.replace(tzinfo=timezone.utc)
+        return (datetime.now(timezone.utc) - seen_at).total_seconds() > self.miss_retry_seconds
+
+    def _remember(self, key: str, info: Dict[str, Any]) -> None:
+        self.local.set(key, info, ttl_seconds=self.miss_retry_seconds if info.get("image_url") is None else None)
+
+    def get(self, db: Session, name: Optional[str]) -> Optional[Dict[str, Any]]:
+        key = self.normalize_name(name)
+        if not key:
+            return None
+        cached = self.local.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            entry = self.repository.get_by_normalized_name(db, normalized_name=key)
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"Ingredient catalog lookup failed for '{key}': {e}")
+            return None
+        # Hand the pooled connection back before callers await n8n/Google; otherwise concurrent
+        # misses can drain the pool and block the event loop on checkout.
+        db.rollback()
+        if entry is None or self._is_expired_miss(entry):
+            return None
+
+        info = self._as_info(entry)
+        self._remember(key, info)
+        return info
+
+    def extracted_name(self, text_query: str) -> Optional[str]:
+        key = self.normalize_name(text_query)
+        return self.query_cache.get(key) if key else None
+
+    def remember_extracted_name(self, text_query: str, name: str) -> None:
+        key = self.normalize_name(text_query)
+        if key:
+            self.query_cache.set(key, name)
+
+    def store(self, db: Session, info: Dict[str, Any]) -> None:
+        key = self.normalize_name(info.get("name"))
+        if not key:
+            return
+        try:
+            entry = self.repository.get_by_normalized_name(db, normalized_name=key)
+            if entry is None:
+                entry = self.repository.create_if_missing(db, obj_in=IngredientCatalogCreate(
+                    normalized_name=key,
+                    name=info["name"],
+                    image_url=info.get("image_url"),
+                    search_url=info.get("search_url"),
+                ))
+            elif entry.image_url is None:
+                # A retried miss: store the image if one turned up, or restart the retry period.
+                entry = self.repository.update(db, db_obj=entry, obj_in=IngredientCatalogUpdate(
+                    name=info["name"],
+                    image_url=info.get("image_url"),
+                    search_url=info.get("search_url"),
+                ))
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"Could not store ingredient '{key}' in the catalog: {e}")
+            return
+        if entry is not None:
+            self._remember(key, self._as_info(entry))
+
+    async def resolve(
+        self, db: Session, name: str, fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        known = await asyncio.to_thread(self.get, db, name)
+        if known is not None:
+            print(f"Ingredient catalog hit for '{name}'.")
+            return known
+
+        async def fetch_and_store() -> Optional[Dict[str, Any]]:
+            info = await fetch()
+            if info is not None:
+                await asyncio.to_thread(self.store, db, info)
+            return info
+
+        return await self.flights.do(self.normalize_name(name), fetch_and_store)
+
+
+ingredient_catalog_service = IngredientCatalogService(
+    ingredient_catalog_repository,
+    TieredCache(
+        namespace="ingredient_queries",
+        ttl_seconds=settings.INGREDIENT_QUERY_CACHE_TTL_SECONDS,
+        local_maxsize=settings.INGREDIENT_CATALOG_LOCAL_SIZE,
+    ),
+    local_maxsize=settings.INGREDIENT_CATALOG_LOCAL_SIZE,
+    miss_retry_seconds=settings.INGREDIENT_CATALOG_MISS_RETRY_SECONDS,
+)
@@ -0,0 +1,283 @@
+import fcntl
+import os
+import pickle
+import threading
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.core.config import settings
+
+
+class IngredientIndexService:
+    def __init__(self, storage_dir: str):
+        self.storage_dir = storage_dir
+        self.index_path = os.path.join(self.storage_dir, "ingredient_index.pkl")
+        self.delta_path = os.path.join(self.storage_dir, "ingredient_index_delta.pkl")
+        self.lock_path = os.path.join(self.storage_dir, "ingredient_index.lock")
+
+        self._lock = threading.RLock()
+        self.build_id: Optional[str] = None
+        self.vectorizer: Optional[TfidfVectorizer] = None
+        self.matrix: Optional[sp.csr_matrix] = None
+        self.recipe_ids: List[str] = []
+        self.id_to_row: Dict[str, int] = {}
+        self._delta_rows: List[sp.csr_matrix] = []
+        self._delta_ids: List[str] = []
+        self._loaded_signature: Optional[Tuple[Optional[int], Optional[int]]] = None
+        self._column_index: Optional[Tuple[sp.csr_matrix, sp.csc_matrix]] = None
+
+    @staticmethod
+    def clean_text(text: Any) -> str:
+        if not isinstance(text, str):
+            return ""
+        return text.replace("\n", " ").lower()
+
+    def is_ready(self) -> bool:
+        return self.matrix is not None and self.vectorizer is not None
+
+    def _file_signature(self) -> Tuple[Optional[int], Optional[int]]:
+        def mtime(path: str) -> Optional[int]:
+            try:
+                return os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                return None
+        return mtime(self.index_path), mtime(self.delta_path)
+
+    def _write_atomically(self, path: str, payload: Dict[str, Any]) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def _read_delta_chunks(self) -> Iterator[Dict[str, Any]]:
+        # The delta file is a sequence of pickled chunks, one per add; a torn final write is skipped.
+        try:
+            with open(self.delta_path, "rb") as f:
+                while True:
+                    try:
+                        yield pickle.load(f)
+                    except EOFError:
+                        return
+        except (OSError, pickle.UnpicklingError) as e:
+            print(f"Ingredient index: stopped reading {self.delta_path}: {e}")
+
+    def _file_lock(self):
+        os.makedirs(self.storage_dir, exist_ok=True)
+        lock_file = open(self.lock_path, "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def _set_state(self, build_id, vectorizer, matrix, ids, delta_rows, delta_ids) -> None:
+        if delta_rows:
+            matrix = sp.vstack([matrix] + delta_rows, format="csr")
+        self.build_id = build_id
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.recipe_ids = list(ids) + list(delta_ids)
+        self.id_to_row = {rid: row for row, rid in enumerate(self.recipe_ids)}
+        self._delta_rows = list(delta_rows)
+        self._delta_ids = list(delta_ids)
+
+    def build(self, documents: Iterable[Tuple[Any, Optional[str]]]) -> int:
+        print("Ingredient index: building from scratch...")
+        ids: List[str] = []
+        docs: List[str] = []
+        for recipe_id, ingredients in documents:
+            text = self.clean_text(ingredients)
+            if text:
+                ids.append(str(recipe_id))
+                docs.append(text)
+
+        if not docs:
+            print("Ingredient index: No recipes with valid ingredients found.")
+            return 0
+
+        vectorizer = TfidfVectorizer(dtype=np.float32)
+        matrix = vectorizer.fit_transform(docs).tocsr()
+        build_id = uuid.uuid4().hex
+
+        with self._lock, self._file_lock():
+            self._write_atomically(self.index_path, {
+                "build_id": build_id,
+                "vectorizer": vectorizer,
+                "matrix": matrix,
+                "recipe_ids": ids,
+            })
+            if os.path.exists(self.delta_path):
+                os.remove(self.delta_path)
+            self._set_state(build_id, vectorizer, matrix, ids, [], [])
+            self._loaded_signature = self._file_signature()
+
+        print(f"Ingredient index: built with {len(ids)} recipes and {len(vectorizer.vocabulary_)} terms.")
+        return len(ids)
+
+    def load(self) -> bool:
+        with self._lock:
+            signature = self._file_signature()
+            if signature[0] is None:
+                return False
+
+            try:
+                with open(self.index_path, "rb") as f:
+                    base = pickle.load(f)
+            except (pickle.UnpicklingError, EOFError, Exception) as e:
+                print(f"Ingredient index: Error loading from {self.storage_dir}: {e}")
+                return False
+
+            delta_rows, delta_ids = [], []
+            if signature[1] is not None:
+                for chunk in self._read_delta_chunks():
+                    if chunk.get("build_id") == base["build_id"]:
+                        # Files written before deltas were appended hold every row in one list.
+                        delta_rows.extend(chunk["rows"] if isinstance(chunk["rows"], list) else [chunk["rows"]])
+                        delta_ids.extend(chunk["recipe_ids"])
+
+            self._set_state(base["build_id"], base["vectorizer"], base["matrix"], base["recipe_ids"], delta_rows, delta_ids)
+            self._loaded_signature = signature
+
+        print(f"Ingredient index: loaded {len(self.recipe_ids)} recipes ({len(delta_ids)} added incrementally).")
+        return True
+
+    def refresh_if_changed(self) -> bool:
+        if self.is_ready() and self._file_signature() == self._loaded_signature:
+            return False
+        return self.load()
+
+    def add_recipe(self, recipe_id: Any, ingredients: Optional[str]) -> bool:
+        return self.add_recipes([(recipe_id, ingredients)]) == 1
+
+    def add_recipes(self, documents: Iterable[Tuple[Any, Optional[str]]]) -> int:
+        with self._lock, self._file_lock():
+            self.refresh_if_changed()
+            if not self.is_ready():
+                return 0
+
+            ids: List[str] = []
+            docs: List[str] = []
+            for recipe_id, ingredients in documents:
+                rid, text = str(recipe_id), self.clean_text(ingredients)
+                if text and rid not in self.id_to_row and rid not in ids:
+                    ids.append(rid)
+                    docs.append(text)
+            if not ids:
+                return 0
+
+            rows = self.vectorizer.transform(docs).tocsr()
+            with open(self.delta_path, "ab") as f:
+                pickle.dump({"build_id": self.build_id, "rows": rows, "recipe_ids": ids}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            self.matrix = sp.vstack([self.matrix, rows], format="csr")
+            first_row = len(self.recipe_ids)
+            self.recipe_ids = self.recipe_ids + ids
+            self.id_to_row = {**self.id_to_row, **{rid: first_row + offset for offset, rid in enumerate(ids)}}
+            self._delta_rows = self._delta_rows + [rows]
+            self._delta_ids = self._delta_ids + ids
+            self._loaded_signature = self._file_signature()
+        return len(ids)
+
+    @staticmethod
+    def _top_rows(scores: np.ndarray, exclude_rows: Sequence[int], n: int) -> np.ndarray:
+        scores[exclude_rows] = -np.inf
+        k = min(n, len(scores) - len(set(exclude_rows)))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def profile(self, favorite_ids: Sequence[Any]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        with self._lock:
+            matrix, id_to_row = self.matrix, self.id_to_row
+        if matrix is None:
+            return None
+        rows = [id_to_row[str(rid)] for rid in favorite_ids if str(rid) in id_to_row]
+        if not rows:
+            return None
+        dense = np.asarray(matrix[rows].mean(axis=0)).ravel()
+        indices = np.flatnonzero(dense)
+        return indices, dense[indices]
+
+    def dense_profile(self, favorite_ids: Sequence[Any], profile: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Optional[np.ndarray]:
+        matrix = self.matrix
+        if profile is None:
+            profile = self.profile(favorite_ids)
+        if matrix is None or profile is None:
+            return None
+        dense = np.zeros(matrix.shape[1], dtype=profile[1].dtype)
+        dense[profile[0]] = profile[1]
+        return dense
+
+    def _columns(self) -> Optional[sp.csc_matrix]:
+        with self._lock:
+            matrix, cached = self.matrix, self._column_index
+            if matrix is None:
+                return None
+            if cached is None or cached[0] is not matrix:
+                cached = (matrix, matrix.tocsc())
+                self._column_index = cached
+        return cached[1]
+
+    def candidates_from_profile(self, dense_profile: np.ndarray, n: int, n_terms: int = 10) -> np.ndarray:
+        columns = self._columns()
+        terms = np.flatnonzero(dense_profile)
+        if columns is None or not len(terms):
+            return np.empty(0, dtype=np.int64)
+
+        if len(terms) > n_terms:
+            terms = terms[np.argpartition(-dense_profile[terms], n_terms - 1)[:n_terms]]
+        per_term = max(1, n // len(terms))
+        rows = []
+        for term in terms:
+            start, stop = columns.indptr[term], columns.indptr[term + 1]
+            term_rows, weights = columns.indices[start:stop], columns.data[start:stop]
+            if len(term_rows) > per_term:
+                term_rows = term_rows[np.argpartition(-weights, per_term - 1)[:per_term]]
+            rows.append(term_rows)
+        return np.unique(np.concatenate(rows)).astype(np.int64)
+
+    def score_rows(self, rows: np.ndarray, dense_profile: np.ndarray) -> np.ndarray:
+        return np.asarray(self.matrix[rows] @ dense_profile).ravel()
+
+    def top_similar(self, favorite_ids: Sequence[Any], n: int, profile: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> List[str]:
+        with self._lock:
+            matrix, recipe_ids, id_to_row = self.matrix, self.recipe_ids, self.id_to_row
+
+        if matrix is None:
+            return []
+        rows = [id_to_row[str(rid)] for rid in favorite_ids if str(rid) in id_to_row]
+        if not rows:
+            return []
+
+        if profile is not None:
+            dense = np.zeros(matrix.shape[1], dtype=profile[1].dtype)
+            dense[profile[0]] = profile[1]
+        else:
+            dense = np.asarray(matrix[rows].mean(axis=0)).ravel()
+        scores = matrix @ dense
+        return [recipe_ids[i] for i in self._top_rows(scores, rows, n)]
+
+    def top_similar_batch(self, favorite_id_lists: Sequence[Sequence[Any]], n: int) -> List[List[Tuple[str, float]]]:
+        with self._lock:
+            matrix, recipe_ids, id_to_row = self.matrix, self.recipe_ids, self.id_to_row
+
+        results: List[List[Tuple[str, float]]] = [[] for _ in favorite_id_lists]
+        if matrix is None:
+            return results
+
+        user_rows = [[id_to_row[str(rid)] for rid in ids if str(rid) in id_to_row] for ids in favorite_id_lists]
+        positions = [position for position, rows in enumerate(user_rows) if rows]
+        if not positions:
+            return results
+
+        profiles = np.vstack([np.asarray(matrix[user_rows[position]].mean(axis=0)) for position in positions])
+        all_scores = np.asarray(matrix @ profiles.T)
+        for column, position in enumerate(positions):
+            scores = all_scores[:, column]
+            top = self._top_rows(scores, user_rows[position], n)
+            results[position] = [(recipe_ids[i], float(scores[i])) for i in top]
+        return results
+
+ingredient_index_service = IngredientIndexService(settings.MODEL_STORAGE_PATH)
@@ -0,0 +1,112 @@
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class ModelArtifacts:
+    def __init__(self, version: str, arrays: Dict[str, np.ndarray], id_map: Dict[str, List[str]], manifest: Dict[str, Any]):
+        self.version = version
+        self.arrays = arrays
+        self.id_map = id_map
+        self.manifest = manifest
+
+
+class ModelStore:
+    CURRENT_FILE = "CURRENT"
+    MANIFEST_FILE = "manifest.json"
+    ID_MAP_FILE = "id_map.json"
+
+    def __init__(self, storage_dir: str, name: str = "collaborative", keep_versions: int = 2):
+        self.root = os.path.join(storage_dir, name)
+        self.current_path = os.path.join(self.root, self.CURRENT_FILE)
+        self.keep_versions = keep_versions
+        self._current_cache: Tuple[Optional[int], Optional[str]] = (None, None)
+
+    def current_version(self) -> Optional[str]:
+        try:
+            mtime = os.stat(self.current_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        cached_mtime, cached_version = self._current_cache
+        if cached_mtime == mtime:
+            return cached_version
+
+        with open(self.current_path, "r", encoding="utf-8") as f:
+            version = f.read().strip() or None
+        self._current_cache = (mtime, version)
+        return version
+
+    def save(self, arrays: Dict[str, np.ndarray], id_map: Dict[str, List[str]], manifest: Dict[str, Any]) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        version = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        tmp_dir = os.path.join(self.root, f".tmp-{version}")
+        os.makedirs(tmp_dir)
+
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+            with open(os.path.join(tmp_dir, self.ID_MAP_FILE), "w", encoding="utf-8") as f:
+                json.dump(id_map, f)
+            full_manifest = {
+                **manifest,
+                "version": version,
+                "arrays": sorted(arrays.keys()),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            with open(os.path.join(tmp_dir, self.MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(full_manifest, f, indent=2)
+
+            os.rename(tmp_dir, os.path.join(self.root, version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        tmp_current = f"{self.current_path}.{os.getpid()}.tmp"
+        with open(tmp_current, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_current, self.current_path)
+
+        self._prune_old_versions(keep=version)
+        return version
+
+    def _prune_old_versions(self, keep: str) -> None:
+        versions = sorted(
+            entry for entry in os.listdir(self.root)
+            if not entry.startswith(".") and entry != self.CURRENT_FILE and os.path.isdir(os.path.join(self.root, entry))
+        )
+        older = [v for v in versions if v != keep]
+        excess = len(older) - max(self.keep_versions - 1, 0)
+        for version in older[:max(excess, 0)]:
+            shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
+
+    def load(self, version: Optional[str] = None) -> Optional[ModelArtifacts]:
+        version = version or self.current_version()
+        if not version:
+            return None
+
+        version_dir = os.path.join(self.root, version)
+        try:
+            with open(os.path.join(version_dir, self.MANIFEST_FILE), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            with open(os.path.join(version_dir, self.ID_MAP_FILE), "r", encoding="utf-8") as f:
+                id_map = json.load(f)
+            arrays = {
+                name: np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode="r")
+                for name in manifest.get("arrays", [])
+            }
+        except (OSError, ValueError) as e:
+            print(f"Error loading model artifacts version {version}: {e}")
+            return None
+
+        return ModelArtifacts(version=version, arrays=arrays, id_map=id_map, manifest=manifest)
+
+
+collaborative_model_store = ModelStore(settings.MODEL_STORAGE_PATH)
@@ -0,0 +1,212 @@
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import RedisConnection, redis_connection
+from app.core.config import settings
+from app.repositories.favorite_repository import favorite_repository
+from app.repositories.history_repository import history_repository
+
+
+class PopularityIndexService:
+    ZADD_CHUNK_SIZE = 10000
+    REBASE_AFTER_EXPONENT = 50.0
+
+    def __init__(
+        self,
+        favorite_repo,
+        history_repo,
+        connection: RedisConnection = redis_connection,
+        namespace: str = "popularity",
+        half_life_days: float = 14.0,
+        history_weight: float = 0.5,
+        snapshot_size: int = 1000,
+        refresh_seconds: int = 60,
+    ):
+        self.favorite_repo = favorite_repo
+        self.history_repo = history_repo
+        self.connection = connection
+        self.favorites_key = f"{namespace}:favorites"
+        self.history_key = f"{namespace}:history"
+        self.epoch_key = f"{namespace}:epoch"
+        self.built_key = f"{namespace}:built"
+        self.combined_key = f"{namespace}:combined"
+        self.tau = half_life_days * 86400 / math.log(2)
+        self.history_weight = history_weight
+        self.snapshot_size = snapshot_size
+        self.refresh_seconds = refresh_seconds
+
+        self._lock = threading.Lock()
+        self._favorites: Dict[str, float] = {}
+        self._history: Dict[str, float] = {}
+        self._epoch: Optional[float] = None
+        self._rebuilt = False
+        self._snapshot: List[Tuple[str, float]] = []
+        self._snapshot_at = 0.0
+
+    @staticmethod
+    def _timestamp(value: Optional[datetime]) -> float:
+        if value is None:
+            return time.time()
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+
+    def _decay_from(self, epoch: float, at: Optional[float] = None) -> float:
+        return math.exp(((at if at is not None else time.time()) - epoch) / self.tau)
+
+    def rebuild(self, db: Session) -> int:
+        epoch = time.time()
+        favorites: Dict[str, float] = {}
+        for recipe_id, count in self.favorite_repo.count_by_recipe(db):
+            favorites[str(recipe_id)] = float(count)
+
+        history: Dict[str, float] = {}
+        for recipe_id, viewed_at in self.history_repo.iter_recipe_views(db):
+            key = str(recipe_id)
+            history[key] = history.get(key, 0.0) + self._decay_from(epoch, self._timestamp(viewed_at))
+
+        return self.replace(favorites, history, epoch)
+
+    def replace(
+        self, favorites: Dict[str, float], history: Dict[str, float], epoch: Optional[float] = None, publish: bool = True
+    ) -> int:
+        epoch = epoch if epoch is not None else time.time()
+        with self._lock:
+            self._favorites, self._history, self._epoch = favorites, history, epoch
+            self._rebuilt = True
+            self._snapshot_at = 0.0
+
+        def publish_scores(client):
+            pipe = client.pipeline(transaction=False)
+            for key, scores in ((self.favorites_key, favorites), (self.history_key, history)):
+                staging_key = f"{key}:staging"
+                pipe.delete(staging_key)
+                items = list(scores.items())
+                for start in range(0, len(items), self.ZADD_CHUNK_SIZE):
+                    pipe.zadd(staging_key, dict(items[start:start + self.ZADD_CHUNK_SIZE]))
+                if items:
+                    pipe.rename(staging_key, key)
+                else:
+                    pipe.delete(key)
+            pipe.set(self.epoch_key, repr(epoch))
+            pipe.set(self.built_key, repr(epoch))
+            pipe.delete(f"{self.combined_key}:lock")
+            pipe.execute()
+            return True
+
+        published = publish and self.connection.call(publish_scores, default=False)
+        print(f"Popularity index rebuilt: {len(favorites)} favorited recipes, {len(history)} viewed recipes"
+              f"{'' if published else ' (kept in-process only, Redis unavailable)'}.")
+        return len(set(favorites) | set(history))
+
+    def record_favorite(self, recipe_id: Any, delta: int = 1) -> None:
+        key = str(recipe_id)
+        with self._lock:
+            self._favorites[key] = self._favorites.get(key, 0.0) + delta
+        self.connection.call(lambda client: client.zincrby(self.favorites_key, delta, key))
+
+    def record_view(self, recipe_id: Any, viewed_at: Optional[datetime] = None) -> None:
+        key = str(recipe_id)
+        at = self._timestamp(viewed_at)
+        epoch = self._current_epoch(at)
+        increment = self._decay_from(epoch, at)
+        with self._lock:
+            self._history[key] = self._history.get(key, 0.0) + increment
+        self.connection.call(lambda client: client.zincrby(self.history_key, increment, key))
+
+    def _current_epoch(self, now: float) -> float:
+        def shared_epoch(client):
+            # The first view recorded before any rebuild fixes the epoch for every process.
+            pipe = client.pipeline()
+            pipe.set(self.epoch_key, repr(self._epoch or now), nx=True)
+            pipe.get(self.epoch_key)
+            return pipe.execute()[1]
+
+        remote = self.connection.call(shared_epoch)
+        epoch = float(remote) if remote is not None else (self._epoch or now)
+        if self._epoch is None:
+            self._epoch = epoch
+        if (now - epoch) / self.tau <= self.REBASE_AFTER_EXPONENT:
+            return epoch
+
+        factor = self._decay_from(now, epoch)
+        with self._lock:
+            self._history = {key: score * factor for key, score in self._history.items()}
+            self._epoch = now
+
+        def rebase(client):
+            pipe = client.pipeline()
+            pipe.zunionstore(self.history_key, {self.history_key: factor})
+            pipe.set(self.epoch_key, repr(now))
+            pipe.execute()
+
+        self.connection.call(rebase)
+        print(f"Popularity index: rebased history scores to epoch {now:.0f}.")
+        return now
+
+    def _load_remote_snapshot(self) -> Optional[List[Tuple[str, float]]]:
+        def load(client):
+            # Until a rebuild has published the full scores, Redis only holds recent increments.
+            if not client.exists(self.built_key):
+                return None
+            raw_epoch = client.get(self.epoch_key)
+            if raw_epoch is None:
+                return None
+            if client.set(f"{self.combined_key}:lock", 1, nx=True, ex=self.refresh_seconds) or not client.exists(self.combined_key):
+                history_weight = self.history_weight / self._decay_from(float(raw_epoch))
+                client.zunionstore(self.combined_key, {self.favorites_key: 1.0, self.history_key: history_weight})
+            top = client.zrevrangebyscore(self.combined_key, "+inf", "(0", start=0, num=self.snapshot_size, withscores=True)
+            return [(member.decode() if isinstance(member, bytes) else member, float(score)) for member, score in top]
+
+        return self.connection.call(load)
+
+    def _local_snapshot(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            favorites, history, epoch = dict(self._favorites), dict(self._history), self._epoch
+        history_weight = self.history_weight / self._decay_from(epoch) if epoch is not None else 0.0
+        combined = dict(favorites)
+        for key, score in history.items():
+            combined[key] = combined.get(key, 0.0) + history_weight * score
+        ranked = sorted(((key, score) for key, score in combined.items() if score > 0), key=lambda item: (item[1], item[0]), reverse=True)
+        return ranked[:self.snapshot_size]
+
+    def snapshot(self, db: Optional[Session] = None) -> List[Tuple[str, float]]:
+        if self._snapshot and time.monotonic() - self._snapshot_at < self.refresh_seconds:
+            return self._snapshot
+
+        snapshot = self._load_remote_snapshot()
+        if snapshot is None:
+            if not self._rebuilt and db is not None:
+                self.rebuild(db)
+                snapshot = self._load_remote_snapshot()
+            if snapshot is None:
+                snapshot = self._local_snapshot()
+
+        self._snapshot, self._snapshot_at = snapshot, time.monotonic()
+        return snapshot
+
+    def top_popular(self, n: int, exclude: Iterable[Any] = (), db: Optional[Session] = None) -> List[Tuple[str, float]]:
+        excluded = {str(recipe_id) for recipe_id in exclude}
+        popular = []
+        for recipe_id, score in self.snapshot(db):
+            if recipe_id in excluded:
+                continue
+            popular.append((recipe_id, score))
+            if len(popular) >= n:
+                break
+        return popular
+
+
+popularity_index_service = PopularityIndexService(
+    favorite_repository,
+    history_repository,
+    half_life_days=settings.POPULARITY_HISTORY_HALF_LIFE_DAYS,
+    history_weight=settings.POPULARITY_HISTORY_WEIGHT,
+    snapshot_size=settings.POPULARITY_SNAPSHOT_SIZE,
+    refresh_seconds=settings.POPULARITY_REFRESH_SECONDS,
+)
@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.collaborative_scoring_service import CollaborativeScorer
+from app.services.ingredient_index_service import ingredient_index_service
+from app.services.model_store_service import collaborative_model_store
+
+
+class RecipeNeighborService:
+    def __init__(self, storage_dir: str, ingredient_index, model_store, k: int = 50, factor_weight: float = 0.5, chunk_bytes: int = 64 * 2 ** 20):
+        self.storage_dir = storage_dir
+        self.path = os.path.join(self.storage_dir, "recipe_neighbors.npz")
+        self.ingredient_index = ingredient_index
+        self.model_store = model_store
+        self.k = k
+        self.factor_weight = factor_weight
+        self.chunk_bytes = chunk_bytes
+
+        self._lock = threading.Lock()
+        self.indptr: Optional[np.ndarray] = None
+        self.indices: Optional[np.ndarray] = None
+        self.data: Optional[np.ndarray] = None
+        self.recipe_ids: List[str] = []
+        self.id_to_row: Dict[str, int] = {}
+        self._loaded_mtime: Optional[int] = None
+
+    def is_ready(self) -> bool:
+        return self.indptr is not None
+
+    def _load_scorer(self) -> Optional[CollaborativeScorer]:
+        artifacts = self.model_store.load()
+        return CollaborativeScorer.from_artifacts(artifacts) if artifacts else None
+
+    @staticmethod
+    def _normalized_factors(scorer: CollaborativeScorer, catalog_ids: List[str]):
+        rows = scorer.encode_items(catalog_ids)
+        known = rows >= 0
+        factors = np.zeros((len(catalog_ids), scorer.item_factors.shape[1]), dtype=np.float32)
+        factors[known] = scorer.item_factors[rows[known]]
+        norms = np.linalg.norm(factors, axis=1, keepdims=True)
+        np.divide(factors, norms, out=factors, where=norms > 0)
+        return factors, known
+
+    def build(self) -> int:
+        self.ingredient_index.refresh_if_changed()
+        if not self.ingredient_index.is_ready():
+            print("Recipe neighbors: ingredient index is not available. Aborting.")
+            return 0
+
+        started = time.perf_counter()
+        matrix, catalog_ids = self.ingredient_index.matrix, list(self.ingredient_index.recipe_ids)
+        n_recipes = len(catalog_ids)
+        k = min(self.k, n_recipes - 1)
+        if k <= 0:
+            return 0
+
+        scorer = self._load_scorer()
+        factors, known = self._normalized_factors(scorer, catalog_ids) if scorer else (None, None)
+        matrix_t = matrix.T.tocsc()
+        chunk_size = max(1, self.chunk_bytes // (n_recipes * 4 * (4 if scorer else 2)))
+        print(f"Recipe neighbors: building top-{k} for {n_recipes} recipes in chunks of {chunk_size} "
+              f"({'TF-IDF + item factors' if scorer else 'TF-IDF only'}).")
+
+        counts = np.zeros(n_recipes, dtype=np.int64)
+        indices_parts, data_parts = [], []
+        for start in range(0, n_recipes, chunk_size):
+            stop = min(start + chunk_size, n_recipes)
+            sims = (matrix[start:stop] @ matrix_t).toarray().astype(np.float32, copy=False)
+
+            if scorer is not None:
+                factor_sims = factors[start:stop] @ factors.T
+                both_known = known[start:stop, None] & known[None, :]
+                sims = np.where(both_known, (1 - self.factor_weight) * sims + self.factor_weight * factor_sims, sims)
+
+            sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            top_sims = np.take_along_axis(sims, top, axis=1)
+            order = np.argsort(-top_sims, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_sims = np.take_along_axis(top_sims, order, axis=1)
+
+            keep = top_sims > 0
+            counts[start:stop] = keep.sum(axis=1)
+            indices_parts.append(top[keep].astype(np.int32))
+            data_parts.append(top_sims[keep].astype(np.float32))
+
+        indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        indices = np.concatenate(indices_parts) if indices_parts else np.empty(0, dtype=np.int32)
+        data = np.concatenate(data_parts) if data_parts else np.empty(0, dtype=np.float32)
+
+        os.makedirs(self.storage_dir, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            indptr=indptr,
+            indices=indices,
+            data=data,
+            recipe_ids=np.array(catalog_ids),
+            model_version=np.array(scorer.version if scorer else ""),
+        )
+        os.replace(tmp_path, self.path)
+        self.load()
+
+        print(f"Recipe neighbors: stored {len(indices)} neighbor pairs in {time.perf_counter() - started:.1f}s "
+              f"({(indptr.nbytes + indices.nbytes + data.nbytes) / 2 ** 20:.1f} MB).")
+        return n_recipes
+
+    def load(self) -> bool:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._loaded_mtime:
+            return True
+
+        try:
+            with np.load(self.path) as stored:
+                indptr, indices, data = stored["indptr"], stored["indices"], stored["data"]
+                recipe_ids = stored["recipe_ids"].tolist()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Recipe neighbors: Error loading from {self.path}: {e}")
+            return False
+
+        with self._lock:
+            self.indptr, self.indices, self.data = indptr, indices, data
+            self.recipe_ids = recipe_ids
+            self.id_to_row = {rid: row for row, rid in enumerate(recipe_ids)}
+            self._loaded_mtime = mtime
+        print(f"Recipe neighbors: loaded neighbors for {len(recipe_ids)} recipes.")
+        return True
+
+    def _similar_from_ingredients(self, recipe_id: str, n: int) -> Optional[List[str]]:
+        self.ingredient_index.refresh_if_changed()
+        if recipe_id not in self.ingredient_index.id_to_row:
+            return None
+        return self.ingredient_index.top_similar([recipe_id], n)
+
+    def similar(self, recipe_id: Any, n: int, fallback: bool = True) -> Optional[List[str]]:
+        rid = str(recipe_id)
+        self.load()
+        with self._lock:
+            row = self.id_to_row.get(rid)
+            if row is not None:
+                start, stop = self.indptr[row], self.indptr[row + 1]
+                return [self.recipe_ids[i] for i in self.indices[start:min(stop, start + n)]]
+        return self._similar_from_ingredients(rid, n) if fallback else None
+
+
+recipe_neighbor_service = RecipeNeighborService(
+    settings.MODEL_STORAGE_PATH,
+    ingredient_index_service,
+    collaborative_model_store,
+    k=settings.RECIPE_NEIGHBORS_K,
+    factor_weight=settings.RECIPE_NEIGHBORS_FACTOR_WEIGHT,
+    chunk_bytes=settings.RECIPE_NEIGHBORS_CHUNK_MB * 2 ** 20,
+)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.cache import TieredCache
+from app.core.config import settings
+from app.core.singleflight import AsyncSingleFlight
+from app.core.urls import canonical_url
+from app.repositories.history_repository import history_repository
+
+
+class RecipeScrapeCacheService:
+    """Caches the processed /recipes/scrape result (nutrition included) per canonical URL.
+
+    Entries older than fresh_seconds are still served, and refreshed in the background.
+    """
+
+    def __init__(self, cache: TieredCache, history_repo, fresh_seconds: int, retry_seconds: int = 3600):
+        self.cache = cache
+        self.history_repo = history_repo
+        self.fresh_seconds = fresh_seconds
+        self.retry_seconds = retry_seconds
+        self.flights = AsyncSingleFlight("scrape_pipeline")
+        self._background_tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def is_complete(data: Any) -> bool:
+        return isinstance(data, dict) and bool(data.get("title")) and data.get("nutrition") is not None
+
+    def _store(self, key: str, data: Dict[str, Any], fetched_at: Optional[float] = None) -> None:
+        self.cache.set(key, {"data": data, "fetched_at": fetched_at or time.time()})
+
+    def _lookup(self, db: Optional[Session], key: str, url: str) -> Optional[Dict[str, Any]]:
+        entry = self.cache.get(key)
+        if entry is not None or db is None:
+            return entry
+
+        try:
+            history = self.history_repo.get_latest_scraped(db, urls=list({key, url}))
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"Scrape cache: history lookup failed for {key}: {e}")
+            return None
+        # Release the connection before the caller awaits the scraping pipeline.
+        db.rollback()
+        if history is None or not self.is_complete(history.recipe_data):
+            return None
+
+        seen_at = history.updated_at or history.created_at
+        entry = {"data": history.recipe_data, "fetched_at": seen_at.timestamp() if seen_at else 0.0}
+        self.cache.set(key, entry)
+        return entry
+
+    async def _run_and_store(self, key: str, run: Callable[[], Awaitable[Any]]) -> Any:
+        data = await run()
+        if self.is_complete(data):
+            self._store(key, data)
+        return data
+
+    async def _refresh(self, key: str, run: Callable[[], Awaitable[Any]], entry: Dict[str, Any]) -> Any:
+        data = None
+        try:
+            data = await self._run_and_store(key, run)
+            return data
+        finally:
+            if not self.is_complete(data):
+                # Keep serving the old data, and only try again after retry_seconds.
+                self._store(key, entry["data"], fetched_at=time.time() - self.fresh_seconds + self.retry_seconds)
+
+    def _refresh_in_background(self, key: str, run: Callable[[], Awaitable[Any]], entry: Dict[str, Any]) -> None:
+        task = asyncio.create_task(self.flights.do(key, self._refresh, key, run, entry))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._finish_refresh)
+
+    def _finish_refresh(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Scrape cache: background refresh failed: {task.exception()}")
+
+    async def get_or_scrape(self, db: Optional[Session], url: str, run: Callable[[], Awaitable[Any]]) -> Any:
+        key = canonical_url(url)
+        entry = self._lookup(db, key, url)
+        if entry is not None:
+            age = time.time() - entry["fetched_at"]
+            if age > self.fresh_seconds:
+                print(f"Scrape cache: stale entry for {key} ({age / 3600:.0f} h old), refreshing in the background.")
+                self._refresh_in_background(key, run, entry)
+            else:
+                print(f"Scrape cache hit for {key}.")
+            return entry["data"]
+
+        return await self.flights.do(key, self._run_and_store, key, run)
+
+
+recipe_scrape_cache_service = RecipeScrapeCacheService(
+    TieredCache(
+        namespace="scraped_recipes",
+        ttl_seconds=settings.SCRAPE_CACHE_TTL_SECONDS,
+        local_maxsize=settings.SCRAPE_CACHE_LOCAL_SIZE,
+    ),
+    history_repository,
+    fresh_seconds=settings.SCRAPE_CACHE_FRESH_SECONDS,
+    retry_seconds=settings.SCRAPE_CACHE_RETRY_SECONDS,
+)
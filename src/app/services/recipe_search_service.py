@@ -0,0 +1,194 @@
+import os
+import pickle
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.text_matching import SPANISH_STOPWORDS, normalize_text, tokenize
+from app.repositories.recipe_repository import recipe_repository
+
+class BM25Index:
+    def __init__(self, k1: float = 1.2, b: float = 0.75, title_weight: int = 2):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.vocabulary: Dict[str, int] = {}
+        self.weights: Optional[sp.csc_matrix] = None
+        self.documents: List[Dict[str, Any]] = []
+
+    def build(self, documents) -> int:
+        rows, cols, counts = [], [], []
+        self.documents = []
+        for recipe_id, title, ingredients, url, image_url in documents:
+            terms = Counter(tokenize(title) * self.title_weight + tokenize(ingredients))
+            if not terms:
+                continue
+            row = len(self.documents)
+            self.documents.append({"id": str(recipe_id), "title": title, "url": url, "image_url": image_url})
+            for term, count in terms.items():
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                counts.append(count)
+
+        n_docs, n_terms = len(self.documents), len(self.vocabulary)
+        tf = sp.csr_matrix((np.asarray(counts, dtype=np.float32), (rows, cols)), shape=(n_docs, n_terms))
+        if n_docs:
+            lengths = np.asarray(tf.sum(axis=1)).ravel()
+            document_frequency = np.bincount(tf.indices, minlength=n_terms)
+            idf = np.log1p((n_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths / lengths.mean())
+            row_of_entry = np.repeat(np.arange(n_docs), np.diff(tf.indptr))
+            tf.data = (idf[tf.indices] * tf.data * (self.k1 + 1) / (tf.data + norm[row_of_entry])).astype(np.float32)
+        self.weights = tf.tocsc()
+        return n_docs
+
+    def search(self, terms: Sequence[str], excluded: Sequence[str], limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        if self.weights is None or not terms:
+            return []
+        columns = [self.vocabulary.get(term) for term in dict.fromkeys(terms)]
+        if any(column is None for column in columns):
+            return []
+
+        matched = self.weights[:, columns].tocsr()
+        scores = np.asarray(matched.sum(axis=1)).ravel()
+        candidates = np.diff(matched.indptr) == len(columns)
+
+        excluded_columns = [self.vocabulary[term] for term in set(excluded) if term in self.vocabulary]
+        if excluded_columns:
+            candidates &= np.diff(self.weights[:, excluded_columns].tocsr().indptr) == 0
+
+        rows = np.flatnonzero(candidates)
+        rows = rows[np.argsort(-scores[rows], kind="stable")][offset:offset + limit]
+        return [{**self.documents[row], "score": float(scores[row])} for row in rows]
+
+
+class RecipeSearchService:
+    # How often a request may stat the index file to pick up a rebuild from another process.
+    CHECK_INTERVAL_SECONDS = 5.0
+
+    def __init__(self, recipe_repo, storage_dir: str, refresh_seconds: int = 300):
+        self.recipe_repo = recipe_repo
+        self.index_path = os.path.join(storage_dir, "bm25_index.pkl")
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._bm25: Optional[BM25Index] = None
+        self._loaded_mtime: Optional[int] = None
+        self._checked_at = 0.0
+        self._building = False
+        self._postgres_ready: Optional[bool] = None
+
+    def rebuild(self) -> int:
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            index = BM25Index()
+            n_docs = index.build(self.recipe_repo.iter_search_documents(db))
+        finally:
+            db.close()
+
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.index_path)
+        with self._lock:
+            self._bm25, self._loaded_mtime = index, os.stat(self.index_path).st_mtime_ns
+        print(f"Local recipe search: BM25 index built over {n_docs} recipes in {(time.perf_counter() - started) * 1000:.0f} ms.")
+        return n_docs
+
+    def _rebuild_in_background(self) -> None:
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"Local recipe search: background BM25 rebuild failed: {e}")
+            finally:
+                self._building = False
+
+        threading.Thread(target=run, name="bm25-rebuild", daemon=True).start()
+
+    def _current_bm25(self) -> Optional[BM25Index]:
+        # Requests never build the index: they load what the rebuild task wrote, and only
+        # start a background build when the file is missing or overdue.
+        now = time.monotonic()
+        if self._bm25 is not None and now - self._checked_at < self.CHECK_INTERVAL_SECONDS:
+            return self._bm25
+        self._checked_at = now
+
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            self._rebuild_in_background()
+            return self._bm25
+
+        if stat.st_mtime_ns != self._loaded_mtime:
+            try:
+                with open(self.index_path, "rb") as f:
+                    index = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError) as e:
+                print(f"Local recipe search: could not load {self.index_path}: {e}")
+                self._rebuild_in_background()
+                return self._bm25
+            with self._lock:
+                self._bm25, self._loaded_mtime = index, stat.st_mtime_ns
+        if time.time() - stat.st_mtime > 2 * self.refresh_seconds:
+            self._rebuild_in_background()
+        return self._bm25
+
+    def _postgres_index_ready(self, db: Session) -> bool:
+        if self._postgres_ready is None:
+            try:
+                self._postgres_ready = self.recipe_repo.has_search_index(db)
+            except SQLAlchemyError as e:
+                db.rollback()
+                print(f"Local recipe search: could not inspect the recipes table: {e}")
+                return False
+            if not self._postgres_ready:
+                print("Local recipe search: recipes.search_vector is missing (run scripts/seed_data.py); using BM25 instead.")
+        return self._postgres_ready
+
+    @staticmethod
+    def _websearch_query(terms: Sequence[str], excluded: Sequence[str]) -> str:
+        return " ".join(list(terms) + [f"-{term}" for term in excluded])
+
+    def search(
+        self, db: Session, query: str, excluded_terms: Sequence[str] = (), limit: int = 10, offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        terms = [word for word in query.lower().split() if normalize_text(word) not in SPANISH_STOPWORDS]
+        excluded = [word.lower() for word in excluded_terms if word]
+        if not terms:
+            return []
+
+        if db.get_bind().dialect.name == "postgresql" and self._postgres_index_ready(db):
+            rows = self.recipe_repo.full_text_search(
+                db, websearch_query=self._websearch_query(terms, excluded), limit=limit, offset=offset
+            )
+            return [
+                {"id": str(recipe_id), "title": title, "url": url, "image_url": image_url, "score": float(rank)}
+                for recipe_id, title, url, image_url, rank in rows
+            ]
+
+        index = self._current_bm25()
+        if index is None:
+            return []
+        return index.search(tokenize(" ".join(terms)), tokenize(" ".join(excluded)), limit, offset)
+
+
+recipe_search_service = RecipeSearchService(
+    recipe_repository,
+    settings.MODEL_STORAGE_PATH,
+    refresh_seconds=settings.LOCAL_SEARCH_REFRESH_SECONDS,
+)
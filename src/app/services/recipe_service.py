@@ -1,18 +1,35 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from uuid import UUID
 
 from app.models.recipe import Recipe
 from app.repositories.recipe_repository import recipe_repository
 from app.schemas.recipe import RecipeCreate, RecipeUpdate
+from app.services.ingredient_index_service import ingredient_index_service
+from app.services.recipe_neighbor_service import recipe_neighbor_service
 
 
 class RecipeService:
-    def __init__(self, repository):
+    def __init__(self, repository, neighbor_index, ingredient_index):
         self.repository = repository
+        self.neighbor_index = neighbor_index
+        self.ingredient_index = ingredient_index
 
     def create_recipe(self, db: Session, recipe_in: RecipeCreate) -> Recipe:
         recipe_data = recipe_in.model_dump()
-        return self.repository.create(db=db, obj_in=RecipeCreate(**recipe_data))
+        recipe = self.repository.create(db=db, obj_in=RecipeCreate(**recipe_data))
+        try:
+            self.ingredient_index.add_recipe(recipe.id, recipe.ingredients)
+        except Exception as e:
+            print(f"Could not add recipe {recipe.id} to the ingredient index: {e}")
+        return recipe
+
+    def sync_ingredient_index(self, db: Session) -> int:
+        # Recipes inserted without create_recipe (seeds, bulk loads) are appended here.
+        added = self.ingredient_index.add_recipes(self.repository.iter_ingredient_documents(db))
+        if added:
+            print(f"Ingredient index: appended {added} recipes that were missing from it.")
+        return added
 
     def get_recipe(self, db: Session, recipe_id: int) -> Optional[Recipe]:
         return self.repository.get(db=db, id=recipe_id)
@@ -20,6 +37,14 @@ class RecipeService:
     def get_all_recipes(self, db: Session, skip: int = 0, limit: int = 10) -> List[Recipe]:
         return self.repository.get_multi(db=db, skip=skip, limit=limit)
 
+    def get_similar_recipes(self, db: Session, recipe_id: UUID, limit: int = 10) -> Optional[List[Recipe]]:
+        similar_ids = self.neighbor_index.similar(recipe_id, limit)
+        if similar_ids is None:
+            if self.repository.get(db=db, id=recipe_id) is None:
+                return None
+            return []
+        return self.repository.get_by_ids(db, ids=similar_ids)
+
     def update_recipe(self, db: Session, recipe_id: int, recipe_in: RecipeUpdate) -> Optional[Recipe]:
         db_recipe = self.repository.get(db=db, id=recipe_id)
         if not db_recipe:
@@ -31,4 +56,4 @@ class RecipeService:
         return deleted is not None
 
 
-recipe_service = RecipeService(recipe_repository)
+recipe_service = RecipeService(recipe_repository, recipe_neighbor_service, ingredient_index_service)
@@ -0,0 +1,116 @@
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.repositories.favorite_repository import favorite_repository
+from app.repositories.user_recommendation_repository import user_recommendation_repository
+from app.schemas.user_recommendation import UserRecommendationCreate
+from app.services.popularity_index_service import popularity_index_service
+from app.services.recipe_service import recipe_service
+from app.services.recommendation_service import recommendation_service
+
+
+def _precompute_chunk(user_ids: List[str], n_recs: int, generated_at: datetime) -> int:
+    db = SessionLocal()
+    try:
+        recommendation_service.prepare_batch_ranking(db)
+        computed_from = datetime.now(timezone.utc)
+        favorites = favorite_repository.get_favorite_recipe_ids_for_users(
+            db, user_ids=[uuid.UUID(user_id) for user_id in user_ids]
+        )
+        ranked = recommendation_service.rank_recipe_batch(db, favorites, n_recs)
+        model_version = recommendation_service.model_version
+
+        rows = [
+            UserRecommendationCreate(
+                user_id=user_id,
+                recipe_ids=[recipe_id for recipe_id, _ in recs],
+                scores=[score for _, score in recs],
+                model_version=model_version,
+                generated_at=generated_at,
+            )
+            for user_id, recs in ranked.items()
+        ]
+        return user_recommendation_repository.replace_for_users(db, rows=rows, computed_from=computed_from)
+    finally:
+        db.close()
+
+
+class RecommendationBatchService:
+    PROGRESS_EVERY_BATCHES = 50
+
+    def __init__(self, favorite_repo, user_recommendation_repo, recommendation_service, popularity_index, recipe_service):
+        self.favorite_repo = favorite_repo
+        self.user_recommendation_repo = user_recommendation_repo
+        self.recommendation_service = recommendation_service
+        self.popularity_index = popularity_index
+        self.recipe_service = recipe_service
+
+    def precompute_all(self, n_recs: Optional[int] = None, batch_size: Optional[int] = None, workers: int = 1) -> Dict[str, Any]:
+        # Chunks run in-process unless the caller asks for a pool; only the CLI script does, since
+        # spawning processes from the (gevent) Celery worker is fragile.
+        n_recs = n_recs or settings.RECOMMENDATION_PRECOMPUTE_TOP_N
+        batch_size = batch_size or settings.RECOMMENDATION_PRECOMPUTE_BATCH_SIZE
+        generated_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+
+        db = SessionLocal()
+        try:
+            self.popularity_index.rebuild(db)
+            model_version = self.recommendation_service.prepare_batch_ranking(db)
+            self.recipe_service.sync_ingredient_index(db)
+            user_ids = [str(user_id) for user_id in self.favorite_repo.get_user_ids_with_favorites(db)]
+        finally:
+            db.close()
+
+        batches = [user_ids[start:start + batch_size] for start in range(0, len(user_ids), batch_size)]
+        print(f"Precomputing top-{n_recs} recommendations for {len(user_ids)} users in {len(batches)} batches "
+              f"(model {model_version}, {workers} workers).")
+
+        processed = 0
+        if workers > 1 and len(batches) > 1:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = [executor.submit(_precompute_chunk, batch, n_recs, generated_at) for batch in batches]
+                for completed, future in enumerate(as_completed(futures), start=1):
+                    processed += future.result()
+                    if completed % self.PROGRESS_EVERY_BATCHES == 0:
+                        self._report(processed, started, completed, len(batches))
+        else:
+            for completed, batch in enumerate(batches, start=1):
+                processed += _precompute_chunk(batch, n_recs, generated_at)
+                if completed % self.PROGRESS_EVERY_BATCHES == 0:
+                    self._report(processed, started, completed, len(batches))
+
+        db = SessionLocal()
+        try:
+            removed = self.user_recommendation_repo.delete_generated_before(db, cutoff=generated_at)
+        finally:
+            db.close()
+
+        elapsed = time.perf_counter() - started
+        throughput = processed / elapsed if elapsed > 0 else 0.0
+        print(f"Precomputed recommendations for {processed} users in {elapsed:.1f}s ({throughput:.1f} users/s). "
+              f"Removed {removed} outdated rows.")
+        return {
+            "users": processed,
+            "seconds": round(elapsed, 3),
+            "users_per_second": round(throughput, 2),
+            "model_version": model_version,
+            "generated_at": generated_at.isoformat(),
+        }
+
+    @staticmethod
+    def _report(processed: int, started: float, completed: int, total: int) -> None:
+        elapsed = time.perf_counter() - started
+        print(f"  {completed}/{total} batches, {processed} users ({processed / elapsed:.1f} users/s).")
+
+
+recommendation_batch_service = RecommendationBatchService(
+    favorite_repository, user_recommendation_repository, recommendation_service, popularity_index_service, recipe_service
+)
@@ -0,0 +1,47 @@
+from typing import Any, List, Optional
+
+from app.core.cache import TieredCache
+from app.core.config import settings
+
+
+class RecommendationCacheService:
+    def __init__(self, cache: TieredCache):
+        self.cache = cache
+
+    def _generation_key(self, user_id: Any) -> str:
+        return f"{self.cache.namespace}:generation:{user_id}"
+
+    def _generation(self, user_id: Any) -> Optional[int]:
+        # None means Redis is unreachable: without the shared generation an entry cannot be trusted.
+        generation = self.cache.remote_call(lambda client: client.get(self._generation_key(user_id)) or 0)
+        return int(generation) if generation is not None else None
+
+    def _key(self, user_id: Any, generation: int, model_version: Optional[str], n_recs: int) -> str:
+        return f"{user_id}:{generation}:{model_version or 'none'}:{n_recs}"
+
+    def get(self, user_id: Any, model_version: Optional[str], n_recs: int) -> Optional[List[str]]:
+        generation = self._generation(user_id)
+        if generation is None:
+            return None
+        return self.cache.get(self._key(user_id, generation, model_version, n_recs))
+
+    def set(self, user_id: Any, model_version: Optional[str], n_recs: int, recipe_ids: List[str]) -> None:
+        generation = self._generation(user_id)
+        if generation is None:
+            return
+        self.cache.set(self._key(user_id, generation, model_version, n_recs), list(recipe_ids))
+
+    def invalidate_user(self, user_id: Any) -> None:
+        if self.cache.remote_call(lambda client: client.incr(self._generation_key(user_id))) is None:
+            # The generation could not move, so entries under it would look fresh once Redis is back.
+            self.cache.local.clear()
+        print(f"Recommendation cache invalidated for user {user_id}.")
+
+
+recommendation_cache_service = RecommendationCacheService(
+    TieredCache(
+        namespace="recommendations",
+        ttl_seconds=settings.RECOMMENDATION_CACHE_TTL_SECONDS,
+        local_maxsize=settings.RECOMMENDATION_CACHE_LOCAL_SIZE,
+    )
+)
@@ -0,0 +1,228 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.collaborative_scoring_service import CollaborativeScorer, UserVector
+from app.services.evaluation_service import recommendation_evaluation_service
+from app.services.ingredient_index_service import ingredient_index_service
+from app.services.popularity_index_service import popularity_index_service
+from app.services.recipe_neighbor_service import recipe_neighbor_service
+
+
+class RecommendationPipeline:
+    STAGES = ("neighbors", "popular", "profile", "score", "rerank", "total")
+    LATENCY_WINDOW = 2048
+    DUPLICATE_SIMILARITY = 0.95
+
+    def __init__(
+        self,
+        ingredient_index,
+        neighbor_index,
+        popularity_index,
+        neighbor_candidates: int = 200,
+        popular_candidates: int = 100,
+        profile_candidates: int = 200,
+        max_seed_favorites: int = 25,
+        diversity_lambda: float = 0.7,
+        content_weight: float = 0.5,
+        collaborative_weight: float = 0.4,
+        popularity_weight: float = 0.1,
+    ):
+        self.ingredient_index = ingredient_index
+        self.neighbor_index = neighbor_index
+        self.popularity_index = popularity_index
+        self.neighbor_candidates = neighbor_candidates
+        self.popular_candidates = popular_candidates
+        self.profile_candidates = profile_candidates
+        self.max_seed_favorites = max_seed_favorites
+        self.diversity_lambda = diversity_lambda
+        self.content_weight = content_weight
+        self.collaborative_weight = collaborative_weight
+        self.popularity_weight = popularity_weight
+
+        self._latencies: Dict[str, Deque[float]] = {stage: deque(maxlen=self.LATENCY_WINDOW) for stage in self.STAGES}
+        self._latency_lock = threading.Lock()
+
+    def _record(self, timings: Dict[str, float]) -> None:
+        with self._latency_lock:
+            for stage, seconds in timings.items():
+                self._latencies[stage].append(seconds)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._latency_lock:
+            latencies = {stage: list(values) for stage, values in self._latencies.items()}
+        return {
+            stage: {"count": len(values), **recommendation_evaluation_service.latency_summary(values)}
+            for stage, values in latencies.items()
+        }
+
+    @staticmethod
+    def _normalize(values: np.ndarray) -> np.ndarray:
+        if not len(values):
+            return values
+        low, high = float(values.min()), float(values.max())
+        if high - low <= 0:
+            return np.zeros_like(values, dtype=np.float64)
+        return (values - low) / (high - low)
+
+    def _neighbor_candidates(self, favorite_ids: Sequence[str]) -> List[str]:
+        seeds = list(favorite_ids)[-self.max_seed_favorites:]
+        per_favorite = max(1, -(-self.neighbor_candidates // max(len(seeds), 1)))
+        candidates: List[str] = []
+        for favorite_id in seeds:
+            candidates.extend(self.neighbor_index.similar(favorite_id, per_favorite, fallback=False) or [])
+        return candidates
+
+    def _rerank(self, rows: np.ndarray, relevance: np.ndarray, n: int) -> List[int]:
+        pool = np.argsort(-relevance, kind="stable")[:max(n * 5, n)]
+        pool_rows = rows[pool]
+        similarity = (self.ingredient_index.matrix[pool_rows] @ self.ingredient_index.matrix[pool_rows].T).toarray()
+        np.fill_diagonal(similarity, 0.0)
+
+        pool_relevance = relevance[pool]
+        max_similarity = np.zeros(len(pool))
+        available = np.ones(len(pool), dtype=bool)
+        selected: List[int] = []
+        while len(selected) < n and available.any():
+            mmr = self.diversity_lambda * pool_relevance - (1 - self.diversity_lambda) * max_similarity
+            mmr[~available] = -np.inf
+            best = int(np.argmax(mmr))
+            selected.append(int(pool[best]))
+            available[best] = False
+            max_similarity = np.maximum(max_similarity, similarity[best])
+            available &= max_similarity < self.DUPLICATE_SIMILARITY
+        return selected
+
+    def _candidates(
+        self, db: Session, favorite_ids: List[str], profile: Optional[Tuple[np.ndarray, np.ndarray]], timings: Dict[str, float]
+    ) -> Tuple[np.ndarray, Dict[str, float], Optional[np.ndarray]]:
+        id_to_row = self.ingredient_index.id_to_row
+
+        stage_started = time.perf_counter()
+        candidate_ids = self._neighbor_candidates(favorite_ids)
+        timings["neighbors"] = time.perf_counter() - stage_started
+
+        stage_started = time.perf_counter()
+        popular = dict(self.popularity_index.top_popular(self.popular_candidates, exclude=favorite_ids, db=db))
+        candidate_ids.extend(popular)
+        timings["popular"] = time.perf_counter() - stage_started
+
+        stage_started = time.perf_counter()
+        dense_profile = self.ingredient_index.dense_profile(favorite_ids, profile)
+        rows = [id_to_row[rid] for rid in candidate_ids if rid in id_to_row]
+        if dense_profile is not None:
+            rows.extend(self.ingredient_index.candidates_from_profile(dense_profile, self.profile_candidates).tolist())
+        favorite_rows = {id_to_row[rid] for rid in favorite_ids if rid in id_to_row}
+        rows = np.array(sorted(set(rows) - favorite_rows), dtype=np.int64)
+        timings["profile"] = time.perf_counter() - stage_started
+        return rows, popular, dense_profile
+
+    def _relevance(
+        self, rows: np.ndarray, popular: Dict[str, float], dense_profile: Optional[np.ndarray],
+        collaborative_scores: Optional[np.ndarray],
+    ) -> np.ndarray:
+        catalog_ids = self.ingredient_index.recipe_ids
+        relevance = np.zeros(len(rows))
+        if dense_profile is not None:
+            relevance += self.content_weight * self._normalize(self.ingredient_index.score_rows(rows, dense_profile))
+        if collaborative_scores is not None:
+            relevance += self.collaborative_weight * self._normalize(collaborative_scores)
+        popularity = np.log1p(np.array([popular.get(catalog_ids[row], 0.0) for row in rows]))
+        relevance += self.popularity_weight * self._normalize(popularity)
+        return relevance
+
+    def _select(
+        self, rows: np.ndarray, relevance: np.ndarray, n: int, started: float, timings: Dict[str, float], log: bool
+    ) -> List[Tuple[str, float]]:
+        catalog_ids = self.ingredient_index.recipe_ids
+        stage_started = time.perf_counter()
+        selected = self._rerank(rows, relevance, n)
+        timings["rerank"] = time.perf_counter() - stage_started
+
+        timings["total"] = time.perf_counter() - started
+        self._record(timings)
+        if log:
+            print(f"Pipeline: {len(rows)} candidates -> {len(selected)} recommendations in {timings['total'] * 1000:.1f} ms "
+                  f"({', '.join(f'{stage}={seconds * 1000:.1f}ms' for stage, seconds in timings.items() if stage != 'total')}).")
+        return [(catalog_ids[rows[position]], float(relevance[position])) for position in selected]
+
+    def rank(
+        self,
+        db: Session,
+        user_id: Any,
+        favorite_ids: Sequence[Any],
+        n: int,
+        scorer: Optional[CollaborativeScorer] = None,
+        user_vector: Optional[UserVector] = None,
+        profile: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        log: bool = True,
+    ) -> List[Tuple[str, float]]:
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        rows, popular, dense_profile = self._candidates(db, [str(rid) for rid in favorite_ids], profile, timings)
+        if not len(rows):
+            timings["total"] = time.perf_counter() - started
+            self._record(timings)
+            return []
+
+        stage_started = time.perf_counter()
+        collaborative_scores = None
+        if scorer is not None:
+            item_rows = scorer.encode_items(self.ingredient_index.recipe_ids)[rows]
+            collaborative_scores = scorer.score_candidates(user_id, item_rows, user_vector)
+        relevance = self._relevance(rows, popular, dense_profile, collaborative_scores)
+        timings["score"] = time.perf_counter() - stage_started
+        return self._select(rows, relevance, n, started, timings, log)
+
+    def rank_batch(
+        self,
+        db: Session,
+        user_ids: Sequence[str],
+        favorite_lists: Sequence[Sequence[Any]],
+        n: int,
+        scorer: Optional[CollaborativeScorer] = None,
+        user_vectors: Optional[Dict[str, UserVector]] = None,
+        profiles: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        # Same ranking as rank(), but the collaborative scores for the whole batch come from a
+        # single item-factor product instead of one product per user.
+        profiles = profiles or {}
+        collaborative = iter(())
+        if scorer is not None:
+            item_rows = scorer.encode_items(self.ingredient_index.recipe_ids)
+            collaborative = scorer.score_batch(user_ids, item_rows, user_vectors=user_vectors)
+
+        results: List[List[Tuple[str, float]]] = []
+        for user_id, favorite_ids in zip(user_ids, favorite_lists):
+            started = time.perf_counter()
+            timings: Dict[str, float] = {}
+            collaborative_scores = next(collaborative, None)
+            rows, popular, dense_profile = self._candidates(db, [str(rid) for rid in favorite_ids], profiles.get(str(user_id)), timings)
+            if not len(rows):
+                timings["total"] = time.perf_counter() - started
+                self._record(timings)
+                results.append([])
+                continue
+
+            stage_started = time.perf_counter()
+            relevance = self._relevance(
+                rows, popular, dense_profile, collaborative_scores[rows] if collaborative_scores is not None else None
+            )
+            timings["score"] = time.perf_counter() - stage_started
+            results.append(self._select(rows, relevance, n, started, timings, log=False))
+        return results
+
+recommendation_pipeline = RecommendationPipeline(
+    ingredient_index_service,
+    recipe_neighbor_service,
+    popularity_index_service,
+    neighbor_candidates=settings.RECOMMENDATION_NEIGHBOR_CANDIDATES,
+    popular_candidates=settings.RECOMMENDATION_POPULAR_CANDIDATES,
+    profile_candidates=settings.RECOMMENDATION_PROFILE_CANDIDATES,
+    diversity_lambda=settings.RECOMMENDATION_DIVERSITY_LAMBDA,
+)
@@ -1,176 +1,476 @@
+import json
 import os
 import pickle
-import pandas as pd
-from typing import List, Optional
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from surprise import Dataset, Reader, SVD
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
 from app.repositories.favorite_repository import favorite_repository
 from app.repositories.recipe_repository import recipe_repository
+from app.repositories.user_recommendation_repository import user_recommendation_repository
 from app.models.recipe import Recipe
 from app.core.config import settings
+from app.services.als_trainer_service import ImplicitALSTrainer
+from app.services.collaborative_scoring_service import CollaborativeScorer
+from app.services.ingredient_index_service import ingredient_index_service
+from app.services.model_store_service import collaborative_model_store
+from app.services.popularity_index_service import popularity_index_service
+from app.services.recommendation_pipeline_service import recommendation_pipeline
+from app.services.recommendation_cache_service import recommendation_cache_service
+from app.services.training_data_service import InteractionData, training_data_service
+from app.services.user_vector_service import user_vector_store
 
 class RecommendationService:
-    def __init__(self, favorite_repo, recipe_repo):
+    DEFAULT_SVD_PARAMS = {"n_factors": 100, "n_epochs": 30, "random_state": 42}
+
+    def __init__(self, favorite_repo, recipe_repo, ingredient_index, model_store, recommendation_cache, training_data, user_recommendation_repo, popularity_index, user_vectors, pipeline):
         self.favorite_repo = favorite_repo
         self.recipe_repo = recipe_repo
+        self.user_recommendation_repo = user_recommendation_repo
+        self.training_data = training_data
+        self.ingredient_index = ingredient_index
+        self.popularity_index = popularity_index
+        self.user_vectors = user_vectors
+        self.pipeline = pipeline
+        self.model_store = model_store
+        self.recommendation_cache = recommendation_cache
         self.model_dir = settings.MODEL_STORAGE_PATH
-        self.model_path = os.path.join(self.model_dir, "recommendation_model.pkl")
-        self.backup_model_path = os.path.join(self.model_dir, "recommendation_model_backup.pkl")
+        self.legacy_model_path = os.path.join(self.model_dir, "recommendation_model.pkl")
+        self.svd_params_path = os.path.join(self.model_dir, "svd_params.json")
 
         os.makedirs(self.model_dir, exist_ok=True)
-        self.model = self._load_latest_model()
-
-    def _load_latest_model(self):
-        model_to_load = None
-        if os.path.exists(self.model_path):
-            model_to_load = self.model_path
-            print(f"Loading production model from: {model_to_load}")
-        elif os.path.exists(self.backup_model_path):
-            model_to_load = self.backup_model_path
-            print(f"Loading backup model from: {model_to_load}")
-
-        if model_to_load:
+        self._model_lock = threading.Lock()
+        self.scorer: Optional[CollaborativeScorer] = None
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self.scorer.version if self.scorer else None
+
+    def _migrate_legacy_model(self) -> None:
+        if not os.path.exists(self.legacy_model_path):
+            return
+        print(f"Migrating legacy pickled model from: {self.legacy_model_path}")
+        try:
+            with open(self.legacy_model_path, "rb") as f:
+                legacy_model = pickle.load(f)
+            self._publish_scorer(CollaborativeScorer.from_surprise(legacy_model), algorithm="svd")
+        except (pickle.UnpicklingError, EOFError, Exception) as e:
+            print(f"Error migrating model from {self.legacy_model_path}: {e}. The file might be corrupted.")
+            # Move it aside so later requests do not unpickle it again.
+            corrupt_path = f"{self.legacy_model_path}.corrupt"
             try:
-                with open(model_to_load, "rb") as f:
-                    return pickle.load(f)
-            except (pickle.UnpicklingError, EOFError, Exception) as e:
-                print(f"Error loading model from {model_to_load}: {e}. The file might be corrupted.")
+                os.replace(self.legacy_model_path, corrupt_path)
+                print(f"Moved the unreadable legacy model to: {corrupt_path}")
+            except OSError as move_error:
+                print(f"Could not move the unreadable legacy model aside: {move_error}")
 
-        print("No trained collaborative model found.")
-        return None
+    def _refresh_model(self) -> Optional[CollaborativeScorer]:
+        version = self.model_store.current_version()
+        if version is not None and version == self.model_version:
+            return self.scorer
 
-    def _get_training_data(self, db: Session) -> Optional[pd.DataFrame]:
-        all_favorites = self.favorite_repo.get_multi(db, limit=100000)
-        if not all_favorites:
-            return None
-        data = [{"user_id": str(fav.user_id), "recipe_id": str(fav.recipe_id), "rating": 1} for fav in all_favorites]
-        return pd.DataFrame(data)
+        with self._model_lock:
+            if version is None:
+                self._migrate_legacy_model()
+                version = self.model_store.current_version()
+            if version is None:
+                return None
+            if version == self.model_version:
+                return self.scorer
 
-    def train_and_save_model(self, db: Session):
-        print("Starting collaborative model training process...")
-        df = self._get_training_data(db)
-        if df is None or len(df) < 10:
+            artifacts = self.model_store.load(version)
+            if artifacts is None:
+                return self.scorer
+            print(f"Loading collaborative model version {version} (memory-mapped).")
+            self.scorer = CollaborativeScorer.from_artifacts(artifacts)
+        return self.scorer
+
+    def _publish_scorer(self, scorer: CollaborativeScorer, **manifest_extra) -> str:
+        arrays, id_map, manifest = scorer.to_artifacts()
+        version = self.model_store.save(arrays, id_map, {**manifest, **manifest_extra})
+        print(f"Published collaborative model version {version} to: {self.model_store.root}")
+        return version
+
+    def train_and_save_model(self, db: Session, algorithm: str = "svd", warm_start: bool = False, als_params: Optional[Dict[str, Any]] = None):
+        print(f"Starting collaborative model training process ({algorithm})...")
+        started_at = datetime.now(timezone.utc)
+        interactions = self.training_data.load_interactions(db)
+        if interactions is None or len(interactions) < 10:
             print("Not enough data to train the model. Aborting.")
             return
 
+        self.train_from_interactions(
+            interactions, algorithm=algorithm, als_params=als_params, started_at=started_at,
+            warm_start_db=db if warm_start else None,
+        )
+        print("Model training and saving process finished.")
+
+    def train_from_interactions(
+        self,
+        interactions: InteractionData,
+        algorithm: str = "svd",
+        als_params: Optional[Dict[str, Any]] = None,
+        started_at: Optional[datetime] = None,
+        warm_start_db: Optional[Session] = None,
+    ) -> bool:
+        started_at = started_at or datetime.now(timezone.utc)
+        if algorithm == "als":
+            published = self._train_als(warm_start_db, interactions, started_at, als_params or {})
+        elif algorithm == "svd":
+            published = self._train_svd(interactions, started_at)
+        else:
+            raise ValueError(f"Unknown recommendation algorithm: {algorithm}")
+
+        if published:
+            self._refresh_model()
+        return published
+
+    def load_svd_params(self) -> Dict[str, Any]:
+        params = dict(self.DEFAULT_SVD_PARAMS)
+        try:
+            with open(self.svd_params_path, encoding="utf-8") as f:
+                params.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error reading SVD parameters from {self.svd_params_path}: {e}. Using defaults.")
+        return params
+
+    def save_svd_params(self, params: Dict[str, Any]) -> None:
+        tmp_path = f"{self.svd_params_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(params, f, indent=2)
+        os.replace(tmp_path, self.svd_params_path)
+        print(f"SVD parameters saved to {self.svd_params_path}: {params}")
+
+    def _train_svd(self, interactions: InteractionData, started_at: datetime) -> bool:
+        df = interactions.to_frame()
+
         reader = Reader(rating_scale=(0, 1))
         data = Dataset.load_from_df(df[['user_id', 'recipe_id', 'rating']], reader)
         trainset = data.build_full_trainset()
 
-        new_model = SVD(n_factors=100, n_epochs=30, random_state=42)
-        print("Training new SVD model...")
+        params = self.load_svd_params()
+        new_model = SVD(**params)
+        print(f"Training new SVD model with {params}...")
         new_model.fit(trainset)
         print("Training complete!")
 
-        if os.path.exists(self.model_path):
-            print(f"Backing up current model to: {self.backup_model_path}")
-            if os.path.exists(self.backup_model_path):
-                os.remove(self.backup_model_path)
-            os.rename(self.model_path, self.backup_model_path)
+        scorer = CollaborativeScorer.from_surprise(new_model, interactions.user_ids, interactions.recipe_ids)
+        self._publish_scorer(
+            scorer, algorithm="svd", n_epochs=new_model.n_epochs, regularization=new_model.reg_pu,
+            trained_through=started_at.isoformat(),
+        )
+        return True
 
-        print(f"Saving new model to: {self.model_path}")
-        with open(self.model_path, "wb") as f:
-            pickle.dump(new_model, f)
+    def _train_als(self, warm_start_db: Optional[Session], interactions: InteractionData, started_at: datetime, als_params: Dict[str, Any]) -> bool:
+        trainer = ImplicitALSTrainer(**als_params)
+        user_factors = item_factors = users_to_update = items_to_update = None
 
-        self.model = new_model
-        print("Model training and saving process finished.")
+        previous = self.model_store.load() if warm_start_db is not None else None
+        manifest = previous.manifest if previous else {}
+        full_trained_at = started_at
+        touched = None
+        compatible = bool(previous and manifest.get("algorithm") == "als" and manifest.get("n_factors") == trainer.n_factors and manifest.get("trained_through"))
+        if compatible:
+            since = datetime.fromisoformat(manifest["trained_through"])
+            full_trained_at = datetime.fromisoformat(manifest.get("full_trained_at") or manifest["trained_through"])
+            if started_at - full_trained_at > timedelta(days=settings.RECOMMENDATION_FULL_RETRAIN_DAYS):
+                print(f"Last full ALS training was on {full_trained_at.isoformat()}. Training from scratch.")
+            else:
+                touched = self.training_data.load_touched_ids(warm_start_db, since=since)
+                if touched is None:
+                    print("Removed favorites since the last training are unknown. Training from scratch.")
+            if touched is None:
+                full_trained_at = started_at
+
+        if touched is not None:
+            delta_users, delta_items = touched
+            user_factors, item_factors, reused_users, reused_items = trainer.warm_start_factors(
+                interactions,
+                previous.id_map["users"], previous.id_map["items"],
+                previous.arrays["user_factors"], previous.arrays["item_factors"],
+            )
+            users_to_update = [row for row, raw in enumerate(interactions.user_ids) if raw in delta_users or not reused_users[row]]
+            items_to_update = [row for row, raw in enumerate(interactions.recipe_ids) if raw in delta_items or not reused_items[row]]
+
+            if not users_to_update and not items_to_update:
+                print(f"No favorites added or removed since {since.isoformat()}; keeping model version {previous.version}.")
+                return False
+            print(f"Warm-starting from model version {previous.version}: updating {len(users_to_update)} users and {len(items_to_update)} recipes.")
+        elif warm_start_db is not None and not compatible:
+            print("No compatible ALS model to warm-start from. Training from scratch.")
 
-    def _get_content_based_recommendations(self, user_favorite_recipes: List[Recipe], all_recipes: List[Recipe], n_recs: int) -> List[Recipe]:
+        print("Training new implicit ALS model...")
+        user_factors, item_factors = trainer.fit(interactions, user_factors, item_factors, users_to_update, items_to_update)
+        print("Training complete!")
+
+        scorer = CollaborativeScorer(
+            user_factors=user_factors,
+            item_factors=item_factors,
+            user_bias=np.zeros(interactions.n_users),
+            item_bias=np.zeros(interactions.n_items),
+            global_mean=0.0,
+            user_index={raw: row for row, raw in enumerate(interactions.user_ids)},
+            item_index={raw: row for row, raw in enumerate(interactions.recipe_ids)},
+        )
+        self._publish_scorer(
+            scorer,
+            algorithm="als",
+            alpha=trainer.alpha,
+            regularization=trainer.regularization,
+            iterations=trainer.iterations,
+            warm_started=users_to_update is not None,
+            trained_through=started_at.isoformat(),
+            full_trained_at=full_trained_at.isoformat(),
+        )
+        return True
+
+    def _ensure_ingredient_index(self, db: Session) -> bool:
+        self.ingredient_index.refresh_if_changed()
+        if not self.ingredient_index.is_ready():
+            self.rebuild_ingredient_index(db)
+        return self.ingredient_index.is_ready()
+
+    def rebuild_ingredient_index(self, db: Session) -> int:
+        return self.ingredient_index.build(self.recipe_repo.iter_ingredient_documents(db))
+
+    def fold_in_user(self, db: Session, user_id: UUID) -> None:
+        started = time.perf_counter()
+        user_favorite_ids = [str(rid) for rid in self.favorite_repo.get_user_favorite_recipe_ids(db, user_id=user_id, limit=2000)]
+
+        scorer = self._refresh_model()
+        if scorer:
+            vector = scorer.fold_in(user_favorite_ids)
+            if vector is not None:
+                self.user_vectors.set_factors(user_id, scorer.version, vector)
+            else:
+                # The remaining favorites are unknown to the model: drop factors built from removed ones.
+                self.user_vectors.delete_factors(user_id, scorer.version)
+
+        self.ingredient_index.refresh_if_changed()
+        profile = self.ingredient_index.profile(user_favorite_ids)
+        if profile is not None:
+            self.user_vectors.set_profile(user_id, self.ingredient_index.build_id, profile)
+        else:
+            self.user_vectors.delete_profile(user_id, self.ingredient_index.build_id)
+
+        print(f"Folded {len(user_favorite_ids)} favorites into user {user_id}'s vectors in {(time.perf_counter() - started) * 1000:.1f} ms.")
+
+    def _get_content_based_recommendations(self, db: Session, user_favorite_ids: List[UUID], n_recs: int, user_id: Optional[UUID] = None) -> List[str]:
         print("HYBRID: Generating content-based recommendations.")
-        
-        def clean_text(text):
-            if not isinstance(text, str):
-                return ""
-            return text.replace("\n", " ").lower()
 
-        recipe_docs = {str(recipe.id): clean_text(recipe.ingredients) for recipe in all_recipes}
-        valid_recipe_docs = {rid: ingredients for rid, ingredients in recipe_docs.items() if ingredients}
-        
-        if not valid_recipe_docs:
+        if not user_favorite_ids:
+            print("Content-based: User has no favorites.")
+            return []
+
+        if not self._ensure_ingredient_index(db):
             print("Content-based: No recipes with valid ingredients found.")
             return []
 
-        recipe_df = pd.DataFrame(list(valid_recipe_docs.items()), columns=['id', 'ingredients'])
-        
-        if recipe_df.empty or not user_favorite_recipes:
-            print("Content-based: DataFrame is empty or user has no favorites.")
+        profile = self.user_vectors.get_profile(user_id, self.ingredient_index.build_id) if user_id is not None else None
+        recommended_ids = self.ingredient_index.top_similar(user_favorite_ids, n_recs, profile=profile)
+        if not recommended_ids:
+            print("Content-based: None of the user's favorites are in the ingredient index.")
+        return recommended_ids
+
+    def _collaborative_candidates(self, db: Session) -> List[str]:
+        # Same candidates, in the same order, as the per-recipe predict loop: ties keep catalog order.
+        return self.recipe_repo.get_ids(db, limit=5000)
+
+    def _get_collaborative_recommendations(self, db: Session, user_id: UUID, user_favorite_ids: List[UUID], n_recs: int, use_stored_vectors: bool = False) -> List[str]:
+        scorer = self._refresh_model()
+        if not scorer or not user_favorite_ids:
             return []
 
-        tfidf = TfidfVectorizer()
-        tfidf_matrix = tfidf.fit_transform(recipe_df['ingredients'])
-        
-        indices = pd.Series(recipe_df.index, index=recipe_df['id']).drop_duplicates()
-        favorite_indices = [indices[str(fav.id)] for fav in user_favorite_recipes if str(fav.id) in indices]
+        try:
+            catalog_ids = self._collaborative_candidates(db)
+            id_to_row = {rid: row for row, rid in enumerate(catalog_ids)}
+            favorite_rows = np.fromiter(
+                (id_to_row[str(rid)] for rid in user_favorite_ids if str(rid) in id_to_row), dtype=np.int64
+            )
 
-        if not favorite_indices:
-            print("Content-based: None of the user's favorites are in the valid recipe set.")
+            user_vector = self.user_vectors.get_factors(user_id, scorer.version) if use_stored_vectors else None
+            scores = scorer.score(user_id, scorer.encode_items(catalog_ids), user_vector=user_vector)
+            top_rows = scorer.top_n(scores, n_recs, exclude=favorite_rows)
+            collaborative_recs = [catalog_ids[row] for row in top_rows]
+            print(f"Generated {len(collaborative_recs)} collaborative recommendations.")
+            return collaborative_recs
+        except Exception as e:
+            print(f"Could not generate collaborative recommendations: {e}")
             return []
-            
-        user_profile_matrix = tfidf_matrix[favorite_indices].mean(axis=0)
-        
-        user_profile = np.asarray(user_profile_matrix)
-        
-        sim_scores_to_profile = cosine_similarity(user_profile, tfidf_matrix)
-        
-        sim_scores_list = sorted(list(enumerate(sim_scores_to_profile[0])), key=lambda x: x[1], reverse=True)
+
+    def rank_recipe_ids(
+        self, db: Session, user_id: UUID, user_favorite_ids: List[Any], n_recs: int,
+        strategy: str = "hybrid", use_stored_vectors: bool = False,
+    ) -> List[str]:
+        if strategy == "collaborative":
+            return self._get_collaborative_recommendations(db, user_id, user_favorite_ids, n_recs, use_stored_vectors)
+        if strategy in ("hybrid", "pipeline") and not user_favorite_ids:
+            print("Cold start: user has no favorites, serving popular recipes.")
+            return self._blend_popular(db, [], user_favorite_ids, n_recs)[0]
+        if strategy == "pipeline":
+            pipeline_recs = self._rank_with_pipeline(db, user_id, user_favorite_ids, n_recs, use_stored_vectors)
+            return self._blend_popular(db, [rid for rid, _ in pipeline_recs], user_favorite_ids, n_recs)[0]
+
+        content_recs = self._get_content_based_recommendations(
+            db, user_favorite_ids, n_recs, user_id=user_id if use_stored_vectors else None
+        )
+        print(f"Generated {len(content_recs)} content-based recommendations.")
+        if strategy == "content":
+            return content_recs
         
-        recommended_recipes = []
-        user_favorite_ids = {str(fav.id) for fav in user_favorite_recipes}
-        recipe_map = {str(r.id): r for r in all_recipes}
+        collaborative_recs = self._get_collaborative_recommendations(db, user_id, user_favorite_ids, n_recs, use_stored_vectors)
+        hybrid_recs = self._merge_hybrid(content_recs, collaborative_recs, n_recs)
+        return self._blend_popular(db, hybrid_recs, user_favorite_ids, n_recs)[0]
 
-        for i, score in sim_scores_list:
-            if len(recommended_recipes) >= n_recs:
+    @staticmethod
+    def _merge_hybrid(content_recs: List[str], collaborative_recs: List[str], n_recs: int) -> List[str]:
+        final_rec_ids = list(dict.fromkeys(content_recs))
+        for rec_id in collaborative_recs:
+            if len(final_rec_ids) >= n_recs:
                 break
-            recipe_id = recipe_df['id'].iloc[i]
-            if recipe_id not in user_favorite_ids:
-                recipe_obj = recipe_map.get(recipe_id)
-                if recipe_obj:
-                    recommended_recipes.append(recipe_obj)
-                    
-        return recommended_recipes
+            if rec_id not in final_rec_ids:
+                final_rec_ids.append(rec_id)
+        return final_rec_ids
 
-    def get_recommendations_for_user(self, db: Session, user_id: UUID, n_recs: int = 10) -> List[Recipe]:
-        user_id_str = str(user_id)
-        user_favorites_assoc = self.favorite_repo.get_user_favorites(db, user_id=user_id, limit=2000)
-        user_favorite_recipes = [fav.recipe for fav in user_favorites_assoc if fav.recipe]
+    def _blend_popular(self, db: Session, personalized: List[str], user_favorite_ids: List[Any], n_recs: int) -> Tuple[List[str], Dict[str, float]]:
+        min_favorites = settings.RECOMMENDATION_MIN_FAVORITES
+        if len(user_favorite_ids) >= min_favorites:
+            return personalized, {}
 
-        all_recipes = self.recipe_repo.get_multi(db, limit=5000)
-        
-        content_recs = self._get_content_based_recommendations(user_favorite_recipes, all_recipes, n_recs)
-        print(f"Generated {len(content_recs)} content-based recommendations.")
-        
-        collaborative_recs = []
-        if self.model and user_favorite_recipes:
-            try:
-                user_favorite_ids = {str(r.id) for r in user_favorite_recipes}
-                recipes_to_predict = [r for r in all_recipes if str(r.id) not in user_favorite_ids]
-                
-                predictions = [(r, self.model.predict(uid=user_id_str, iid=str(r.id)).est) for r in recipes_to_predict]
-                predictions.sort(key=lambda x: x[1], reverse=True)
-                collaborative_recs = [recipe for recipe, score in predictions[:n_recs]]
-                print(f"Generated {len(collaborative_recs)} collaborative recommendations.")
-            except Exception as e:
-                print(f"Could not generate collaborative recommendations: {e}")
-
-        final_recs_map = {}
-        for rec in content_recs:
-            if rec.id not in final_recs_map:
-                final_recs_map[rec.id] = rec
-        
-        for rec in collaborative_recs:
-            if len(final_recs_map) >= n_recs:
+        n_personal = min(len(personalized), n_recs * len(user_favorite_ids) // min_favorites)
+        blended = personalized[:n_personal]
+        popular = self.popularity_index.top_popular(n_recs, exclude=[*user_favorite_ids, *blended], db=db)
+        for rec_id, _ in popular:
+            if len(blended) >= n_recs:
+                break
+            blended.append(rec_id)
+        for rec_id in personalized[n_personal:]:
+            if len(blended) >= n_recs:
                 break
-            if rec.id not in final_recs_map:
-                final_recs_map[rec.id] = rec
+            if rec_id not in blended:
+                blended.append(rec_id)
+        return blended, dict(popular)
+
+    def _rank_with_pipeline(
+        self, db: Session, user_id: Any, user_favorite_ids: List[Any], n_recs: int,
+        use_stored_vectors: bool = False, log: bool = True,
+    ) -> List[Tuple[str, float]]:
+        if not self._ensure_ingredient_index(db):
+            return []
+        scorer = self._refresh_model()
+        user_vector = self.user_vectors.get_factors(user_id, scorer.version) if scorer and use_stored_vectors else None
+        profile = self.user_vectors.get_profile(user_id, self.ingredient_index.build_id) if use_stored_vectors else None
+        return self.pipeline.rank(db, user_id, user_favorite_ids, n_recs, scorer, user_vector, profile, log=log)
+
+    def prepare_batch_ranking(self, db: Session) -> Optional[str]:
+        self._refresh_model()
+        self._ensure_ingredient_index(db)
+        return self.model_version
+
+    def _get_collaborative_batch(self, db: Session, user_ids: Sequence[str], favorite_lists: Sequence[List[str]], n_recs: int) -> List[List[Tuple[str, float]]]:
+        results: List[List[Tuple[str, float]]] = [[] for _ in user_ids]
+        scorer = self._refresh_model()
+        positions = [position for position, favorites in enumerate(favorite_lists) if favorites]
+        if not scorer or not positions:
+            return results
+
+        catalog_ids = self._collaborative_candidates(db)
+        id_to_row = {rid: row for row, rid in enumerate(catalog_ids)}
+        item_rows = scorer.encode_items(catalog_ids)
+        batch_user_ids = [user_ids[position] for position in positions]
+        user_vectors = self.user_vectors.get_many_factors(batch_user_ids, scorer.version)
+        batch_scores = scorer.score_batch(batch_user_ids, item_rows, user_vectors=user_vectors)
+        for position, scores in zip(positions, batch_scores):
+            favorite_rows = np.fromiter(
+                (id_to_row[rid] for rid in favorite_lists[position] if rid in id_to_row), dtype=np.int64
+            )
+            top_rows = scorer.top_n(scores, n_recs, exclude=favorite_rows)
+            results[position] = [(catalog_ids[row], float(scores[row])) for row in top_rows]
+        return results
+
+    def rank_recipe_batch(
+        self, db: Session, favorites_by_user: Dict[str, List[str]], n_recs: int, strategy: Optional[str] = None,
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        user_ids = list(favorites_by_user)
+        ranked: Dict[str, List[Tuple[str, float]]] = {user_id: [] for user_id in user_ids}
+        if not self._ensure_ingredient_index(db):
+            return ranked
+
+        favorite_lists = [favorites_by_user[user_id] for user_id in user_ids]
+        if (strategy or settings.RECOMMENDATION_STRATEGY) == "pipeline":
+            scorer = self._refresh_model()
+            user_vectors = self.user_vectors.get_many_factors(user_ids, scorer.version) if scorer else {}
+            profiles = self.user_vectors.get_many_profiles(user_ids, self.ingredient_index.build_id)
+            batch = self.pipeline.rank_batch(db, user_ids, favorite_lists, n_recs, scorer, user_vectors, profiles)
+            for user_id, favorites, pipeline_recs in zip(user_ids, favorite_lists, batch):
+                blended, popular_scores = self._blend_popular(db, [rid for rid, _ in pipeline_recs], favorites, n_recs)
+                scores = {**popular_scores, **dict(pipeline_recs)}
+                ranked[user_id] = [(rid, scores[rid]) for rid in blended]
+            return ranked
+
+        content = self.ingredient_index.top_similar_batch(favorite_lists, n_recs)
+        collaborative = self._get_collaborative_batch(db, user_ids, favorite_lists, n_recs)
+
+        for user_id, favorites, content_recs, collaborative_recs in zip(user_ids, favorite_lists, content, collaborative):
+            merged = self._merge_hybrid([rid for rid, _ in content_recs], [rid for rid, _ in collaborative_recs], n_recs)
+            blended, popular_scores = self._blend_popular(db, merged, favorites, n_recs)
+            scores = {**popular_scores, **dict(collaborative_recs), **dict(content_recs)}
+            ranked[user_id] = [(rid, scores[rid]) for rid in blended]
+        return ranked
+
+    def _get_precomputed_recommendation_ids(self, db: Session, user_id: UUID, model_version: Optional[str], n_recs: int) -> Optional[List[str]]:
+        try:
+            row = self.user_recommendation_repo.get_by_user(db, user_id=user_id)
+        except SQLAlchemyError as e:
+            print(f"Could not read precomputed recommendations: {e}")
+            db.rollback()
+            return None
+
+        if row is None or not row.recipe_ids or row.model_version != model_version:
+            return None
+        generated_at = row.generated_at if row.generated_at.tzinfo else row.generated_at.replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - generated_at > timedelta(hours=settings.RECOMMENDATION_PRECOMPUTE_MAX_AGE_HOURS):
+            return None
+        if len(row.recipe_ids) < n_recs and n_recs > settings.RECOMMENDATION_PRECOMPUTE_TOP_N:
+            return None
+
+        print(f"Serving precomputed recommendations for user {user_id} (generated at {generated_at.isoformat()}).")
+        return row.recipe_ids[:n_recs]
+
+    def _compute_recommendation_ids(self, db: Session, user_id: UUID, n_recs: int) -> List[str]:
+        user_favorite_ids = self.favorite_repo.get_user_favorite_recipe_ids(db, user_id=user_id, limit=2000)
+        return self.rank_recipe_ids(
+            db, user_id, user_favorite_ids, n_recs, strategy=settings.RECOMMENDATION_STRATEGY, use_stored_vectors=True
+        )
+
+    def get_recommendations_for_user(self, db: Session, user_id: UUID, n_recs: int = 10) -> List[Recipe]:
+        self._refresh_model()
+        model_version = self.model_version
+
+        final_rec_ids = self.recommendation_cache.get(user_id, model_version, n_recs)
+        if final_rec_ids is None:
+            final_rec_ids = self._get_precomputed_recommendation_ids(db, user_id, model_version, n_recs)
+            if final_rec_ids is None:
+                final_rec_ids = self._compute_recommendation_ids(db, user_id, n_recs)
+            self.recommendation_cache.set(user_id, model_version, n_recs, final_rec_ids)
+        else:
+            print(f"Serving {len(final_rec_ids)} cached recommendations for user {user_id}.")
 
-        final_recs = list(final_recs_map.values())
+        final_recs = self.recipe_repo.get_by_ids(db, ids=final_rec_ids)
         print(f"Returning {len(final_recs)} final hybrid recommendations.")
         return final_recs
 
 
-recommendation_service = RecommendationService(favorite_repository, recipe_repository)
\ No newline at end of file
+recommendation_service = RecommendationService(
+    favorite_repository, recipe_repository, ingredient_index_service, collaborative_model_store,
+    recommendation_cache_service, training_data_service, user_recommendation_repository, popularity_index_service,
+    user_vector_store, recommendation_pipeline,
+)
\ No newline at end of file
@@ -1,10 +1,20 @@
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional
 from urllib.parse import urlparse
 
 import httpx
-from recipe_scrapers import scrape_me, _exceptions as ScraperExceptions
+from recipe_scrapers import HEADERS, scrape_html, _exceptions as ScraperExceptions
+
+from app.core.config import settings
+from app.core.page_cache import PageCache
+from app.core.singleflight import AsyncSingleFlight
+
 
 class ScrapingService:
+    def __init__(self, http_client: httpx.AsyncClient, page_cache: Optional[PageCache] = None):
+        self.http_client = http_client
+        self.page_cache = page_cache
+        self.flights = AsyncSingleFlight("scraping")
 
     def _is_valid_url(self, url: str) -> bool:
         try:
@@ -14,66 +24,113 @@ class ScrapingService:
             return False
 
     async def scrape_recipe_from_url(self, url: str) -> Dict[str, Any]:
+        return await self.flights.do(url, self._scrape_recipe, url)
+
+    async def _scrape_recipe(self, url: str) -> Dict[str, Any]:
         print(f"Scraping Service: Starting for URL: {url}")
 
         if not self._is_valid_url(url):
             raise ValueError("The provided URL is not valid.")
 
         try:
-            scraper = scrape_me(url=url)
-            
-            title = scraper.title()
-            image_url = scraper.image()
-            ingredients = scraper.ingredients()
-            directions = scraper.instructions_list()
-
-            try:
-                servings = scraper.yields()
-            except ScraperExceptions.SchemaOrgException:
-                servings = None
-
-            missing_fields = []
-            if not title:
-                missing_fields.append("title")
-            if not image_url:
-                missing_fields.append("image")
-            if not ingredients:
-                missing_fields.append("ingredients")
-            if not directions:
-                missing_fields.append("steps")
-
-            if missing_fields:
-                error_message = f"Missing mandatory data: {', '.join(missing_fields)}."
-                print(f"Scraping Service: {error_message}")
-                raise ValueError(error_message)
-
-            scraped_data = {
-                "title": title,
-                "image_url": image_url,
-                "servings": servings,
-                "ingredients": ingredients,
-                "directions": directions,
-                "url": url,
-            }
-
-            print(f"Scraping Service: Success for: {scraped_data.get('title')}")
-            return scraped_data
+            cached_page = await asyncio.to_thread(self.page_cache.get, url) if self.page_cache is not None else None
+            response = await self.http_client.get(url, headers=self.page_cache.conditional_headers(cached_page) if cached_page else None)
+
+            if response.status_code == 304 and cached_page is not None:
+                self.page_cache.record_not_modified(cached_page)
+                if cached_page.get("parsed"):
+                    print(f"Scraping Service: Not modified, reusing the cached parse for: {url}")
+                    return {**cached_page["parsed"], "url": url}
+                html = await asyncio.to_thread(self.page_cache.read_html, cached_page)
+                if html is not None:
+                    return await asyncio.to_thread(self._parse_recipe, html, url)
+                response = await self.http_client.get(url)
+
+            response.raise_for_status()
+            # Parsing is CPU-bound; keep it off the event loop that serves other requests.
+            return await asyncio.to_thread(
+                self._parse_and_cache, response.text, url, response.headers.get("ETag"), response.headers.get("Last-Modified")
+            )
+
+        except httpx.HTTPStatusError as http_err:
+            print(f"Scraping Service: HTTP {http_err.response.status_code} at {url}")
+            raise ConnectionError(f"Could not access the URL: HTTP {http_err.response.status_code}") from http_err
 
         except httpx.RequestError as http_err:
             print(f"Scraping Service: Network error at {url}: {http_err}")
             raise ConnectionError(f"Could not access the URL: {http_err}") from http_err
-        
+
         except (ScraperExceptions.WebsiteNotImplementedError, ScraperExceptions.NoSchemaFoundInWildMode) as scrape_err:
             error_type = type(scrape_err).__name__
             print(f"Scraping Service: Scraping error ({error_type}) at {url}: {scrape_err}")
             raise ValueError(f"The website is not supported or no recipe data was found ({error_type})") from scrape_err
-        
+
         except ValueError as val_err:
             raise
-        
+
         except Exception as e:
             error_type = type(e).__name__
             print(f"Scraping Service: Unexpected error at {url}: ({error_type}) {e}")
             raise RuntimeError(f"An unexpected error occurred during scraping: {e}") from e
 
-scraping_service = ScrapingService()
+    def _parse_and_cache(self, html: str, url: str, etag: Optional[str], last_modified: Optional[str]) -> Dict[str, Any]:
+        scraped_data = self._parse_recipe(html, url)
+        if self.page_cache is not None:
+            self.page_cache.store(url, html, etag, last_modified, scraped_data)
+        return scraped_data
+
+    def _parse_recipe(self, html: str, url: str) -> Dict[str, Any]:
+        scraper = scrape_html(html, org_url=url)
+
+        title = scraper.title()
+        image_url = scraper.image()
+        ingredients = scraper.ingredients()
+        directions = scraper.instructions_list()
+
+        try:
+            servings = scraper.yields()
+        except ScraperExceptions.SchemaOrgException:
+            servings = None
+
+        missing_fields = []
+        if not title:
+            missing_fields.append("title")
+        if not image_url:
+            missing_fields.append("image")
+        if not ingredients:
+            missing_fields.append("ingredients")
+        if not directions:
+            missing_fields.append("steps")
+
+        if missing_fields:
+            error_message = f"Missing mandatory data: {', '.join(missing_fields)}."
+            print(f"Scraping Service: {error_message}")
+            raise ValueError(error_message)
+
+        scraped_data = {
+            "title": title,
+            "image_url": image_url,
+            "servings": servings,
+            "ingredients": ingredients,
+            "directions": directions,
+            "url": url,
+        }
+
+        print(f"Scraping Service: Success for: {scraped_data.get('title')}")
+        return scraped_data
+
+
+scraping_service = ScrapingService(
+    httpx.AsyncClient(
+        http2=settings.SCRAPING_HTTP2,
+        headers=HEADERS,
+        follow_redirects=True,
+        timeout=settings.SCRAPING_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.SCRAPING_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SCRAPING_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.SCRAPING_KEEPALIVE_SECONDS,
+        ),
+    ),
+    PageCache(settings.PAGE_CACHE_DIR, settings.PAGE_CACHE_MAX_BYTES, settings.PAGE_CACHE_RESCAN_SECONDS) if settings.PAGE_CACHE_ENABLED else None,
+)
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from app.core.cache import TieredCache
+from app.core.config import settings
+
+
+class SearchCacheService:
+    # The Custom Search daily quota resets at midnight Pacific time.
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+    QUOTA_RETENTION_DAYS = 31
+
+    def __init__(self, cache: TieredCache):
+        self.cache = cache
+        self._local_quota: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(engine_id: str, query: str, start: int, num: int, search_type: Optional[str]) -> str:
+        raw = json.dumps([engine_id, query, start, num, search_type or ""], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, engine_id: str, query: str, start: int, num: int, search_type: Optional[str] = None) -> Any:
+        cached = self.cache.get(self._key(engine_id, query, start, num, search_type))
+        if cached is not None:
+            self.record("saved")
+        return cached
+
+    def contains(self, engine_id: str, query: str, start: int, num: int, search_type: Optional[str] = None) -> bool:
+        return self.cache.get(self._key(engine_id, query, start, num, search_type)) is not None
+
+    def set(self, engine_id: str, query: str, start: int, num: int, value: Any, search_type: Optional[str] = None) -> None:
+        self.cache.set(self._key(engine_id, query, start, num, search_type), value)
+
+    def _quota_day(self, now: Optional[datetime] = None) -> str:
+        return (now or datetime.now(self.QUOTA_TIMEZONE)).astimezone(self.QUOTA_TIMEZONE).date().isoformat()
+
+    def _quota_key(self, day: str) -> str:
+        return f"{self.cache.namespace}:quota:{day}"
+
+    def record(self, counter: str) -> None:
+        day = self._quota_day()
+        with self._lock:
+            counters = self._local_quota.setdefault(day, {"calls": 0, "saved": 0})
+            counters[counter] += 1
+
+        def increment(client):
+            pipe = client.pipeline(transaction=False)
+            pipe.hincrby(self._quota_key(day), counter, 1)
+            pipe.expire(self._quota_key(day), self.QUOTA_RETENTION_DAYS * 86400)
+            pipe.execute()
+
+        self.cache.remote_call(increment)
+
+    def quota_usage(self, days: int = 7) -> List[Dict[str, Any]]:
+        today = datetime.now(self.QUOTA_TIMEZONE)
+        usage = []
+        for offset in range(days):
+            day = self._quota_day(today - timedelta(days=offset))
+            remote = self.cache.remote_call(lambda client: client.hgetall(self._quota_key(day)))
+            if remote is not None:
+                counters = {key.decode() if isinstance(key, bytes) else key: int(value) for key, value in remote.items()}
+            else:
+                with self._lock:
+                    counters = dict(self._local_quota.get(day, {}))
+            calls, saved = counters.get("calls", 0), counters.get("saved", 0)
+            usage.append({
+                "date": day,
+                "calls": calls,
+                "saved": saved,
+                "saved_ratio": round(saved / (calls + saved), 4) if calls + saved else 0.0,
+            })
+        return usage
+
+
+search_cache_service = SearchCacheService(
+    TieredCache(
+        namespace="search_results",
+        ttl_seconds=settings.SEARCH_RESULT_CACHE_TTL_SECONDS,
+        local_maxsize=settings.SEARCH_RESULT_CACHE_LOCAL_SIZE,
+    )
+)
@@ -1,70 +1,213 @@
-from googleapiclient.discovery import build
-from typing import List, Dict, Any, Optional
+import asyncio
+import time
+import httpx
+from typing import List, Dict, Any, Optional, Set
 from app.core.config import settings
+from app.core.singleflight import AsyncSingleFlight, flight_key
+from app.core.text_matching import compile_restrictions
 from app.services.ai_agents_service import ai_agents_service
-from unidecode import unidecode
+from app.services.ingredient_catalog_service import ingredient_catalog_service
+from app.services.recipe_search_service import recipe_search_service
+from app.services.search_cache_service import search_cache_service
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
 
 class SearchService:
-    def __init__(self, max_results: int = settings.MAX_SEARCH_RESULTS):
+    CSE_PAGE_SIZE = 10
+    # Custom Search never returns results past position 100.
+    CSE_MAX_RESULTS = 100
+
+    def __init__(self, search_cache, local_search, ingredient_catalog, max_results: int = settings.MAX_SEARCH_RESULTS):
         self.api_key = settings.GOOGLE_API_KEY
         self.search_recipe_engine_id = settings.GOOGLE_SEARCH_RECIPE_ENGINE_ID
         self.search_ingredient_engine_id = settings.GOOGLE_SEARCH_INGREDIENT_ENGINE_ID
         self.max_results = max_results
-        self.service = build("customsearch", "v1", developerKey=self.api_key)
+        self.search_cache = search_cache
+        self.local_search = local_search
+        self.ingredient_catalog = ingredient_catalog
+        self.cse_url = f"{(settings.GOOGLE_CSE_API_ENDPOINT or 'https://customsearch.googleapis.com/').rstrip('/')}/customsearch/v1"
+        self.http_client = httpx.AsyncClient(timeout=10)
+        self.cse_flights = AsyncSingleFlight("cse")
+        self._background_tasks: Set[asyncio.Task] = set()
 
     def _build_query_from_analysis(self, analysis: Dict[str, Any]) -> str:
         base_query = analysis.get("base_search", "")
-        restrictions = analysis.get("restrictions", [])
 
         if not base_query:
             return ""
 
         final_query_parts = [f'"{base_query}"']
-
-        for restriction in restrictions:
-            term_to_exclude = unidecode(
-                restriction.replace("sin", "").strip().lower())
-
-            for word in term_to_exclude.split():
-                if word:
-                    final_query_parts.append(f'-{word}')
+        final_query_parts.extend(f'-{word}' for word in compile_restrictions(analysis.get("restrictions", [])).words)
 
         final_query = " ".join(final_query_parts)
         return final_query
 
     def _secondary_filter(self, items: List[Dict[str, Any]], analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
-        restrictions = analysis.get("restrictions", [])
-        if not restrictions:
-            return items
-
-        words_to_exclude = set()
-        for restriction in restrictions:
-            term_to_exclude = unidecode(
-                restriction.replace("sin", "").strip().lower())
-            for word in term_to_exclude.split():
-                if word:
-                    words_to_exclude.add(word)
-
-        if not words_to_exclude:
-            return items
-
-        filtered_items = []
-        for item in items:
-            text_to_review = f"{item.get('title', '')} {item.get('snippet', '')}".lower(
-            )
-            text_to_review = unidecode(text_to_review)
-
-            if not any(word in text_to_review for word in words_to_exclude):
-                filtered_items.append(item)
-            else:
-                print(
-                    f"Discarding result: '{item.get('title')}' (Contains excluded term)")
+        matcher = compile_restrictions(analysis.get("restrictions", []))
+        filtered_items, discarded_items = matcher.filter(
+            items, lambda item: f"{item.get('title', '')} {item.get('snippet', '')}"
+        )
+        for item in discarded_items:
+            print(
+                f"Discarding result: '{item.get('title')}' (Contains excluded term)")
 
         return filtered_items
 
-    def search_recipes(self, query: str, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
-        analysis_result = ai_agents_service.analyze_search_query(query)
+    async def _cse_list(self, engine_id: str, query: str, start: int, num: int, **params: Any) -> Dict[str, Any]:
+        return await self.cse_flights.do(
+            flight_key(engine_id, query, start, num, params), self._request_cse, engine_id, query, start, num, **params
+        )
+
+    async def _request_cse(self, engine_id: str, query: str, start: int, num: int, **params: Any) -> Dict[str, Any]:
+        response = await self.http_client.get(
+            self.cse_url,
+            params={"key": self.api_key, "cx": engine_id, "q": query, "start": start, "num": num, **params},
+        )
+        # Error responses count against the daily quota too.
+        self.search_cache.record("calls")
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _to_search_result(item: Dict[str, Any]) -> Dict[str, Any]:
+        image_url = None
+        pagemap = item.get('pagemap', {})
+        if pagemap:
+            if 'cse_image' in pagemap and pagemap['cse_image']:
+                image_url = pagemap['cse_image'][0].get('src')
+            elif 'cse_thumbnail' in pagemap and pagemap['cse_thumbnail']:
+                image_url = pagemap['cse_thumbnail'][0].get('src')
+
+        return {
+            "title": item.get('title'),
+            "url": item.get('link'),
+            "image_url": image_url
+        }
+
+    async def _fetch_recipe_page(self, final_query: str, start_index: int) -> Optional[List[Dict[str, Any]]]:
+        cached_page = self.search_cache.get(self.search_recipe_engine_id, final_query, start_index, self.CSE_PAGE_SIZE)
+        if cached_page is not None:
+            print(f"Search cache hit for query: '{final_query}' (start={start_index}, {len(cached_page)} results).")
+            return cached_page
+
+        try:
+            print(f"Searching for recipes with query: '{final_query}' (start={start_index}) using engine ID: {self.search_recipe_engine_id}")
+            res = await self._cse_list(self.search_recipe_engine_id, final_query, start_index, self.CSE_PAGE_SIZE)
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"Error during Google Custom Search API call for recipes: {e}")
+            return None
+
+        page = [{**self._to_search_result(item), "snippet": item.get('snippet', '')} for item in res.get('items', [])]
+        self.search_cache.set(self.search_recipe_engine_id, final_query, start_index, self.CSE_PAGE_SIZE, page)
+        return page
+
+    def _page_starts(self, skip: int, limit: int) -> List[int]:
+        end = min(skip + limit, self.CSE_MAX_RESULTS)
+        first = skip - skip % self.CSE_PAGE_SIZE
+        return [offset + 1 for offset in range(first, end, self.CSE_PAGE_SIZE)]
+
+    async def _fetch_recipe_results(
+        self, final_query: str, skip: int, limit: int, analysis: Optional[Dict[str, Any]] = None, prefetch: bool = False
+    ) -> Optional[List[Dict[str, Any]]]:
+        starts = self._page_starts(skip, limit)
+        if not starts:
+            return []
+        pages = await self._fetch_recipe_pages(final_query, starts)
+        if pages[0] is None:
+            return None
+
+        items: List[Dict[str, Any]] = []
+        for page in pages:
+            if page is None:
+                break
+            items.extend(page)
+            if len(page) < self.CSE_PAGE_SIZE:
+                break
+        window_start = skip - (starts[0] - 1)
+        window = items[window_start:window_start + limit]
+
+        seen_urls = set()
+        unique_items = []
+        for item in window:
+            if item.get('url') not in seen_urls:
+                seen_urls.add(item.get('url'))
+                unique_items.append(item)
+        if analysis is not None:
+            unique_items = self._secondary_filter(unique_items, analysis)
+        results = [{"title": item.get('title'), "url": item.get('url'), "image_url": item.get('image_url')} for item in unique_items]
+
+        # Only users already paging get the next window warmed; a first-page search costs one call.
+        if prefetch and skip > 0 and settings.SEARCH_PREFETCH_NEXT_PAGE and len(window) == limit:
+            self._prefetch_next_page(final_query, skip + limit, limit)
+        return results
+
+    def _prefetch_next_page(self, final_query: str, skip: int, limit: int) -> None:
+        # Warm the cache for the page the user is most likely to request next; the fetch is
+        # coalesced with a real request for the same page if one arrives meanwhile.
+        starts = self._page_starts(skip, limit)
+        if not starts or self.search_cache.contains(self.search_recipe_engine_id, final_query, starts[-1], self.CSE_PAGE_SIZE):
+            return
+        task = asyncio.create_task(self._fetch_recipe_pages(final_query, starts))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _fetch_recipe_pages(self, final_query: str, starts: List[int]) -> List[Optional[List[Dict[str, Any]]]]:
+        return await asyncio.gather(*[self._fetch_recipe_page(final_query, start) for start in starts])
+
+    async def _search_local(
+        self, db: Optional[Session], query: str, excluded_words: List[str], skip: int, limit: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        if db is None or not settings.LOCAL_SEARCH_ENABLED:
+            return None
+        try:
+            matches = await asyncio.to_thread(self.local_search.search, db, query, excluded_words, limit, skip)
+        except SQLAlchemyError as e:
+            print(f"Local recipe search failed, falling back to Google: {e}")
+            return None
+
+        results = [{"title": match["title"], "url": match["url"], "image_url": match["image_url"]} for match in matches]
+        if len(results) < min(settings.LOCAL_SEARCH_MIN_RESULTS, limit):
+            print(f"Local search: only {len(results)} results for '{query}', falling back to Google.")
+            return None
+        print(f"Local search: {len(results)} results for '{query}'.")
+        return results
+
+    async def _speculative_fetch(
+        self, local: "asyncio.Task[Optional[List[Dict[str, Any]]]]", query: str, skip: int, limit: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        # Google is only asked when the local index cannot answer the raw query by itself.
+        if await local is not None:
+            return None
+        return await self._fetch_recipe_results(query, skip, limit)
+
+    async def search_recipes(
+        self, query: str, skip: int = 0, limit: int = 10, db: Optional[Session] = None
+    ) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        analysis = asyncio.create_task(ai_agents_service.analyze_search_query(query))
+        local = asyncio.create_task(self._search_local(db, query, [], skip, limit))
+
+        # While the agent classifies the query, fetch the raw query: unrestricted
+        # queries then cost max(analysis, search) instead of their sum. Only single-page
+        # windows are speculated so a restricted query wastes at most one CSE call.
+        speculative = None
+        if (
+            settings.SEARCH_SPECULATIVE_FETCH
+            and len(self._page_starts(skip, limit)) == 1
+            and ai_agents_service.get_cached_search_analysis(query) is None
+        ):
+            speculative = asyncio.create_task(self._speculative_fetch(local, query, skip, limit))
+            # Never cancelled: the upstream call is shielded by the single flight, so the quota is
+            # spent anyway. An unused result still finishes in the background and fills the cache.
+            self._background_tasks.add(speculative)
+            speculative.add_done_callback(self._background_tasks.discard)
+
+        try:
+            analysis_result = await analysis
+        finally:
+            # The local lookup shares the request's session; it must finish before anything else uses it.
+            local_results = await local
 
         if isinstance(analysis_result, dict) and 'error' in analysis_result:
             print(
@@ -90,55 +233,59 @@ class SearchService:
             if not final_query:
                 print("Error: Could not build a valid query from the analysis.")
                 return []
+            results = await self._search_local(
+                db, analysis_data.get("base_search", ""), compile_restrictions(analysis_data.get("restrictions", [])).terms,
+                skip, limit,
+            )
+            if results is None:
+                results = await self._fetch_recipe_results(final_query, skip, limit, analysis_data, prefetch=True)
+        elif local_results is not None:
+            results = local_results
+        elif speculative is not None:
+            results = await speculative
         else:
-            final_query = query
+            results = await self._fetch_recipe_results(query, skip, limit, prefetch=True)
 
-        results = []
-        try:
-            num_results_to_fetch = min(limit, 10)
-            start_index = skip + 1
-
-            print(f"Searching for recipes with query: '{final_query}' using engine ID: {self.search_recipe_engine_id}")
-            res = self.service.cse().list(
-                q=final_query,
-                cx=self.search_recipe_engine_id,
-                num=num_results_to_fetch,
-                start=start_index,
-            ).execute()
-
-            items_to_process = res.get('items', [])
-            if classification == "CON_RESTRICCION":
-                items_to_process = self._secondary_filter(
-                    items_to_process, analysis_data)
-
-            for item in items_to_process:
-                image_url = None
-                pagemap = item.get('pagemap', {})
-                if pagemap:
-                    if 'cse_image' in pagemap and pagemap['cse_image']:
-                        image_url = pagemap['cse_image'][0].get('src')
-                    elif 'cse_thumbnail' in pagemap and pagemap['cse_thumbnail']:
-                        image_url = pagemap['cse_thumbnail'][0].get('src')
-
-                results.append({
-                    "title": item.get('title'),
-                    "url": item.get('link'),
-                    "image_url": image_url
-                })
+        if results is None:
+            return []
+        print(f"Found {len(results)} recipe results in {(time.perf_counter() - started) * 1000:.0f} ms.")
+        return results
 
+    async def get_ingredient(self, text_query: str, db: Optional[Session] = None) -> Optional[Dict[str, Any]]:
+        if db is not None:
+            known_ingredient = await asyncio.to_thread(self.ingredient_catalog.get, db, text_query)
+            if known_ingredient is not None:
+                print(f"Ingredient catalog hit for query: '{text_query}'")
+                return known_ingredient
 
-        except Exception as e:
-            print(f"Error during Google Custom Search API call for recipes: {e}")
-            return []
+        ingredient_name = await asyncio.to_thread(self.ingredient_catalog.extracted_name, text_query)
+        if ingredient_name is not None:
+            print(f"Reusing ingredient '{ingredient_name}' already extracted from query: '{text_query}'")
+        else:
+            ingredient_name = await self._extract_ingredient_name(text_query)
+            if ingredient_name is None:
+                return None
+            await asyncio.to_thread(self.ingredient_catalog.remember_extracted_name, text_query, ingredient_name)
+
+        if db is not None:
+            ingredient = await self.ingredient_catalog.resolve(
+                db, ingredient_name, lambda: self._search_ingredient_image(ingredient_name)
+            )
+        else:
+            ingredient = await self._search_ingredient_image(ingredient_name)
 
-        print(f"Found {len(results)} recipe results.")
-        return results
+        if ingredient is None:
+            return {
+                "name": ingredient_name,
+                "image_url": None,
+                "search_url": None
+            }
+        return ingredient
 
-    def get_ingredient(self, text_query: str) -> Optional[Dict[str, Any]]:
+    async def _extract_ingredient_name(self, text_query: str) -> Optional[str]:
         print(f"Attempting to extract ingredient from query: '{text_query}'")
-        ingredient_name: Optional[str] = None
         try:
-            extraction_result = ai_agents_service.extract_ingredient(text_query)
+            extraction_result = await ai_agents_service.extract_ingredient(text_query)
         except Exception as e:
             print(f"Error calling ingredient extraction agent service: {e}")
             return None
@@ -164,21 +311,29 @@ class SearchService:
             return None
 
         print(f"Successfully extracted ingredient by AI: '{ingredient_name}'")
+        return ingredient_name
+
+    async def _search_ingredient_image(self, ingredient_name: str) -> Optional[Dict[str, Any]]:
         print(f"Now searching Google for ingredient: '{ingredient_name}' using engine ID: {self.search_ingredient_engine_id}")
 
         search_query = f"{ingredient_name} ingrediente -receta -preparación -cocina -shampoo -cosmético -belleza"
+        cached_ingredient = self.search_cache.get(self.search_ingredient_engine_id, search_query, 1, 1, search_type="image")
+        if cached_ingredient is not None:
+            print(f"Search cache hit for ingredient image: '{ingredient_name}'.")
+            return cached_ingredient
 
         try:
-            res = self.service.cse().list(
-                q=search_query,
-                cx=self.search_ingredient_engine_id,
+            res = await self._cse_list(
+                self.search_ingredient_engine_id,
+                search_query,
+                start=1,
                 num=1,
                 searchType="image",
                 imgType="photo",
                 lr="lang_es",
                 hl="es",
                 safe="active"
-            ).execute()
+            )
 
             items = res.get('items', [])
             if items:
@@ -187,26 +342,24 @@ class SearchService:
                 page_url = first_item.get('image', {}).get('contextLink')
 
                 print(f"Found image for '{ingredient_name}': {image_url} from page: {page_url}")
-                return {
+                ingredient = {
                     "name": ingredient_name,
                     "image_url": image_url,
                     "search_url": page_url
                 }
             else:
                 print(f"No image results found on Google for ingredient: '{ingredient_name}'")
-                return {
+                ingredient = {
                     "name": ingredient_name,
                     "image_url": None,
                     "search_url": None
                 }
+            self.search_cache.set(self.search_ingredient_engine_id, search_query, 1, 1, ingredient, search_type="image")
+            return ingredient
 
         except Exception as e:
             print(f"Error during Google Custom Search API call for ingredient image: {e}")
-            return {
-                "name": ingredient_name,
-                "image_url": None,
-                "search_url": None
-            }
+            return None
 
 
-search_service = SearchService()
+search_service = SearchService(search_cache_service, recipe_search_service, ingredient_catalog_service)
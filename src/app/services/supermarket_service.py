@@ -1,12 +1,14 @@
 import requests
 from typing import List, Optional, Dict, Any, Tuple
 from app.core.config import settings
+from app.core.singleflight import SingleFlight, flight_key
 from app.schemas.supermarket import SupermarketInfo
 
 class SupermarketService:
     def __init__(self):
         self.api_key = settings.GOOGLE_API_KEY
         self.base_url = settings.GOOGLE_MAPS_API_BASE_URL
+        self.flights = SingleFlight("places")
 
         if not self.api_key:
             print("CRITICAL ERROR: Maps_API_KEY is not set in settings.")
@@ -22,6 +24,9 @@ class SupermarketService:
     def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if not self._check_config():
             return None
+        return self.flights.do(flight_key(endpoint, params), self._request_places, endpoint, params)
+
+    def _request_places(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         try:
             log_param = params.get('place_id') or params.get('query') or params.get('pagetoken', 'N/A')
             print(f"Making request to: {self.base_url}/{endpoint} with main param: {log_param}")
@@ -0,0 +1,105 @@
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.core.cache import RedisConnection, redis_connection
+from app.repositories.favorite_repository import favorite_repository
+
+
+class InteractionData:
+    def __init__(self, user_ids: List[str], recipe_ids: List[str], user_codes: np.ndarray, item_codes: np.ndarray):
+        self.user_ids = user_ids
+        self.recipe_ids = recipe_ids
+        self.user_codes = user_codes
+        self.item_codes = item_codes
+
+    def __len__(self) -> int:
+        return len(self.user_codes)
+
+    @property
+    def n_users(self) -> int:
+        return len(self.user_ids)
+
+    @property
+    def n_items(self) -> int:
+        return len(self.recipe_ids)
+
+    def subset(self, mask: np.ndarray) -> "InteractionData":
+        return InteractionData(self.user_ids, self.recipe_ids, self.user_codes[mask], self.item_codes[mask])
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "user_id": self.user_codes,
+            "recipe_id": self.item_codes,
+            "rating": np.ones(len(self), dtype=np.float32),
+        })
+
+
+class TrainingDataService:
+    def __init__(self, favorite_repo, connection: RedisConnection = redis_connection, namespace: str = "training"):
+        self.favorite_repo = favorite_repo
+        self.connection = connection
+        self.removals_key = f"{namespace}:removed_favorites"
+
+    def load_interactions(self, db: Session, batch_size: int = 10000) -> Optional[InteractionData]:
+        capacity = max(self.favorite_repo.count(db), 1)
+        user_codes = np.empty(capacity, dtype=np.int32)
+        item_codes = np.empty(capacity, dtype=np.int32)
+        users: Dict[str, int] = {}
+        items: Dict[str, int] = {}
+
+        n_rows = 0
+        for user_id, recipe_id in self.favorite_repo.iter_user_recipe_pairs(db, batch_size=batch_size):
+            if n_rows == capacity:
+                capacity *= 2
+                user_codes = np.resize(user_codes, capacity)
+                item_codes = np.resize(item_codes, capacity)
+            user_codes[n_rows] = users.setdefault(str(user_id), len(users))
+            item_codes[n_rows] = items.setdefault(str(recipe_id), len(items))
+            n_rows += 1
+
+        if n_rows == 0:
+            return None
+
+        print(f"Loaded {n_rows} favorites ({len(users)} users, {len(items)} recipes) for training.")
+        return InteractionData(
+            user_ids=list(users),
+            recipe_ids=list(items),
+            user_codes=user_codes[:n_rows],
+            item_codes=item_codes[:n_rows],
+        )
+
+    def record_removal(self, user_id, recipe_id) -> None:
+        # Deleted rows leave no created_at behind, so warm starts learn about them from this log.
+        member = f"{user_id}:{recipe_id}"
+        self.connection.call(lambda client: client.zadd(self.removals_key, {member: time.time()}))
+
+    def load_touched_ids(self, db: Session, since: datetime) -> Optional[Tuple[Set[str], Set[str]]]:
+        def load_removals(client):
+            cutoff = since.timestamp()
+            pipe = client.pipeline()
+            pipe.zremrangebyscore(self.removals_key, "-inf", f"({cutoff}")
+            pipe.zrangebyscore(self.removals_key, cutoff, "+inf")
+            return pipe.execute()[1]
+
+        removals = self.connection.call(load_removals)
+        if removals is None:
+            # Without the removal log a warm start could keep factors for favorites that are gone.
+            return None
+
+        users: Set[str] = set()
+        items: Set[str] = set()
+        for member in removals:
+            user_id, _, recipe_id = (member.decode() if isinstance(member, bytes) else member).partition(":")
+            users.add(user_id)
+            items.add(recipe_id)
+        for user_id, recipe_id in self.favorite_repo.iter_user_recipe_pairs(db, since=since):
+            users.add(str(user_id))
+            items.add(str(recipe_id))
+        return users, items
+
+training_data_service = TrainingDataService(favorite_repository)
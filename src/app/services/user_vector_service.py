@@ -0,0 +1,67 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.cache import TieredCache
+from app.core.config import settings
+from app.services.collaborative_scoring_service import UserVector
+
+
+class UserVectorStore:
+    def __init__(self, cache: TieredCache):
+        self.cache = cache
+
+    @staticmethod
+    def _key(user_id: Any, kind: str, version: Optional[str]) -> str:
+        return f"{user_id}:{kind}:{version or 'none'}"
+
+    def get_factors(self, user_id: Any, model_version: Optional[str]) -> Optional[UserVector]:
+        stored = self.cache.get(self._key(user_id, "factors", model_version))
+        if stored is None:
+            return None
+        return float(stored["bias"]), np.asarray(stored["vector"], dtype=np.float64)
+
+    def get_many_factors(self, user_ids: Sequence[Any], model_version: Optional[str]) -> Dict[str, UserVector]:
+        vectors = {}
+        for user_id in user_ids:
+            vector = self.get_factors(user_id, model_version)
+            if vector is not None:
+                vectors[str(user_id)] = vector
+        return vectors
+
+    def set_factors(self, user_id: Any, model_version: Optional[str], vector: UserVector) -> None:
+        bias, factors = vector
+        self.cache.set(self._key(user_id, "factors", model_version), {"bias": bias, "vector": factors.tolist()})
+
+    def delete_factors(self, user_id: Any, model_version: Optional[str]) -> None:
+        self.cache.delete(self._key(user_id, "factors", model_version))
+
+    def get_profile(self, user_id: Any, build_id: Optional[str]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        stored = self.cache.get(self._key(user_id, "profile", build_id))
+        if stored is None:
+            return None
+        return np.asarray(stored["indices"], dtype=np.int64), np.asarray(stored["values"], dtype=np.float32)
+
+    def get_many_profiles(self, user_ids: Sequence[Any], build_id: Optional[str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        profiles = {}
+        for user_id in user_ids:
+            profile = self.get_profile(user_id, build_id)
+            if profile is not None:
+                profiles[str(user_id)] = profile
+        return profiles
+
+    def set_profile(self, user_id: Any, build_id: Optional[str], profile: Tuple[np.ndarray, np.ndarray]) -> None:
+        indices, values = profile
+        self.cache.set(self._key(user_id, "profile", build_id), {"indices": indices.tolist(), "values": values.tolist()})
+
+    def delete_profile(self, user_id: Any, build_id: Optional[str]) -> None:
+        self.cache.delete(self._key(user_id, "profile", build_id))
+
+
+user_vector_store = UserVectorStore(
+    TieredCache(
+        namespace="user_vectors",
+        ttl_seconds=settings.USER_VECTOR_TTL_SECONDS,
+        local_maxsize=settings.USER_VECTOR_LOCAL_SIZE,
+    )
+)
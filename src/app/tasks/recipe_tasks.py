@@ -5,6 +5,7 @@ from app.services import nutrition_service
 from app.services.analysis_service import analysis_service
 from app.services.scraping_service import scraping_service
 from app.services.recipe_processor_service import recipe_processor_service
+from app.services.recipe_search_service import recipe_search_service
 
 @celery_app.task(bind=True, max_retries=2, default_retry_delay=60)
 async def scrape_and_analyze_recipe(self, url: str) -> Dict[str, Any]:
@@ -60,4 +61,12 @@ def analyze_and_return(self, scraped_data_dict: Dict[str, Any]) -> Dict[str, Any
         "status": status,
         "analysis": analysis_text,
         "message": message
-    }
\ No newline at end of file
+    }
+
+
+@celery_app.task(bind=True)
+def rebuild_local_search_index(self) -> Dict[str, Any]:
+    task_id = self.request.id
+    print(f"[{task_id}] Rebuilding the local BM25 recipe index...")
+    n_docs = recipe_search_service.rebuild()
+    return {"recipes": n_docs}
@@ -0,0 +1,12 @@
+from typing import Any, Dict, Optional
+
+from app.celery.celery_app import celery_app
+from app.services.recommendation_batch_service import recommendation_batch_service
+
+@celery_app.task(bind=True)
+def precompute_recommendations(self, n_recs: Optional[int] = None) -> Dict[str, Any]:
+    task_id = self.request.id
+    print(f"[{task_id}] Starting recommendation precomputation...")
+    summary = recommendation_batch_service.precompute_all(n_recs=n_recs)
+    print(f"[{task_id}] Precomputation finished: {summary['users']} users at {summary['users_per_second']} users/s.")
+    return summary